@@ -1,5 +1,4 @@
 import os
-import asyncio
 import logging
 from typing import Any, Dict
 
@@ -10,6 +9,8 @@ from x402.common import process_price_to_atomic_amount, x402_VERSION
 from x402.exact import decode_payment
 from x402.facilitator import FacilitatorClient, FacilitatorConfig
 from x402.encoding import safe_base64_encode
+from x402.settlement import SettlementQueue, SettlementResult
+from x402.journal import SettlementJournal
 from x402.common import find_matching_payment_requirements
 from x402.types import (
     PaymentPayload,
@@ -48,6 +49,42 @@ facilitator_config: FacilitatorConfig = {"url": FACILITATOR_URL}
 facilitator = FacilitatorClient(facilitator_config)
 
 
+def log_settlement(result: SettlementResult) -> None:
+    """Called once a queued payment has a final settle result"""
+    if result.response.success:
+        # In a real application, you would store this response header
+        # and associate it with the payment for later verification
+        logger.info(
+            f"Payment {result.id} settled: {settle_response_header(result.response)}"
+        )
+    else:
+        # Payments that could not be settled stay in the journal and are
+        # retried when the queue starts again
+        logger.error(
+            f"Payment {result.id} settlement failed: {result.response.error_reason}"
+        )
+
+
+# Settles payments in the background, retrying failures and journaling
+# unsettled payments so they survive a restart
+settlement_queue = SettlementQueue(
+    facilitator,
+    journal=SettlementJournal(os.getenv("SETTLEMENT_JOURNAL", "settlements.jsonl")),
+    on_settled=log_settlement,
+)
+
+
+@app.on_event("startup")
+async def start_settlement_queue():
+    await settlement_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_settlement_queue():
+    await settlement_queue.aclose(timeout=10)
+    await facilitator.aclose()
+
+
 class PaymentRequiredException(Exception):
     """Custom exception for payment required responses"""
 
@@ -121,7 +158,7 @@ def create_exact_payment_requirements(
 async def verify_payment(
     request: Request,
     payment_requirements: list[PaymentRequirements],
-) -> bool:
+) -> PaymentRequirements:
     """
     Verifies a payment and raises PaymentRequiredException if invalid.
 
@@ -130,7 +167,7 @@ async def verify_payment(
         payment_requirements: List of payment requirements to verify against
 
     Returns:
-        True if payment is valid
+        The payment requirements the payment matched
 
     Raises:
         PaymentRequiredException: If payment is required or invalid
@@ -156,10 +193,20 @@ async def verify_payment(
         ).model_dump(by_alias=True)
         raise PaymentRequiredException(error_data)
 
+    # Match on scheme, network, recipient and amount; never fall back to
+    # requirements the payment was not made for
+    selected_payment_requirement = find_matching_payment_requirements(
+        payment_requirements, decoded_payment
+    )
+    if selected_payment_requirement is None:
+        error_data = x402PaymentRequiredResponse(
+            x402_version=x402_VERSION,
+            error="No matching payment requirements found",
+            accepts=payment_requirements,
+        ).model_dump(by_alias=True)
+        raise PaymentRequiredException(error_data)
+
     try:
-        selected_payment_requirement = find_matching_payment_requirements(
-            payment_requirements, decoded_payment
-        ) or payment_requirements[0]
         verify_response = await facilitator.verify(
             decoded_payment, selected_payment_requirement
         )
@@ -178,7 +225,7 @@ async def verify_payment(
         ).model_dump(by_alias=True)
         raise PaymentRequiredException(error_data)
 
-    return True
+    return selected_payment_requirement
 
 
 def settle_response_header(response: SettleResponse) -> str:
@@ -215,7 +262,7 @@ async def delayed_settlement(request: Request) -> Dict[str, Any]:
         )
     ]
 
-    await verify_payment(request, payment_requirements)
+    selected_payment_requirement = await verify_payment(request, payment_requirements)
 
     # Return weather data immediately
     response_data = {
@@ -225,32 +272,13 @@ async def delayed_settlement(request: Request) -> Dict[str, Any]:
         }
     }
 
-    # Process payment asynchronously in the background
-    async def process_payment_async():
-        try:
-            x_payment = request.headers.get("X-PAYMENT")
-            if not x_payment:
-                logger.error("X-PAYMENT header missing in async processing")
-                return
-
-            decoded_payment_dict = decode_payment(x_payment)
-            decoded_payment = PaymentPayload(**decoded_payment_dict)
-
-            settle_response = await facilitator.settle(
-                decoded_payment, payment_requirements[0]
-            )
-            response_header = settle_response_header(settle_response)
-
-            # In a real application, you would store this response header
-            # and associate it with the payment for later verification
-            logger.info(f"Payment settled: {response_header}")
-        except Exception as e:
-            logger.error(f"Payment settlement failed: {e}")
-            # In a real application, you would handle the failed payment
-            # by marking it for retry or notifying the user
-
-    # Start background task
-    asyncio.create_task(process_payment_async())
+    # Queue the payment for settlement in the background
+    x_payment = request.headers.get("X-PAYMENT")
+    if not x_payment:
+        raise ValueError("X-PAYMENT header is required")
+
+    decoded_payment = PaymentPayload(**decode_payment(x_payment))
+    settlement_queue.submit(decoded_payment, selected_payment_requirement)
 
     return response_data
 
@@ -278,7 +306,7 @@ async def dynamic_price(request: Request, response: Response) -> Dict[str, Any]:
         )
     ]
 
-    await verify_payment(request, payment_requirements)
+    selected_payment_requirement = await verify_payment(request, payment_requirements)
 
     # Process payment synchronously
     x_payment = request.headers.get("X-PAYMENT")
@@ -288,7 +316,9 @@ async def dynamic_price(request: Request, response: Response) -> Dict[str, Any]:
     decoded_payment_dict = decode_payment(x_payment)
     decoded_payment = PaymentPayload(**decoded_payment_dict)
 
-    settle_response = await facilitator.settle(decoded_payment, payment_requirements[0])
+    settle_response = await facilitator.settle(
+        decoded_payment, selected_payment_requirement
+    )
     response_header = settle_response_header(settle_response)
 
     # Set the payment response header
@@ -339,7 +369,8 @@ async def multiple_payment_requirements(
         ),
     ]
 
-    await verify_payment(request, payment_requirements)
+    # The payment requirement the payment was made for
+    selected_payment_requirement = await verify_payment(request, payment_requirements)
 
     # Process payment synchronously
     x_payment = request.headers.get("X-PAYMENT")
@@ -349,11 +380,6 @@ async def multiple_payment_requirements(
     decoded_payment_dict = decode_payment(x_payment)
     decoded_payment = PaymentPayload(**decoded_payment_dict)
 
-    # Find the matching payment requirement
-    selected_payment_requirement = find_matching_payment_requirements(
-        payment_requirements, decoded_payment
-    ) or payment_requirements[0]
-
     settle_response = await facilitator.settle(
         decoded_payment, selected_payment_requirement
     )
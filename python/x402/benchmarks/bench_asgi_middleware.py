@@ -0,0 +1,175 @@
+"""Benchmark: `require_payment` function middleware versus `X402PaymentMiddleware`.
+
+Serves the same paid JSON and streaming endpoints through uvicorn with each
+middleware and drives them with a concurrent httpx client. The facilitator is
+an in-process stub, so the numbers isolate middleware overhead from network
+latency.
+
+    python benchmarks/bench_asgi_middleware.py [--requests 2000] [--concurrency 32]
+
+Reported per middleware: paid JSON requests per second, and for a paid
+streaming response the time to first body byte while the handler deliberately
+pauses between chunks.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import time
+
+import httpx
+import uvicorn
+from eth_account import Account
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from x402.clients.base import x402Client
+from x402.facilitator import FacilitatorClient
+from x402.fastapi.middleware import X402PaymentMiddleware, require_payment
+from x402.types import PaymentRequirements, SettleResponse, VerifyResponse
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+STREAM_CHUNKS = 5
+STREAM_PAUSE_SECONDS = 0.05
+
+
+class StubFacilitator(FacilitatorClient):
+    async def verify(self, payment, payment_requirements):
+        return VerifyResponse(is_valid=True, payer=payment.payload.authorization.from_)
+
+    async def settle(self, payment, payment_requirements):
+        return SettleResponse(success=True, transaction="0x1", network="base-sepolia")
+
+
+def create_app():
+    app = FastAPI()
+
+    @app.get("/paid")
+    async def paid():
+        return {"report": {"weather": "sunny", "temperature": 70}}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(STREAM_CHUNKS):
+                yield b"x" * 65536
+                await asyncio.sleep(STREAM_PAUSE_SECONDS)
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    return app
+
+
+def function_middleware_app():
+    app = create_app()
+    app.middleware("http")(
+        require_payment(
+            price="$0.01",
+            pay_to_address=PAY_TO,
+            path=["/paid", "/stream"],
+            facilitator=StubFacilitator(),
+        )
+    )
+    return app
+
+
+def asgi_middleware_app():
+    return X402PaymentMiddleware(
+        create_app(),
+        routes=[
+            {
+                "path": ["/paid", "/stream"],
+                "price": "$0.01",
+                "pay_to_address": PAY_TO,
+                "facilitator": StubFacilitator(),
+            }
+        ],
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_server(factory, port):
+    uvicorn.run(factory(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve(factory):
+    """Run the app in a separate uvicorn process so it does not share the client's GIL."""
+    port = free_port()
+    process = multiprocessing.Process(target=run_server, args=(factory, port))
+    process.start()
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def measure(base_url, requests, concurrency):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        unpaid = await client.get("/paid")
+        requirements = PaymentRequirements(**unpaid.json()["accepts"][0])
+        header = x402Client(Account.create()).create_payment_header(requirements)
+        headers = {"X-PAYMENT": header}
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/paid", headers=headers)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        rate = requests / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        async with client.stream("GET", "/stream", headers=headers) as response:
+            assert response.status_code == 200
+            first_byte = None
+            async for _ in response.aiter_raw():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+        return rate, first_byte
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    for name, factory in (
+        ("require_payment", function_middleware_app),
+        ("X402PaymentMiddleware", asgi_middleware_app),
+    ):
+        process, base_url = serve(factory)
+        try:
+            rate, first_byte = asyncio.run(
+                measure(base_url, args.requests, args.concurrency)
+            )
+        finally:
+            process.terminate()
+            process.join()
+        print(
+            f"{name:22}  {rate:8.0f} paid req/s  "
+            f"stream first byte {first_byte * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
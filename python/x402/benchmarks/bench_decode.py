@@ -0,0 +1,99 @@
+"""Microbenchmark: X-PAYMENT header decoding throughput.
+
+Compares the middleware's previous decode path (base64, `json.loads` and a
+validated `PaymentPayload`) with `decode_payment_header`, both for headers that
+match the route's requirements and therefore need the payload model, and for
+headers on another network that are rejected by the scheme/network pre-check.
+
+    python benchmarks/bench_decode.py [--headers 256] [--seconds 3]
+
+`decode_payment_header` parses JSON with `orjson` when it is installed; the
+active parser is printed.
+"""
+
+import argparse
+import json
+import time
+
+from eth_account import Account
+
+from x402 import decode
+from x402.common import find_matching_payment_requirements
+from x402.decode import decode_payment_header
+from x402.encoding import safe_base64_decode
+from x402.exact import encode_payment, prepare_payment_header
+from x402.types import PaymentPayload, PaymentRequirements
+
+
+def build_requirements(network):
+    return PaymentRequirements(
+        scheme="exact",
+        network=network,
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_amount_required="10000",
+        resource="https://example.com/api",
+        description="benchmark",
+        max_timeout_seconds=3600,
+        mime_type="application/json",
+        output_schema=None,
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+def build_headers(requirements, count):
+    # Signatures are never checked while decoding, so a fixed one will do
+    headers = []
+    for _ in range(count):
+        header = prepare_payment_header(Account.create().address, 1, requirements)
+        header["payload"]["signature"] = "0x" + "ab" * 65
+        headers.append(encode_payment(header))
+    return headers
+
+
+def rate(fn, headers, seconds):
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for header in headers:
+            fn(header)
+        done += len(headers)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--headers", type=int, default=256)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    accepts = [build_requirements("base-sepolia")]
+    matching = build_headers(accepts[0], args.headers)
+    other_network = build_headers(build_requirements("base"), args.headers)
+
+    def pydantic_path(header):
+        payment = PaymentPayload(**json.loads(safe_base64_decode(header)))
+        if find_matching_payment_requirements(accepts, payment):
+            return payment
+
+    def fast_path(header):
+        decoded = decode_payment_header(header)
+        if find_matching_payment_requirements(accepts, decoded):
+            return decoded.payment
+
+    for header in matching:
+        assert fast_path(header) == pydantic_path(header)
+
+    print(f"json parser: {'orjson' if decode.orjson is not None else 'pydantic_core'}")
+    for name, headers in (("matching", matching), ("other network", other_network)):
+        before = rate(pydantic_path, headers, args.seconds)
+        after = rate(fast_path, headers, args.seconds)
+        print(
+            f"{name:14} PaymentPayload: {before:10.0f} /s   "
+            f"decode_payment_header: {after:10.0f} /s   ({after / before:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Benchmark: concurrent `FacilitatorClient.verify` calls with and without batching.
+
+Serves a mock facilitator through uvicorn in a separate process. Every request
+to it, single or batched, pays a fixed `--latency` standing in for the network
+round trip and the facilitator's per-request work, and each item costs
+`--item-cost` on top. Many concurrent `verify` calls are then issued, once
+one request per call and once coalesced with `batch_window`.
+
+    python benchmarks/bench_facilitator_batch.py [--calls 2000] [--concurrency 256]
+
+Reported: verifications per second and the number of HTTP requests sent.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import time
+
+import uvicorn
+from eth_account import Account
+from fastapi import FastAPI, Request
+
+from x402.exact import decode_payment, encode_payment, prepare_payment_header
+from x402.facilitator import FacilitatorClient
+from x402.types import PaymentPayload, PaymentRequirements
+
+
+def create_app(latency, item_cost):
+    app = FastAPI()
+    counter = {"requests": 0}
+
+    def answer(body):
+        payer = body["paymentPayload"]["payload"]["authorization"]["from"]
+        return {"isValid": True, "payer": payer}
+
+    @app.post("/verify")
+    async def verify(request: Request):
+        counter["requests"] += 1
+        body = await request.json()
+        await asyncio.sleep(latency + item_cost)
+        return answer(body)
+
+    @app.post("/verify/batch")
+    async def verify_batch(request: Request):
+        counter["requests"] += 1
+        items = (await request.json())["items"]
+        await asyncio.sleep(latency + item_cost * len(items))
+        return {"results": [answer(item) for item in items]}
+
+    @app.get("/requests")
+    async def requests():
+        return counter
+
+    return app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_server(port, latency, item_cost):
+    uvicorn.run(
+        create_app(latency, item_cost), host="127.0.0.1", port=port, log_level="warning"
+    )
+
+
+def serve(latency, item_cost):
+    """Run the mock facilitator in a separate uvicorn process."""
+    port = free_port()
+    process = multiprocessing.Process(
+        target=run_server, args=(port, latency, item_cost)
+    )
+    process.start()
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def build_payment():
+    requirements = PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_amount_required="10000",
+        resource="https://example.com/api",
+        description="benchmark",
+        max_timeout_seconds=300,
+        mime_type="application/json",
+        output_schema=None,
+        extra={"name": "USDC", "version": "2"},
+    )
+    header = prepare_payment_header(Account.create().address, 1, requirements)
+    header["payload"]["signature"] = "0x" + "ab" * 65
+    return PaymentPayload(**decode_payment(encode_payment(header))), requirements
+
+
+async def measure(config, calls, concurrency):
+    payment, requirements = build_payment()
+    facilitator = FacilitatorClient(config)
+    remaining = calls
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await facilitator.verify(payment, requirements)
+            assert response.is_valid
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        rate = calls / (time.perf_counter() - start)
+        client = facilitator._get_client()
+        sent = (await client.get(f"{config['url']}/requests")).json()["requests"]
+    finally:
+        await facilitator.aclose()
+    return rate, sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--item-cost", type=float, default=0.0001)
+    parser.add_argument("--batch-window", type=float, default=0.005)
+    parser.add_argument("--max-connections", type=int, default=32)
+    args = parser.parse_args()
+
+    modes = (("one per call", {}), ("batched", {"batch_window": args.batch_window}))
+    for name, batching in modes:
+        process, url = serve(args.latency, args.item_cost)
+        config = {"url": url, "max_connections": args.max_connections, **batching}
+        try:
+            rate, sent = asyncio.run(measure(config, args.calls, args.concurrency))
+        finally:
+            process.terminate()
+            process.join()
+        print(f"{name:13} {rate:8.0f} verifications/s   {sent:6d} HTTP requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Cold-start benchmark for `import x402.fastapi.middleware`.
+
+Each measurement runs in a fresh interpreter. For comparison the script also
+imports a generated module holding the paywall template as a Python string
+literal, which is how the template used to be shipped, both with and without
+a bytecode cache. Finally it reports the one-off cost of loading the template
+lazily on the first browser paywall render.
+
+    python benchmarks/bench_import_time.py [--runs 7]
+"""
+
+import argparse
+import py_compile
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+TIMED_IMPORT = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_import(module, runs, cwd=None, extra_args=()):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, *extra_args, "-c", TIMED_IMPORT.format(module=module)],
+            cwd=cwd,
+            text=True,
+        )
+        samples.append(float(output.strip()))
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    from x402.template import get_paywall_template
+
+    middleware_ms = time_import("x402.fastapi.middleware", args.runs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        literal = Path(tmp) / "literal_template.py"
+        literal.write_text(f"PAYWALL_TEMPLATE = {get_paywall_template()!r}\n")
+        literal_cold_ms = time_import("literal_template", args.runs, tmp, ["-B"])
+        py_compile.compile(str(literal))  # write the bytecode cache
+        literal_cached_ms = time_import("literal_template", args.runs, tmp)
+
+    lazy_load_ms = (
+        float(
+            subprocess.check_output(
+                [
+                    sys.executable,
+                    "-c",
+                    "import time; from x402.paywall import _template_parts; "
+                    "t = time.perf_counter(); _template_parts(); "
+                    "print(time.perf_counter() - t)",
+                ],
+                text=True,
+            )
+        )
+        * 1000
+    )
+
+    print(f"import x402.fastapi.middleware:           {middleware_ms:8.1f} ms")
+    print(f"string-literal template, no bytecode:     {literal_cold_ms:8.1f} ms")
+    print(f"string-literal template, cached bytecode: {literal_cached_ms:8.1f} ms")
+    print(f"lazy template load on first paywall:      {lazy_load_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Microbenchmark: settlement journal throughput with group commit.
+
+Each simulated request durably journals a pending record and then a done
+record, as the middlewares do around a settle call. With one writer every
+record pays for its own fsync; with many concurrent writers the group commit
+shares each fsync between every record waiting on it.
+
+    python benchmarks/bench_journal.py [--requests 5000] [--threads 1 8 64]
+
+Results depend heavily on the storage device; run it on the volume the
+journal will live on.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from x402.journal import SettlementJournal
+from x402.types import (
+    EIP3009Authorization,
+    ExactPaymentPayload,
+    PaymentPayload,
+    PaymentRequirements,
+)
+
+REQUIREMENTS = PaymentRequirements(
+    scheme="exact",
+    network="base-sepolia",
+    asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    pay_to="0x1111111111111111111111111111111111111111",
+    max_amount_required="10000",
+    resource="https://example.com/api",
+    description="benchmark",
+    max_timeout_seconds=60,
+    mime_type="application/json",
+    extra={"name": "USDC", "version": "2"},
+)
+
+PAYMENT = PaymentPayload(
+    x402_version=1,
+    scheme="exact",
+    network="base-sepolia",
+    payload=ExactPaymentPayload(
+        signature="0x" + "ab" * 65,
+        authorization=EIP3009Authorization(
+            **{
+                "from": "0xabcd1234567890123456789012345678901234ab",
+                "to": "0x1111111111111111111111111111111111111111",
+                "value": "10000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "00" * 32,
+            }
+        ),
+    ),
+)
+
+
+def run(directory, requests, threads, fsync):
+    journal = SettlementJournal(
+        os.path.join(directory, f"journal-{threads}-{fsync}.jsonl"), fsync=fsync
+    )
+    per_thread = requests // threads
+
+    def worker(index):
+        for i in range(per_thread):
+            settlement = f"{index}-{i}"
+            journal.append_pending([(settlement, PAYMENT, REQUIREMENTS)])
+            journal.append_done([settlement])
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--dir", default=None, help="directory for journal files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for fsync in (True, False):
+            for threads in args.threads:
+                rate = run(directory, args.requests, threads, fsync)
+                print(
+                    f"fsync={str(fsync):5}  threads={threads:3}  "
+                    f"{rate:10.0f} requests/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
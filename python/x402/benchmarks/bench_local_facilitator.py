@@ -0,0 +1,134 @@
+"""Benchmark: verifying in-process with `LocalFacilitator` versus over HTTP.
+
+Both sides run the same `LocalFacilitator` over an in-memory chain backend,
+once called directly and once served by `create_facilitator_app` through
+uvicorn in a separate process and called with `FacilitatorClient`, so the
+difference is the hop to the facilitator (on loopback, so a lower bound).
+
+    python benchmarks/bench_local_facilitator.py [--requests 500]
+
+Reported: p50 and p99 latency of a `verify` call.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import time
+
+import uvicorn
+from eth_account import Account
+
+from x402.exact import decode_payment, prepare_payment_header, sign_payment_header
+from x402.facilitator import FacilitatorClient
+from x402.fastapi.facilitator import create_facilitator_app
+from x402.local_facilitator import LocalFacilitator, TransferReceipt
+from x402.types import PaymentPayload, PaymentRequirements
+
+
+class InMemoryChain:
+    async def balance_of(self, network, asset, owner):
+        return 10**12
+
+    async def authorization_used(self, network, asset, authorizer, nonce):
+        return False
+
+    async def submit_transfers(self, network, transfers):
+        return [TransferReceipt("0x1", True) for _ in transfers]
+
+
+def build_payment():
+    requirements = PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_amount_required="10000",
+        resource="https://example.com/api",
+        description="benchmark",
+        max_timeout_seconds=3600,
+        mime_type="application/json",
+        output_schema=None,
+        extra={"name": "USDC", "version": "2"},
+    )
+    account = Account.create()
+    header = prepare_payment_header(account.address, 1, requirements)
+    header["payload"]["authorization"]["nonce"] = header["payload"]["authorization"][
+        "nonce"
+    ].hex()
+    signed = sign_payment_header(account, requirements, header)
+    return PaymentPayload(**decode_payment(signed)), requirements
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_server(port):
+    app = create_facilitator_app(LocalFacilitator(InMemoryChain()))
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def serve():
+    """Run the facilitator app in a separate uvicorn process."""
+    port = free_port()
+    process = multiprocessing.Process(target=run_server, args=(port,))
+    process.start()
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def measure(facilitator, requests):
+    payment, requirements = build_payment()
+    # Warm up connections and caches
+    await facilitator.verify(payment, requirements)
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await facilitator.verify(payment, requirements)
+        latencies.append(time.perf_counter() - start)
+        assert response.is_valid, response
+    await facilitator.aclose()
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:12} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    report(
+        "in-process",
+        asyncio.run(measure(LocalFacilitator(InMemoryChain()), args.requests)),
+    )
+
+    process, url = serve()
+    try:
+        latencies = asyncio.run(measure(FacilitatorClient({"url": url}), args.requests))
+    finally:
+        process.terminate()
+        process.join()
+    report("over HTTP", latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Microbenchmark: local EIP-3009 payment verification throughput.
+
+Measures `verify_payment_payload` on a single core for valid payments from a
+pool of distinct payers, alongside building and hashing the typed data through
+`eth_account.messages.encode_typed_data` (the generic EIP-712 path) and
+through `transfer_with_authorization_hash` (the path the verifier uses).
+
+    python benchmarks/bench_local_verify.py [--payments 64] [--seconds 3]
+
+Signer recovery dominates the cost. eth_keys uses the `coincurve` C backend
+when it is installed and falls back to a pure-Python implementation, which is
+roughly two orders of magnitude slower; the active backend is printed.
+"""
+
+import argparse
+import time
+
+from eth_account import Account
+from eth_account.messages import _hash_eip191_message, encode_typed_data
+from eth_keys import keys
+
+from x402.exact import (
+    decode_payment,
+    prepare_payment_header,
+    sign_payment_header,
+    transfer_with_authorization_hash,
+    transfer_with_authorization_typed_data,
+    verify_payment_payload,
+)
+from x402.types import PaymentPayload, PaymentRequirements
+
+
+def build_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_amount_required="10000",
+        resource="https://example.com/api",
+        description="benchmark",
+        max_timeout_seconds=3600,
+        mime_type="application/json",
+        output_schema=None,
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+def build_payments(requirements, count):
+    payments = []
+    for _ in range(count):
+        account = Account.create()
+        header = prepare_payment_header(account.address, 1, requirements)
+        nonce = header["payload"]["authorization"]["nonce"]
+        header["payload"]["authorization"]["nonce"] = nonce.hex()
+        payments.append(
+            PaymentPayload(
+                **decode_payment(sign_payment_header(account, requirements, header))
+            )
+        )
+    return payments
+
+
+def rate(fn, payments, seconds):
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for payment in payments:
+            fn(payment)
+        done += len(payments)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payments", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    requirements = build_requirements()
+    payments = build_payments(requirements, args.payments)
+    for payment in payments:
+        assert verify_payment_payload(payment, requirements).is_valid
+
+    def generic_hash(payment):
+        typed_data = transfer_with_authorization_typed_data(
+            requirements, payment.payload.authorization.model_dump(by_alias=True)
+        )
+        _hash_eip191_message(
+            encode_typed_data(
+                domain_data=typed_data["domain"],
+                message_types=typed_data["types"],
+                message_data=typed_data["message"],
+            )
+        )
+
+    def direct_hash(payment):
+        transfer_with_authorization_hash(
+            requirements, payment.payload.authorization.model_dump(by_alias=True)
+        )
+
+    def verify(payment):
+        verify_payment_payload(payment, requirements)
+
+    print(f"eth_keys backend: {type(keys.backend).__name__}")
+    print(
+        f"encode_typed_data hash: {rate(generic_hash, payments, args.seconds):10.0f} /s"
+    )
+    print(
+        f"direct struct hash:     {rate(direct_hash, payments, args.seconds):10.0f} /s"
+    )
+    print(f"verify_payment_payload: {rate(verify, payments, args.seconds):10.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
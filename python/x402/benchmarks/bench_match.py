@@ -0,0 +1,127 @@
+"""Microbenchmark: matching a payment against many payment requirements.
+
+Builds a route that accepts `--options` (network, asset, recipient, price)
+combinations and compares a linear scan that checks scheme, network,
+recipient and amount against `PaymentRequirementsIndex.match`, for payments
+that match the last listed option and for payments no option accepts.
+
+    python benchmarks/bench_match.py [--options 128] [--seconds 3]
+"""
+
+import argparse
+import time
+
+from x402.common import PaymentRequirementsIndex
+from x402.types import (
+    EIP3009Authorization,
+    ExactPaymentPayload,
+    PaymentPayload,
+    PaymentRequirements,
+)
+
+NETWORKS = {
+    "base-sepolia": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "base": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+    "avalanche-fuji": "0x5425890298aed601595a70AB815c96711a31Bc65",
+    "avalanche": "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E",
+}
+
+
+def build_accepts(count):
+    accepts = []
+    networks = list(NETWORKS)
+    for i in range(count):
+        network = networks[i % len(networks)]
+        accepts.append(
+            PaymentRequirements(
+                scheme="exact",
+                network=network,
+                max_amount_required=str(1000 * (i // len(networks) + 1)),
+                resource="https://example.com/api",
+                description="benchmark",
+                mime_type="application/json",
+                pay_to=f"0x{(i % 8) + 1:040x}",
+                max_timeout_seconds=60,
+                asset=NETWORKS[network],
+            )
+        )
+    return accepts
+
+
+def build_payment(requirements, value):
+    return PaymentPayload(
+        x402_version=1,
+        scheme=requirements.scheme,
+        network=requirements.network,
+        payload=ExactPaymentPayload(
+            signature="0x" + "ab" * 65,
+            authorization=EIP3009Authorization(
+                **{
+                    "from": "0x" + "cd" * 20,
+                    "to": requirements.pay_to,
+                    "value": value,
+                    "validAfter": "0",
+                    "validBefore": "9999999999",
+                    "nonce": "0x" + "01" * 32,
+                }
+            ),
+        ),
+    )
+
+
+def linear_match(accepts, payment):
+    authorization = payment.payload.authorization
+    value = int(authorization.value)
+    pay_to = authorization.to.lower()
+    best = None
+    for requirements in accepts:
+        amount = int(requirements.max_amount_required)
+        if (
+            requirements.scheme == payment.scheme
+            and requirements.network == payment.network
+            and requirements.pay_to.lower() == pay_to
+            and amount <= value
+            and (best is None or amount > int(best.max_amount_required))
+        ):
+            best = requirements
+    return best
+
+
+def rate(fn, seconds):
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            fn()
+        done += 100
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--options", type=int, default=128)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    accepts = build_accepts(args.options)
+    index = PaymentRequirementsIndex(accepts)
+    last = accepts[-1]
+    payments = {
+        "match": build_payment(last, last.max_amount_required),
+        "underpaid": build_payment(last, "1"),
+    }
+
+    print(f"{args.options} payment options")
+    for name, payment in payments.items():
+        assert index.match(payment) is linear_match(accepts, payment)
+        before = rate(lambda: linear_match(accepts, payment), args.seconds)
+        after = rate(lambda: index.match(payment), args.seconds)
+        print(
+            f"{name:10} linear: {before:10.0f} /s   index: {after:10.0f} /s   "
+            f"({after / before:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
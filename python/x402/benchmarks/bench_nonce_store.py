@@ -0,0 +1,87 @@
+"""Benchmark: memory and speed of `NonceStore` versus a dict of hex strings.
+
+Records `--entries` random (payer, nonce) pairs, then looks each one up,
+once in a dict keyed by the lowercased hex strings (the obvious replay
+guard) and once in a `NonceStore`. Memory is the growth in traced
+allocations for the dict and the table size for the store.
+
+    python benchmarks/bench_nonce_store.py [--entries 1000000]
+
+Ten million entries need about 3 GB for the dict; pass `--skip-dict` to
+measure only the store at that size.
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from x402.nonces import NonceStore
+
+VALID_BEFORE = int(time.time()) + 3600
+
+
+def build_pairs(count):
+    data = os.urandom(52 * count)
+    return [
+        (
+            "0x" + data[i * 52 : i * 52 + 20].hex(),
+            "0x" + data[i * 52 + 20 : i * 52 + 52].hex(),
+        )
+        for i in range(count)
+    ]
+
+
+def run_dict(pairs):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    used = {}
+    for payer, nonce in pairs:
+        used[(payer.lower(), nonce.lower())] = VALID_BEFORE
+    insert = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for payer, nonce in pairs:
+        assert (payer.lower(), nonce.lower()) in used
+    lookup = time.perf_counter() - start
+    return memory, insert, lookup
+
+
+def run_store(pairs):
+    store = NonceStore()
+    start = time.perf_counter()
+    for payer, nonce in pairs:
+        store.add(payer, nonce, VALID_BEFORE)
+    insert = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for pair in pairs:
+        assert pair in store
+    lookup = time.perf_counter() - start
+    return store.nbytes, insert, lookup
+
+
+def report(name, count, memory, insert, lookup):
+    print(
+        f"{name:10} {memory / count:6.1f} bytes/nonce   "
+        f"add {count / insert:9.0f} /s   lookup {count / lookup:9.0f} /s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--skip-dict", action="store_true")
+    args = parser.parse_args()
+
+    pairs = build_pairs(args.entries)
+    if not args.skip_dict:
+        report("dict", args.entries, *run_dict(pairs))
+    report("NonceStore", args.entries, *run_store(pairs))
+
+
+if __name__ == "__main__":
+    main()
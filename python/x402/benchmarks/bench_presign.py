@@ -0,0 +1,82 @@
+"""Microbenchmark: time from a parsed 402 response to a signed payment header.
+
+Compares signing on the spot with `x402Client.create_payment_header_for`
+against taking a header from a `PresignedPaymentPool`. Requests arrive every
+`--interval` seconds so the background signer can keep up; the pool's
+latency is then a dictionary lookup and a deque pop.
+
+    python benchmarks/bench_presign.py [--requests 500] [--interval 0.01]
+"""
+
+import argparse
+import statistics
+import time
+
+from eth_account import Account
+from eth_keys import keys
+
+from x402.clients.base import x402Client
+from x402.clients.presign import PresignedPaymentPool
+from x402.types import PaymentRequirements, x402PaymentRequiredResponse
+
+
+def build_payment_response():
+    requirements = PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_amount_required="10000",
+        resource="https://example.com/api",
+        description="benchmark",
+        max_timeout_seconds=300,
+        mime_type="application/json",
+        output_schema=None,
+        extra={"name": "USDC", "version": "2"},
+    )
+    return x402PaymentRequiredResponse(
+        x402_version=1, accepts=[requirements], error="Payment Required"
+    )
+
+
+def measure(client, payment_response, requests, interval):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.create_payment_header_for(payment_response)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:10} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--pool-size", type=int, default=16)
+    args = parser.parse_args()
+
+    payment_response = build_payment_response()
+    requirements = payment_response.accepts[0]
+    client = x402Client(Account.create())
+
+    print(f"eth_keys backend: {type(keys.backend).__name__}")
+    report("inline", measure(client, payment_response, args.requests, args.interval))
+
+    with PresignedPaymentPool(client, size=args.pool_size) as pool:
+        pool.add(requirements)
+        while pool.ready(requirements) < args.pool_size:
+            time.sleep(0.01)
+        latencies = measure(client, payment_response, args.requests, args.interval)
+    report("presigned", latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Microbenchmark: cost of quoting a per-request price.
+
+Compares building payment requirements from scratch for every request, as the
+advanced server example does (`process_price_to_atomic_amount` and a new
+`PaymentRequirements`), against a `require_payment` route priced by a
+callback, which caches conversions and requirements per price point.
+
+    python benchmarks/bench_pricing.py [--prices 8] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import Request
+
+from x402.common import money_to_atomic_amount, process_price_to_atomic_amount
+from x402.fastapi.middleware import _PaymentRoute
+from x402.types import PaymentRequirements
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+RESOURCE = "https://example.com/dynamic-price"
+
+
+def build_request(multiplier: int) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "https",
+            "server": ("example.com", 443),
+            "path": "/dynamic-price",
+            "query_string": f"multiplier={multiplier}".encode(),
+            "headers": [],
+        }
+    )
+
+
+def price(request: Request) -> str:
+    return f"${0.001 * int(request.query_params.get('multiplier', '1')):.3f}"
+
+
+def per_request(request: Request) -> PaymentRequirements:
+    money_to_atomic_amount.cache_clear()
+    max_amount_required, asset_address, eip712_domain = process_price_to_atomic_amount(
+        price(request), "base-sepolia"
+    )
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        max_amount_required=max_amount_required,
+        resource=RESOURCE,
+        description="Access to weather data",
+        mime_type="application/json",
+        pay_to=PAY_TO,
+        max_timeout_seconds=60,
+        asset=asset_address,
+        output_schema=None,
+        extra=eip712_domain,
+    )
+
+
+async def rate_async(fn, requests, seconds):
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for request in requests:
+            await fn(request)
+        done += len(requests)
+    return done / (time.perf_counter() - start)
+
+
+def rate(fn, requests, seconds):
+    async def call(request):
+        fn(request)
+
+    return asyncio.run(rate_async(call, requests, seconds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prices", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    requests = [build_request(m % args.prices + 1) for m in range(256)]
+    route = _PaymentRoute(
+        price=price,
+        pay_to_address=PAY_TO,
+        resource=RESOURCE,
+        description="Access to weather data",
+        mime_type="application/json",
+    )
+
+    before = rate(per_request, requests, args.seconds)
+    after = asyncio.run(rate_async(route.requirements, requests, args.seconds))
+    print(f"{args.prices} distinct prices")
+    print(f"per request:   {before:10.0f} quotes/s   ({1e6 / before:7.1f} us)")
+    print(f"price callback:{after:10.0f} quotes/s   ({1e6 / after:7.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Microbenchmark: route lookup with 1k+ registered payment routes.
+
+Compares a linear scan over the patterns (how `path_is_match` used to be
+applied once per registered route) against a single `RouteTable.match` lookup.
+
+    python benchmarks/bench_route_table.py [--routes 1200] [--lookups 20000]
+
+The linear baseline is slow enough that it only runs over the first
+`--linear-lookups` paths; both numbers are reported per lookup.
+"""
+
+import argparse
+import fnmatch
+import random
+import re
+import time
+
+from x402.path import RouteTable
+
+
+def linear_match(patterns, request_path):
+    for pattern, value in patterns:
+        if pattern.startswith("regex:"):
+            if re.match(pattern[6:], request_path):
+                return value
+        elif "*" in pattern or "?" in pattern:
+            if fnmatch.fnmatch(request_path, pattern):
+                return value
+        elif pattern == request_path:
+            return value
+    return None
+
+
+def build_patterns(count):
+    patterns = []
+    for i in range(count // 3):
+        patterns.append((f"/exact/{i}/resource", i))
+        patterns.append((f"/glob/{i}/*", i))
+        patterns.append((f"regex:^/regex/{i}/\\d+$", i))
+    return patterns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=1200)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--linear-lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    patterns = build_patterns(args.routes)
+    table = RouteTable()
+    for pattern, value in patterns:
+        table.add(pattern, value)
+
+    n = args.routes // 3
+    rng = random.Random(0)
+    paths = []
+    for _ in range(args.lookups):
+        i = rng.randrange(n)
+        paths.append(
+            rng.choice(
+                [
+                    f"/exact/{i}/resource",
+                    f"/glob/{i}/file.json",
+                    f"/regex/{i}/{rng.randrange(1000)}",
+                    f"/unpriced/{i}",
+                ]
+            )
+        )
+
+    for path in paths[: args.linear_lookups]:
+        assert table.match(path) == linear_match(patterns, path), path
+
+    linear_paths = paths[: args.linear_lookups]
+    start = time.perf_counter()
+    for path in linear_paths:
+        linear_match(patterns, path)
+    linear = (time.perf_counter() - start) / len(linear_paths)
+
+    start = time.perf_counter()
+    for path in paths:
+        table.match(path)
+    indexed = (time.perf_counter() - start) / len(paths)
+
+    print(f"routes registered: {len(patterns)}  lookups: {len(paths)}")
+    print(f"linear scan:  {linear * 1e6:9.2f} us/lookup")
+    print(f"RouteTable:   {indexed * 1e6:9.2f} us/lookup")
+    print(f"speedup:      {linear / indexed:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Microbenchmark: payment signatures per second.
+
+Compares signing headers one at a time with `prepare_payment_header` and
+`sign_payment_header` against `sign_payment_headers_batch`, on one core and
+spread over a process pool.
+
+    python benchmarks/bench_sign_batch.py [--headers 256] [--processes N]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_account import Account
+from eth_keys import keys
+
+from x402.exact import (
+    prepare_payment_header,
+    sign_payment_header,
+    sign_payment_headers_batch,
+)
+from x402.types import PaymentRequirements
+
+
+def build_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_amount_required="10000",
+        resource="https://example.com/api",
+        description="benchmark",
+        max_timeout_seconds=300,
+        mime_type="application/json",
+        output_schema=None,
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+def sign_one_by_one(account, requirements, count):
+    headers = []
+    for _ in range(count):
+        header = prepare_payment_header(account.address, 1, requirements)
+        nonce = header["payload"]["authorization"]["nonce"]
+        header["payload"]["authorization"]["nonce"] = nonce.hex()
+        headers.append(sign_payment_header(account, requirements, header))
+    return headers
+
+
+def rate(fn, count):
+    start = time.perf_counter()
+    headers = fn()
+    elapsed = time.perf_counter() - start
+    assert len(headers) == count
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--headers", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    account = Account.create()
+    requirements = build_requirements()
+    count = args.headers
+
+    print(f"eth_keys backend: {type(keys.backend).__name__}")
+    results = [
+        (
+            "one by one",
+            rate(lambda: sign_one_by_one(account, requirements, count), count),
+        ),
+        (
+            "batch",
+            rate(
+                lambda: sign_payment_headers_batch(account, requirements, count), count
+            ),
+        ),
+    ]
+    with ProcessPoolExecutor(max_workers=args.processes) as executor:
+        # Start the workers before timing
+        sign_payment_headers_batch(
+            account, requirements, args.processes, executor=executor, chunk_size=1
+        )
+        chunk_size = max(1, count // args.processes)
+        results.append(
+            (
+                f"batch x{args.processes} procs",
+                rate(
+                    lambda: sign_payment_headers_batch(
+                        account,
+                        requirements,
+                        count,
+                        executor=executor,
+                        chunk_size=chunk_size,
+                    ),
+                    count,
+                ),
+            )
+        )
+
+    baseline = results[0][1]
+    for name, signatures_per_second in results:
+        print(
+            f"{name:18} {signatures_per_second:8.0f} signatures/s   "
+            f"({signatures_per_second / baseline:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncBridge:
+    """Run coroutines from synchronous code on one persistent event loop.
+
+    WSGI servers call into x402 from plain threads. Instead of creating and
+    closing an event loop for every facilitator call, the bridge keeps a single
+    loop running in a daemon thread that every worker thread submits to, so
+    async resources such as pooled HTTP connections stay warm across requests.
+
+    The loop thread is started lazily and restarted after a fork, so the bridge
+    is safe to create before a pre-forking server such as gunicorn spawns its
+    workers.
+    """
+
+    def __init__(self, name: str = "x402-async-bridge"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running bridge event loop, starting it if needed."""
+        if self._loop is None or self._pid != os.getpid() or self._loop.is_closed():
+            with self._lock:
+                if (
+                    self._loop is None
+                    or self._pid != os.getpid()
+                    or self._loop.is_closed()
+                ):
+                    self._start()
+        return self._loop  # type: ignore[return-value]
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, name=self.name, daemon=True)
+        thread.start()
+        started.wait()
+        self._loop, self._thread, self._pid = loop, thread, os.getpid()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the bridge loop and return a future for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the bridge loop and block until it completes.
+
+        Raises:
+            RuntimeError: If called from the bridge loop thread itself
+            concurrent.futures.TimeoutError: If the coroutine does not finish
+                within timeout seconds
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncBridge.run() cannot be called from its own loop")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Stop the loop thread. A later call starts a fresh loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._pid = None
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+            loop.close()
+
+
+_default_bridge: Optional[AsyncBridge] = None
+_default_bridge_lock = threading.Lock()
+
+
+def get_default_bridge() -> AsyncBridge:
+    """Return the process-wide bridge shared by synchronous x402 integrations."""
+    global _default_bridge
+    if _default_bridge is None:
+        with _default_bridge_lock:
+            if _default_bridge is None:
+                _default_bridge = AsyncBridge()
+    return _default_bridge
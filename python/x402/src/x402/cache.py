@@ -0,0 +1,205 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from x402.common import PaymentRequirementsIndex, x402_VERSION
+from x402.nonces import NonceStore
+from x402.types import PaymentPayload, PaymentRequirements, VerifyResponse
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+DEFAULT_REQUIREMENTS_CACHE_SIZE = 1024
+_MAX_CACHED_ERROR_BODIES = 8
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe, size-bounded least-recently-used cache."""
+
+    def __init__(self, maxsize: int = DEFAULT_REQUIREMENTS_CACHE_SIZE):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """Return the cached value for key, building and caching it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class CachedPaymentRequirements:
+    """Payment requirements for one resource with a pre-serialized 402 body.
+
+    The `accepts` list is shared between requests and must be treated as
+    read-only; `index` matches payments against it. The JSON body of a 402 response only differs by its error
+    message, so everything before it is serialized once.
+    """
+
+    __slots__ = ("accepts", "index", "_body_prefix", "_bodies")
+
+    def __init__(self, accepts: List[PaymentRequirements]):
+        self.accepts = accepts
+        self.index = PaymentRequirementsIndex(accepts)
+        accepts_json = json.dumps(
+            [req.model_dump(by_alias=True) for req in accepts],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        self._body_prefix = (
+            f'{{"x402Version":{x402_VERSION},"accepts":{accepts_json},"error":'
+        ).encode("utf-8")
+        self._bodies: dict[str, bytes] = {}
+
+    def response_body(self, error: str) -> bytes:
+        """Return the serialized x402PaymentRequiredResponse for an error."""
+        body = self._bodies.get(error)
+        if body is None:
+            body = (
+                self._body_prefix
+                + json.dumps(error, ensure_ascii=False).encode("utf-8")
+                + b"}"
+            )
+            # Only the handful of fixed error messages are worth keeping
+            if len(self._bodies) < _MAX_CACHED_ERROR_BODIES:
+                self._bodies[error] = body
+        return body
+
+
+DEFAULT_VERIFY_CACHE_SIZE = 10_000
+
+
+class VerifyCache:
+    """Bounded cache of facilitator verify results with local replay protection.
+
+    Results are keyed by the signed authorization (payer, nonce, validBefore and
+    signature) together with the requirements it was verified against, and expire
+    at the authorization's `validBefore`. Once a payment has been settled its
+    (payer, nonce) pair is kept in a `NonceStore` until `validBefore`, so replays
+    of the same X-PAYMENT header are rejected without a facilitator round-trip.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_VERIFY_CACHE_SIZE,
+        clock: Callable[[], float] = time.time,
+        nonce_store: Optional[NonceStore] = None,
+    ):
+        """Initialize the verify cache.
+
+        Args:
+            maxsize: Maximum number of verify results kept
+            clock: Function returning the current unix time, for testing
+            nonce_store: Store for settled nonces, e.g. a file-backed one shared
+                with a `LocalFacilitator`. Defaults to an in-memory store.
+        """
+        self._results: LRUCache[Tuple, Tuple[int, VerifyResponse]] = LRUCache(maxsize)
+        self.nonce_store = (
+            nonce_store if nonce_store is not None else NonceStore(clock=clock)
+        )
+        self._clock = clock
+
+    @staticmethod
+    def _authorization(payment: PaymentPayload) -> Optional[Tuple[str, str, int, str]]:
+        authorization = payment.payload.authorization
+        try:
+            valid_before = int(authorization.valid_before)
+        except (TypeError, ValueError):
+            return None
+        return (
+            authorization.from_.lower(),
+            authorization.nonce.lower(),
+            valid_before,
+            payment.payload.signature.lower(),
+        )
+
+    @staticmethod
+    def _requirements_key(requirements: PaymentRequirements) -> Tuple[str, ...]:
+        return (
+            requirements.scheme,
+            requirements.network,
+            requirements.asset.lower(),
+            requirements.pay_to.lower(),
+            requirements.max_amount_required,
+        )
+
+    def get(
+        self, payment: PaymentPayload, requirements: PaymentRequirements
+    ) -> Optional[VerifyResponse]:
+        """Return the cached verify result, or None on a miss or expiry."""
+        authorization = self._authorization(payment)
+        if authorization is None:
+            return None
+        key = authorization + self._requirements_key(requirements)
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= self._clock():
+            self._results.pop(key)
+            return None
+        return response
+
+    def set(
+        self,
+        payment: PaymentPayload,
+        requirements: PaymentRequirements,
+        response: VerifyResponse,
+    ) -> None:
+        """Cache a successful verify result until the authorization expires."""
+        authorization = self._authorization(payment)
+        if authorization is None or not response.is_valid:
+            return
+        expires_at = authorization[2]
+        if expires_at <= self._clock():
+            return
+        key = authorization + self._requirements_key(requirements)
+        self._results.set(key, (expires_at, response))
+
+    def mark_settled(self, payment: PaymentPayload) -> None:
+        """Record that the payment's nonce has been settled."""
+        authorization = self._authorization(payment)
+        if authorization is None:
+            return
+        payer, nonce, valid_before, _ = authorization
+        self.nonce_store.add(payer, nonce, valid_before)
+
+    def is_settled(self, payment: PaymentPayload) -> bool:
+        """Return True if the payment's (payer, nonce) was already settled."""
+        authorization = payment.payload.authorization
+        return (authorization.from_, authorization.nonce) in self.nonce_store
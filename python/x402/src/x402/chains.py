@@ -1,26 +1,22 @@
-NETWORK_TO_ID = {
+import json
+import sys
+import threading
+from os import PathLike
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from eth_utils import to_checksum_address
+
+# Built-in networks and tokens, registered on `registry` at import. The public
+# NETWORK_TO_ID and KNOWN_TOKENS are read from the registry instead, see __getattr__
+_BUILTIN_NETWORKS = {
     "base-sepolia": "84532",
     "base": "8453",
     "avalanche-fuji": "43113",
     "avalanche": "43114",
 }
 
-
-def get_chain_id(network: str) -> str:
-    """Get the chain ID for a given network
-    Supports string encoded chain IDs and human readable networks
-    """
-    try:
-        int(network)
-        return network
-    except ValueError:
-        pass
-    if network not in NETWORK_TO_ID:
-        raise ValueError(f"Unsupported network: {network}")
-    return NETWORK_TO_ID[network]
-
-
-KNOWN_TOKENS = {
+_BUILTIN_TOKENS = {
     "84532": [
         {
             "human_name": "usdc",
@@ -60,33 +56,223 @@ KNOWN_TOKENS = {
 }
 
 
+class TokenInfo(NamedTuple):
+    """A token known to the registry."""
+
+    chain_id: str
+    address: str  # checksummed
+    human_name: str
+    name: str  # needs to be exactly what is returned by name() on contract
+    decimals: int
+    version: str
+
+
+class TokenRegistry:
+    """Networks and tokens, indexed for constant-time lookups.
+
+    Tokens are indexed by (chain_id, address) and by (chain_id, human_name).
+    Addresses compare case-insensitively; `TokenInfo.address` is always
+    checksummed. Networks and tokens can be registered at runtime or loaded
+    from a JSON or TOML file laid out like `to_dict()`:
+
+        {
+            "networks": {"sei": "1329"},
+            "tokens": {
+                "1329": [
+                    {
+                        "human_name": "usdc",
+                        "address": "0x...",
+                        "name": "USDC",
+                        "decimals": 6,
+                        "version": "2"
+                    }
+                ]
+            }
+        }
+
+    Lookups read plain dicts and take no lock; registration is serialized.
+    """
+
+    def __init__(
+        self,
+        networks: Optional[Mapping[str, Union[str, int]]] = None,
+        tokens: Optional[Mapping[Union[str, int], List[Mapping[str, Any]]]] = None,
+    ):
+        self._lock = threading.Lock()
+        self._networks: Dict[str, str] = {}
+        self._by_address: Dict[Tuple[str, str], TokenInfo] = {}
+        self._by_name: Dict[Tuple[str, str], TokenInfo] = {}
+        self.update({"networks": networks or {}, "tokens": tokens or {}})
+
+    @property
+    def networks(self) -> Tuple[str, ...]:
+        """Names of the registered networks."""
+        return tuple(self._networks)
+
+    def register_network(self, network: str, chain_id: Union[str, int]) -> None:
+        """Register a human readable network name for a chain ID."""
+        with self._lock:
+            self._networks[network] = str(int(chain_id))
+
+    def register_token(
+        self,
+        chain_id: Union[str, int],
+        address: str,
+        name: str,
+        decimals: int,
+        version: str,
+        human_name: Optional[str] = None,
+    ) -> TokenInfo:
+        """Register a token, replacing any token at the same address.
+
+        Args:
+            chain_id: Chain the token contract is deployed on
+            address: Token contract address
+            name: EIP-712 domain name, exactly as returned by name() on the contract
+            decimals: Token decimals
+            version: EIP-712 domain version
+            human_name: Short name used to look up default tokens, e.g. "usdc"
+        """
+        token = TokenInfo(
+            chain_id=str(int(chain_id)),
+            address=to_checksum_address(address),
+            human_name=human_name or name.lower(),
+            name=name,
+            decimals=int(decimals),
+            version=str(version),
+        )
+        name_key = (token.chain_id, token.human_name)
+        with self._lock:
+            # The first token registered under a human name stays the default
+            default = self._by_name.get(name_key)
+            if default is None or default.address == token.address:
+                self._by_name[name_key] = token
+            self._by_address[(token.chain_id, token.address.lower())] = token
+        return token
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The registered networks and tokens, laid out as in the class docstring."""
+        with self._lock:
+            networks = dict(self._networks)
+            tokens = list(self._by_address.values())
+        by_chain: Dict[str, List[Dict[str, Any]]] = {}
+        for token in tokens:
+            by_chain.setdefault(token.chain_id, []).append(
+                {
+                    "human_name": token.human_name,
+                    "address": token.address,
+                    "name": token.name,
+                    "decimals": token.decimals,
+                    "version": token.version,
+                }
+            )
+        return {"networks": networks, "tokens": by_chain}
+
+    def update(self, data: Mapping[str, Any]) -> None:
+        """Register the networks and tokens in a mapping laid out as in the class docstring."""
+        for network, chain_id in data.get("networks", {}).items():
+            self.register_network(network, chain_id)
+        for chain_id, tokens in data.get("tokens", {}).items():
+            for token in tokens:
+                self.register_token(
+                    chain_id,
+                    token["address"],
+                    token["name"],
+                    token["decimals"],
+                    token["version"],
+                    token.get("human_name"),
+                )
+
+    def load(self, path: Union[str, PathLike]) -> None:
+        """Register the networks and tokens in a JSON or TOML file.
+
+        Files ending in `.toml` are parsed as TOML, with the `tomli` dependency
+        before Python 3.11; anything else is parsed as JSON.
+        """
+        path = Path(path)
+        if path.suffix == ".toml":
+            if sys.version_info >= (3, 11):
+                import tomllib
+            else:
+                import tomli as tomllib
+            with path.open("rb") as f:
+                data = tomllib.load(f)
+        else:
+            with path.open("rb") as f:
+                data = json.load(f)
+        self.update(data)
+
+    def chain_id(self, network: str) -> str:
+        """Get the chain ID for a network name or string encoded chain ID."""
+        chain_id = self._networks.get(network)
+        if chain_id is not None:
+            return chain_id
+        try:
+            int(network)
+            return network
+        except ValueError:
+            raise ValueError(f"Unsupported network: {network}") from None
+
+    def has_network(self, network: str) -> bool:
+        """Whether a network name is registered."""
+        return network in self._networks
+
+    def token(self, chain_id: Union[str, int], address: str) -> TokenInfo:
+        """Get the token at an address on a chain."""
+        token = self._by_address.get((str(chain_id), address.lower()))
+        if token is None:
+            raise ValueError(
+                f"Token not found for chain {chain_id} and address {address}"
+            )
+        return token
+
+    def default_token(
+        self, chain_id: Union[str, int], token_type: str = "usdc"
+    ) -> TokenInfo:
+        """Get the default token of a type, e.g. "usdc", on a chain."""
+        token = self._by_name.get((str(chain_id), token_type))
+        if token is None:
+            raise ValueError(
+                f"Token type '{token_type}' not found for chain {chain_id}"
+            )
+        return token
+
+
+# Register more networks and tokens on `registry` instead of editing the built-in ones
+registry = TokenRegistry(_BUILTIN_NETWORKS, _BUILTIN_TOKENS)
+
+
+def __getattr__(name: str) -> Any:
+    # Built from the registry on access, so registered networks and tokens appear
+    if name == "NETWORK_TO_ID":
+        return registry.to_dict()["networks"]
+    if name == "KNOWN_TOKENS":
+        return registry.to_dict()["tokens"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_chain_id(network: str) -> str:
+    """Get the chain ID for a given network
+    Supports string encoded chain IDs and human readable networks
+    """
+    return registry.chain_id(network)
+
+
 def get_token_name(chain_id: str, address: str) -> str:
     """Get the token name for a given chain and address"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["address"] == address:
-            return token["name"]
-    raise ValueError(f"Token not found for chain {chain_id} and address {address}")
+    return registry.token(chain_id, address).name
 
 
 def get_token_version(chain_id: str, address: str) -> str:
     """Get the token version for a given chain and address"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["address"] == address:
-            return token["version"]
-    raise ValueError(f"Token not found for chain {chain_id} and address {address}")
+    return registry.token(chain_id, address).version
 
 
 def get_token_decimals(chain_id: str, address: str) -> int:
     """Get the token decimals for a given chain and address"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["address"] == address:
-            return token["decimals"]
-    raise ValueError(f"Token not found for chain {chain_id} and address {address}")
+    return registry.token(chain_id, address).decimals
 
 
 def get_default_token_address(chain_id: str, token_type: str = "usdc") -> str:
     """Get the default token address for a given chain and token type"""
-    for token in KNOWN_TOKENS[chain_id]:
-        if token["human_name"] == token_type:
-            return token["address"]
-    raise ValueError(f"Token type '{token_type}' not found for chain {chain_id}")
+    return registry.default_token(chain_id, token_type).address
@@ -1,20 +1,31 @@
-from x402.clients.base import x402Client, decode_x_payment_response
+from x402.clients.base import (
+    PaymentRequirementsCache,
+    x402Client,
+    decode_x_payment_response,
+)
 from x402.clients.httpx import (
     x402_payment_hooks,
     x402HttpxClient,
+    x402Transport,
 )
+from x402.clients.presign import PresignedPaymentPool
 from x402.clients.requests import (
     x402HTTPAdapter,
+    x402_fetch_all,
     x402_http_adapter,
     x402_requests,
 )
 
 __all__ = [
     "x402Client",
+    "PaymentRequirementsCache",
+    "PresignedPaymentPool",
     "decode_x_payment_response",
     "x402_payment_hooks",
     "x402HttpxClient",
+    "x402Transport",
     "x402HTTPAdapter",
     "x402_http_adapter",
     "x402_requests",
+    "x402_fetch_all",
 ]
@@ -1,16 +1,21 @@
 import time
-from typing import Optional, Callable, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Callable, Dict, Any, List, Tuple
 from eth_account import Account
 from x402.exact import sign_payment_header
+from x402.cache import LRUCache
 from x402.types import (
     PaymentRequirements,
     UnsupportedSchemeException,
+    x402PaymentRequiredResponse,
 )
 from x402.common import x402_VERSION
 import secrets
 from x402.encoding import safe_base64_decode
 import json
 
+if TYPE_CHECKING:
+    from x402.clients.presign import PresignedPaymentPool
+
 # Define type for the payment requirements selector
 PaymentSelectorCallable = Callable[
     [List[PaymentRequirements], Optional[str], Optional[str], Optional[int]],
@@ -60,6 +65,92 @@ class PaymentAlreadyAttemptedError(PaymentError):
     pass
 
 
+DEFAULT_REQUIREMENTS_TTL_SECONDS = 300.0
+DEFAULT_REQUIREMENTS_CACHE_SIZE = 1024
+
+
+class PaymentRequirementsCache:
+    """Payment requirements last returned for each URL, for paying up front.
+
+    Clients given a cache sign a payment from the cached requirements and send
+    it with the first request, saving the unpaid round trip that would only
+    return a 402. Entries expire after `ttl` seconds, and clients invalidate an
+    entry whenever a payment made from it is refused. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_REQUIREMENTS_TTL_SECONDS,
+        maxsize: int = DEFAULT_REQUIREMENTS_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds requirements are reused before they are fetched again
+            maxsize: Maximum number of URLs kept
+            clock: Function returning the current time in seconds, for testing
+        """
+        self.ttl = ttl
+        self._entries: LRUCache[str, Tuple[float, x402PaymentRequiredResponse]] = (
+            LRUCache(maxsize)
+        )
+        self._clock = clock
+
+    def get(self, url: str) -> Optional[x402PaymentRequiredResponse]:
+        """Return the cached 402 response for a URL, or None if unknown or expired."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        expires_at, payment_response = entry
+        if expires_at <= self._clock():
+            self._entries.pop(url)
+            return None
+        return payment_response
+
+    def set(self, url: str, payment_response: x402PaymentRequiredResponse) -> None:
+        """Cache the 402 response a URL returned."""
+        self._entries.set(url, (self._clock() + self.ttl, payment_response))
+
+    def invalidate(self, url: str) -> None:
+        """Forget a URL's requirements, e.g. after a payment was refused."""
+        self._entries.pop(url)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def signed_payment_header(
+    account: Account,
+    payment_requirements: PaymentRequirements,
+    x402_version: int,
+    nonce: str,
+) -> str:
+    """Build and sign a payment header with the given nonce.
+
+    A module-level function so it can be submitted to a process pool.
+    """
+    now = int(time.time())
+    unsigned_header = {
+        "x402Version": x402_version,
+        "scheme": payment_requirements.scheme,
+        "network": payment_requirements.network,
+        "payload": {
+            "signature": None,
+            "authorization": {
+                "from": account.address,
+                "to": payment_requirements.pay_to,
+                "value": payment_requirements.max_amount_required,
+                "validAfter": str(now - 60),  # 60 seconds before
+                "validBefore": str(now + payment_requirements.max_timeout_seconds),
+                "nonce": nonce,
+            },
+        },
+    }
+
+    return sign_payment_header(account, payment_requirements, unsigned_header)
+
+
 class x402Client:
     """Base client for handling x402 payments."""
 
@@ -78,6 +169,8 @@ class x402Client:
         """
         self.account = account
         self.max_value = max_value
+        # Set by PresignedPaymentPool to hand out headers signed in the background
+        self.presigned_pool: Optional["PresignedPaymentPool"] = None
         self._payment_requirements_selector = (
             payment_requirements_selector or self.default_payment_requirements_selector
         )
@@ -160,6 +253,9 @@ class x402Client:
     ) -> str:
         """Create a payment header for the given requirements.
 
+        A header is taken from the attached `presigned_pool` when it has one
+        ready, and signed on the spot otherwise.
+
         Args:
             payment_requirements: Selected payment requirements
             x402_version: x402 protocol version
@@ -167,31 +263,63 @@ class x402Client:
         Returns:
             Signed payment header
         """
-        unsigned_header = {
-            "x402Version": x402_version,
-            "scheme": payment_requirements.scheme,
-            "network": payment_requirements.network,
-            "payload": {
-                "signature": None,
-                "authorization": {
-                    "from": self.account.address,
-                    "to": payment_requirements.pay_to,
-                    "value": payment_requirements.max_amount_required,
-                    "validAfter": str(int(time.time()) - 60),  # 60 seconds before
-                    "validBefore": str(
-                        int(time.time()) + payment_requirements.max_timeout_seconds
-                    ),
-                    "nonce": self.generate_nonce(),
-                },
-            },
-        }
+        if self.presigned_pool is not None:
+            header = self.presigned_pool.take(payment_requirements, x402_version)
+            if header is not None:
+                return header
+        return self.sign_payment(payment_requirements, x402_version)
 
-        signed_header = sign_payment_header(
-            self.account,
-            payment_requirements,
-            unsigned_header,
+    def sign_payment(
+        self,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+    ) -> str:
+        """Sign a new payment header for the given requirements.
+
+        Args:
+            payment_requirements: Selected payment requirements
+            x402_version: x402 protocol version
+
+        Returns:
+            Signed payment header
+        """
+        return signed_payment_header(
+            self.account, payment_requirements, x402_version, self.generate_nonce()
+        )
+
+    def presigned_header_for(
+        self, payment_response: x402PaymentRequiredResponse
+    ) -> Optional[str]:
+        """Return a ready presigned header for a 402 response, or None.
+
+        Never signs, so it is cheap enough to call on an event loop.
+        """
+        if self.presigned_pool is None:
+            return None
+        selected_requirements = self.select_payment_requirements(
+            payment_response.accepts
+        )
+        return self.presigned_pool.take(
+            selected_requirements, payment_response.x402_version
+        )
+
+    def create_payment_header_for(
+        self, payment_response: x402PaymentRequiredResponse
+    ) -> str:
+        """Select requirements from a 402 response and sign a payment for them.
+
+        Args:
+            payment_response: Parsed body of a 402 Payment Required response
+
+        Returns:
+            Signed payment header
+        """
+        selected_requirements = self.select_payment_requirements(
+            payment_response.accepts
+        )
+        return self.create_payment_header(
+            selected_requirements, payment_response.x402_version
         )
-        return signed_header
 
     def generate_nonce(self):
         # Generate a random nonce (32 bytes = 64 hex chars)
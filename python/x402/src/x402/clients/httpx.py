@@ -1,8 +1,20 @@
-from typing import Optional, Dict, List
-from httpx import Request, Response, AsyncClient
+import asyncio
+import ipaddress
+import json
+from typing import Any, Optional, Dict, List, Mapping, Tuple
+from urllib.request import getproxies
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    ByteStream,
+    Request,
+    Response,
+)
 from eth_account import Account
 from x402.clients.base import (
     x402Client,
+    PaymentRequirementsCache,
     MissingRequestConfigError,
     PaymentError,
     PaymentSelectorCallable,
@@ -10,10 +22,138 @@ from x402.clients.base import (
 from x402.types import x402PaymentRequiredResponse
 
 
+async def _create_payment_header(
+    client: x402Client, payment_response: x402PaymentRequiredResponse
+) -> str:
+    """Sign a payment for a 402 response without blocking the event loop."""
+    try:
+        payment_header = client.presigned_header_for(payment_response)
+        if payment_header is None:
+            # Signing takes milliseconds of CPU, so it runs on a worker thread
+            payment_header = await asyncio.to_thread(
+                client.create_payment_header_for, payment_response
+            )
+        return payment_header
+    except PaymentError:
+        raise
+    except Exception as e:
+        raise PaymentError(f"Failed to handle payment: {str(e)}") from e
+
+
+async def _sign_payment(
+    client: x402Client, body: bytes
+) -> Tuple[x402PaymentRequiredResponse, str]:
+    """Parse a 402 response body and sign a payment for it."""
+    try:
+        payment_response = x402PaymentRequiredResponse(**json.loads(body))
+    except Exception as e:
+        raise PaymentError(f"Failed to handle payment: {str(e)}") from e
+    return payment_response, await _create_payment_header(client, payment_response)
+
+
+def _add_payment_header(request: Request, payment_header: str) -> None:
+    request.headers["X-Payment"] = payment_header
+    request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
+
+
+class x402Transport(AsyncBaseTransport):
+    """Transport that pays for 402 responses and retries on the same connection pool.
+
+    Wraps the transport of an `AsyncClient`, so the paid retry goes through the
+    client's own pool, proxies, timeouts and HTTP/2 settings. Whether a request
+    has been paid for is read from the request itself, so concurrent requests
+    on one client do not share retry state.
+
+    With a `requirements_cache`, requests to a URL whose requirements are
+    cached are paid for up front, in a single round trip. If that payment is
+    refused, the entry is dropped and the request is paid for again using the
+    requirements from the 402 response.
+
+    Only bodies held in memory can be sent twice. Streamed uploads are passed
+    through without being buffered, and a 402 answering one is returned as is;
+    they are only paid for up front from cached requirements.
+    """
+
+    def __init__(
+        self,
+        transport: AsyncBaseTransport,
+        client: x402Client,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
+    ):
+        """Initialize the transport.
+
+        Args:
+            transport: Transport that sends the requests
+            client: x402Client used to select requirements and sign payments
+            requirements_cache: Optional cache of requirements per URL for paying up front
+        """
+        self.transport = transport
+        self.client = client
+        self.requirements_cache = requirements_cache
+
+    async def _send_paid(self, request: Request, payment_header: str) -> Response:
+        paid = Request(
+            request.method,
+            request.url,
+            headers=request.headers.copy(),
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+        _add_payment_header(paid, payment_header)
+        return await self.transport.handle_async_request(paid)
+
+    async def handle_async_request(self, request: Request) -> Response:
+        # Requests that already carry a payment are never paid for again
+        if "X-Payment" in request.headers:
+            return await self.transport.handle_async_request(request)
+
+        # Bodies held in memory can be sent again; streams only once
+        replayable = isinstance(request.stream, ByteStream)
+        url = str(request.url)
+        cache = self.requirements_cache
+        cached = cache.get(url) if cache is not None else None
+        if cached is not None:
+            payment_header = await _create_payment_header(self.client, cached)
+            response = await self._send_paid(request, payment_header)
+        else:
+            response = await self.transport.handle_async_request(request)
+        if response.status_code != 402:
+            return response
+
+        if cached is not None:
+            # The requirements changed or the payment was refused
+            cache.invalidate(url)
+        if not replayable:
+            return response
+
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+
+        payment_response, payment_header = await _sign_payment(self.client, body)
+        response = await self._send_paid(request, payment_header)
+        if cache is not None:
+            if response.status_code == 402:
+                cache.invalidate(url)
+            else:
+                cache.set(url, payment_response)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
 class HttpxHooks:
+    """Event hooks that pay for 402 responses of any `AsyncClient`.
+
+    Hooks cannot send through the client that invoked them, so the paid retry
+    uses a new `AsyncClient`. `x402HttpxClient` retries on its own connection
+    pool instead and should be preferred.
+    """
+
     def __init__(self, client: x402Client):
         self.client = client
-        self._is_retry = False
 
     async def on_request(self, request: Request):
         """Handle request before it is sent."""
@@ -26,37 +166,21 @@ class HttpxHooks:
         if response.status_code != 402:
             return response
 
-        # If this is a retry response, just return it
-        if self._is_retry:
-            return response
-
         try:
             if not response.request:
                 raise MissingRequestConfigError("Missing request configuration")
 
-            # Read the response content before parsing
-            await response.aread()
-
-            data = response.json()
-
-            payment_response = x402PaymentRequiredResponse(**data)
-
-            # Select payment requirements
-            selected_requirements = self.client.select_payment_requirements(
-                payment_response.accepts
-            )
+            request = response.request
 
-            # Create payment header
-            payment_header = self.client.create_payment_header(
-                selected_requirements, payment_response.x402_version
-            )
+            # If the request was already paid for, this is the retry's response
+            if "X-Payment" in request.headers:
+                return response
 
-            # Mark as retry and add payment header
-            self._is_retry = True
-            request = response.request
+            # Read the response content before parsing
+            await response.aread()
 
-            request.headers["X-Payment"] = payment_header
-            request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
+            _, payment_header = await _sign_payment(self.client, response.content)
+            _add_payment_header(request, payment_header)
 
             # Retry the request
             async with AsyncClient() as client:
@@ -69,10 +193,8 @@ class HttpxHooks:
                 return response
 
         except PaymentError as e:
-            self._is_retry = False
             raise e
         except Exception as e:
-            self._is_retry = False
             raise PaymentError(f"Failed to handle payment: {str(e)}") from e
 
 
@@ -110,14 +232,58 @@ def x402_payment_hooks(
     }
 
 
+# AsyncClient arguments that configure the transports it creates
+_TRANSPORT_ARGS = ("verify", "cert", "trust_env", "http1", "http2", "limits")
+
+
+def _environment_proxies() -> Dict[str, Optional[str]]:
+    """Proxy URL per mount pattern from the environment, None for NO_PROXY hosts.
+
+    Follows httpx, which only reads proxies from the environment when it
+    creates the client's transport itself.
+    """
+    proxy_info = getproxies()
+    proxies: Dict[str, Optional[str]] = {}
+    for scheme in ("http", "https", "all"):
+        if proxy_info.get(scheme):
+            url = proxy_info[scheme]
+            proxies[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+
+    for host in (host.strip() for host in proxy_info.get("no", "").split(",")):
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            proxies[host] = None
+            continue
+        try:
+            address = ipaddress.ip_network(host, strict=False)
+        except ValueError:
+            address = None
+        if address is not None and address.version == 6:
+            proxies[f"all://[{host}]"] = None
+        elif address is not None or host.lower() == "localhost":
+            proxies[f"all://{host}"] = None
+        else:
+            proxies[f"all://*{host}"] = None
+    return proxies
+
+
 class x402HttpxClient(AsyncClient):
-    """AsyncClient with built-in x402 payment handling."""
+    """AsyncClient with built-in x402 payment handling.
+
+    402 responses are paid for and retried by an `x402Transport` wrapped around
+    the client's transports, so paid calls reuse the client's connection pool
+    and one client can be shared by any number of concurrent requests.
+    """
 
     def __init__(
         self,
         account: Account,
         max_value: Optional[int] = None,
         payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
         **kwargs,
     ):
         """Initialize an AsyncClient with x402 payment handling.
@@ -128,9 +294,57 @@ class x402HttpxClient(AsyncClient):
             payment_requirements_selector: Optional custom selector for payment requirements.
                 Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
                 and returns a PaymentRequirements object.
+            requirements_cache: Optional cache of payment requirements per URL. Repeated
+                calls to a URL are then paid for up front, in one round trip instead of two.
             **kwargs: Additional arguments to pass to AsyncClient
         """
-        super().__init__(**kwargs)
-        self.event_hooks = x402_payment_hooks(
-            account, max_value, payment_requirements_selector
+        self.x402_client = x402Client(
+            account,
+            max_value=max_value,
+            payment_requirements_selector=payment_requirements_selector,
+        )
+        self.requirements_cache = requirements_cache
+        transport, mounts = self._payment_transports(kwargs)
+        super().__init__(transport=transport, mounts=mounts, **kwargs)
+
+    def _payment_transports(
+        self, kwargs: Dict[str, Any]
+    ) -> Tuple[x402Transport, Dict[str, Optional[x402Transport]]]:
+        """Build the transports AsyncClient would, each wrapped in an x402Transport.
+
+        Removes `transport`, `proxy` and `mounts` from `kwargs`. Proxy mounts
+        get the same handling; None entries send a pattern through the
+        default transport.
+        """
+        transport_args = {key: kwargs[key] for key in _TRANSPORT_ARGS if key in kwargs}
+        transport = kwargs.pop("transport", None)
+        proxy = kwargs.pop("proxy", None)
+        mounts: Mapping[str, Optional[AsyncBaseTransport]] = (
+            kwargs.pop("mounts", None) or {}
+        )
+
+        if proxy is not None:
+            proxies: Dict[str, Optional[Any]] = {"all://": proxy}
+        elif transport is None and kwargs.get("trust_env", True):
+            proxies = _environment_proxies()
+        else:
+            proxies = {}
+
+        def wrap(inner: AsyncBaseTransport) -> x402Transport:
+            return x402Transport(inner, self.x402_client, self.requirements_cache)
+
+        wrapped: Dict[str, Optional[x402Transport]] = {
+            pattern: (
+                wrap(AsyncHTTPTransport(proxy=url, **transport_args))
+                if url is not None
+                else None
+            )
+            for pattern, url in proxies.items()
+        }
+        wrapped.update(
+            {
+                pattern: wrap(inner) if inner is not None else None
+                for pattern, inner in mounts.items()
+            }
         )
+        return wrap(transport or AsyncHTTPTransport(**transport_args)), wrapped
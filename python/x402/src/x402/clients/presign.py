@@ -0,0 +1,260 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Deque, Optional, Tuple
+
+from x402.clients.base import x402Client
+from x402.common import x402_VERSION
+from x402.exact import sign_payment_headers_batch
+from x402.types import PaymentRequirements
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_REFRESH_MARGIN_SECONDS = 30.0
+DEFAULT_MAX_SLOTS = 64
+DEFAULT_IDLE_TTL_SECONDS = 600.0
+
+_RequirementsKey = Tuple[int, str, str, str, str, str, int, str]
+
+
+def _requirements_key(
+    requirements: PaymentRequirements, x402_version: int
+) -> _RequirementsKey:
+    # Everything that ends up in the signed authorization or its EIP-712 domain
+    return (
+        x402_version,
+        requirements.scheme,
+        requirements.network,
+        requirements.asset.lower(),
+        requirements.pay_to.lower(),
+        requirements.max_amount_required,
+        requirements.max_timeout_seconds,
+        json.dumps(requirements.extra, sort_keys=True),
+    )
+
+
+class _Slot:
+    """Presigned headers for one set of requirements."""
+
+    __slots__ = ("requirements", "x402_version", "headers", "pending", "last_used")
+
+    def __init__(
+        self, requirements: PaymentRequirements, x402_version: int, now: float
+    ):
+        self.requirements = requirements
+        self.x402_version = x402_version
+        # (valid_before, header), oldest first
+        self.headers: Deque[Tuple[float, str]] = deque()
+        self.pending = 0
+        self.last_used = now
+
+
+class PresignedPaymentPool:
+    """Keeps signed payment headers ready for known payment requirements.
+
+    Signing a payment hashes EIP-712 typed data and computes a secp256k1
+    signature, which takes milliseconds. The pool does that ahead of time on
+    an executor, signing each refill as one batch, so a client answering a 402
+    only pops a ready header.
+
+    Requirements become known when passed to `add`, or on the first `take` for
+    them, which misses and schedules a fill. Every header carries its own
+    nonce and is handed out once. Headers are dropped `refresh_margin` seconds
+    before their `validBefore`, and a background thread replaces them, so a
+    header from the pool is always accepted by a server.
+
+    At most `max_slots` sets of requirements are kept, evicting the least
+    recently used. Requirements not taken from for `idle_ttl` seconds are no
+    longer refilled, and forgotten once their headers have expired.
+
+    Attaching a pool to an `x402Client` makes its `create_payment_header` use
+    it, so the httpx and requests clients need no other changes.
+    """
+
+    def __init__(
+        self,
+        client: x402Client,
+        size: int = DEFAULT_POOL_SIZE,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        executor: Optional[Executor] = None,
+        clock: Callable[[], float] = time.time,
+        max_slots: int = DEFAULT_MAX_SLOTS,
+        idle_ttl: Optional[float] = DEFAULT_IDLE_TTL_SECONDS,
+    ):
+        """Initialize the pool and attach it to a client.
+
+        Args:
+            client: Client whose account signs the payments
+            size: Number of headers kept ready per set of requirements
+            refresh_margin: Seconds before `validBefore` at which a header is replaced
+            executor: Executor to sign on. Defaults to a single background thread.
+                A ProcessPoolExecutor spreads signing over several cores.
+            clock: Function returning the current unix time, for testing
+            max_slots: Maximum number of sets of requirements to keep headers for
+            idle_ttl: Seconds after the last `add` or `take` for a set of
+                requirements at which its headers stop being replaced. None
+                keeps replacing them for as long as the pool is open.
+        """
+        if size <= 0:
+            raise ValueError("size must be positive")
+        if max_slots <= 0:
+            raise ValueError("max_slots must be positive")
+        self.client = client
+        self.size = size
+        self.refresh_margin = refresh_margin
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="x402-presign"
+        )
+        self._clock = clock
+        self.max_slots = max_slots
+        self.idle_ttl = idle_ttl
+        # Reentrant: a done callback can run inside submit() while _fill holds it
+        self._lock = threading.RLock()
+        # Least recently used first
+        self._slots: "OrderedDict[_RequirementsKey, _Slot]" = OrderedDict()
+        self._closed = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        client.presigned_pool = self
+
+    def add(
+        self, requirements: PaymentRequirements, x402_version: int = x402_VERSION
+    ) -> None:
+        """Start keeping headers ready for the given requirements."""
+        with self._lock:
+            self._fill(self._slot(requirements, x402_version))
+
+    def take(
+        self, requirements: PaymentRequirements, x402_version: int = x402_VERSION
+    ) -> Optional[str]:
+        """Pop a ready header for the requirements, or return None if none is ready.
+
+        Never blocks on signing. A miss registers the requirements, so later
+        calls find headers ready.
+        """
+        with self._lock:
+            slot = self._slot(requirements, x402_version)
+            self._drop_expired(slot)
+            header = slot.headers.popleft()[1] if slot.headers else None
+            self._fill(slot)
+        return header
+
+    def ready(
+        self, requirements: PaymentRequirements, x402_version: int = x402_VERSION
+    ) -> int:
+        """Number of headers ready for the requirements."""
+        with self._lock:
+            slot = self._slots.get(_requirements_key(requirements, x402_version))
+            if slot is None:
+                return 0
+            self._drop_expired(slot)
+            return len(slot.headers)
+
+    def close(self) -> None:
+        """Stop refilling and detach the pool from its client."""
+        self._closed.set()
+        if self.client.presigned_pool is self:
+            self.client.presigned_pool = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "PresignedPaymentPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _slot(self, requirements: PaymentRequirements, x402_version: int) -> _Slot:
+        """Return the slot for the requirements, creating it, and mark it used.
+
+        Called with _lock held.
+        """
+        key = _requirements_key(requirements, x402_version)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot(requirements, x402_version, self._clock())
+            if len(self._slots) > self.max_slots:
+                # Signings still running for it complete into the dropped slot
+                self._slots.popitem(last=False)
+            self._start_refresher()
+        else:
+            slot.last_used = self._clock()
+            self._slots.move_to_end(key)
+        return slot
+
+    def _drop_expired(self, slot: _Slot) -> None:
+        """Drop headers too close to expiry. Called with _lock held."""
+        deadline = self._clock() + self.refresh_margin
+        while slot.headers and slot.headers[0][0] <= deadline:
+            slot.headers.popleft()
+
+    def _fill(self, slot: _Slot) -> None:
+        """Schedule signing up to the pool size. Called with _lock held."""
+        if self._closed.is_set():
+            return
+        missing = self.size - len(slot.headers) - slot.pending
+        if missing <= 0:
+            return
+        # Conservative: validBefore is computed a little later while signing
+        valid_before = self._clock() + slot.requirements.max_timeout_seconds
+        if valid_before - self.refresh_margin <= self._clock():
+            # Would expire before it could be used
+            return
+        # From the client, so an overridden generate_nonce applies here too
+        nonces = [self.client.generate_nonce() for _ in range(missing)]
+        try:
+            future = self._executor.submit(
+                sign_payment_headers_batch,
+                self.client.account,
+                slot.requirements,
+                missing,
+                slot.x402_version,
+                nonces=nonces,
+            )
+        except RuntimeError:
+            # The executor was shut down
+            return
+        slot.pending += missing
+        future.add_done_callback(
+            lambda f, slot=slot, count=missing, valid_before=valid_before: self._signed(
+                slot, count, valid_before, f
+            )
+        )
+
+    def _signed(
+        self, slot: _Slot, count: int, valid_before: float, future: Future
+    ) -> None:
+        with self._lock:
+            slot.pending -= count
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                logger.warning("Presigning payment headers failed: %s", error)
+                return
+            slot.headers.extend((valid_before, header) for header in future.result())
+
+    def _start_refresher(self) -> None:
+        """Start the thread that replaces expiring headers. Called with _lock held."""
+        if self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="x402-presign-refresh", daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        interval = max(self.refresh_margin / 2, 0.1)
+        while not self._closed.wait(interval):
+            with self._lock:
+                now = self._clock()
+                for key, slot in list(self._slots.items()):
+                    self._drop_expired(slot)
+                    if self.idle_ttl is None or now - slot.last_used < self.idle_ttl:
+                        self._fill(slot)
+                    elif not slot.headers and not slot.pending:
+                        del self._slots[key]
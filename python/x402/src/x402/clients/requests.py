@@ -1,30 +1,53 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Union
 import requests
 import json
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from eth_account import Account
 from x402.clients.base import (
     x402Client,
+    PaymentRequirementsCache,
     PaymentError,
     PaymentSelectorCallable,
 )
 from x402.types import x402PaymentRequiredResponse
-import copy
 
 
 class x402HTTPAdapter(HTTPAdapter):
-    """HTTP adapter for handling x402 payment required responses."""
+    """HTTP adapter for handling x402 payment required responses.
 
-    def __init__(self, client: x402Client, **kwargs):
+    The adapter keeps no per-request state: whether a request has been paid
+    for is read from its own headers, so one adapter, and the session it is
+    mounted on, can be shared between threads.
+
+    With a `requirements_cache`, requests to a URL whose requirements are
+    cached are paid for up front, in a single round trip. If that payment is
+    refused, the entry is dropped and the request is paid for again using the
+    requirements from the 402 response.
+    """
+
+    def __init__(
+        self,
+        client: x402Client,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
+        **kwargs,
+    ):
         """Initialize the adapter with an x402Client.
 
         Args:
             client: x402Client instance for handling payments
+            requirements_cache: Optional cache of requirements per URL for paying up front
             **kwargs: Additional arguments to pass to HTTPAdapter
         """
         super().__init__(**kwargs)
         self.client = client
-        self._is_retry = False
+        self.requirements_cache = requirements_cache
+
+    def _send_paid(self, request, payment_header: str, **kwargs):
+        paid_request = request.copy()
+        paid_request.headers["X-Payment"] = payment_header
+        paid_request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
+        return super().send(paid_request, **kwargs)
 
     def send(self, request, **kwargs):
         """Send a request with payment handling for 402 responses.
@@ -36,21 +59,34 @@ class x402HTTPAdapter(HTTPAdapter):
         Returns:
             Response object
         """
-        if self._is_retry:
-            self._is_retry = False
+        # Requests that already carry a payment are never paid for again
+        if "X-Payment" in request.headers:
             return super().send(request, **kwargs)
 
-        response = super().send(request, **kwargs)
+        url = request.url
+        cache = self.requirements_cache
+        cached = cache.get(url) if cache is not None else None
+        if cached is not None:
+            try:
+                payment_header = self.client.create_payment_header_for(cached)
+            except PaymentError as e:
+                raise e
+            except Exception as e:
+                raise PaymentError(f"Failed to handle payment: {str(e)}") from e
+            response = self._send_paid(request, payment_header, **kwargs)
+        else:
+            response = super().send(request, **kwargs)
 
         if response.status_code != 402:
             return response
 
-        try:
-            # Save the content before we parse it to avoid consuming it
-            content = copy.deepcopy(response.content)
+        if cached is not None:
+            # The requirements changed or the payment was refused
+            cache.invalidate(url)
 
-            # Parse the JSON content without using response.json() which consumes it
-            data = json.loads(content.decode("utf-8"))
+        try:
+            # response.content reads the body once and keeps it
+            data = json.loads(response.content)
             payment_response = x402PaymentRequiredResponse(**data)
 
             # Select payment requirements
@@ -62,32 +98,28 @@ class x402HTTPAdapter(HTTPAdapter):
             payment_header = self.client.create_payment_header(
                 selected_requirements, payment_response.x402_version
             )
-
-            # Mark as retry and add payment header
-            self._is_retry = True
-            request.headers["X-Payment"] = payment_header
-            request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
-
-            retry_response = super().send(request, **kwargs)
-
-            # Copy the retry response data to the original response
-            response.status_code = retry_response.status_code
-            response.headers = retry_response.headers
-            response._content = retry_response.content
-            return response
-
         except PaymentError as e:
-            self._is_retry = False
             raise e
         except Exception as e:
-            self._is_retry = False
             raise PaymentError(f"Failed to handle payment: {str(e)}") from e
 
+        # Release the connection to the pool before the paid retry
+        response.close()
+
+        response = self._send_paid(request, payment_header, **kwargs)
+        if cache is not None:
+            if response.status_code == 402:
+                cache.invalidate(url)
+            else:
+                cache.set(url, payment_response)
+        return response
+
 
 def x402_http_adapter(
     account: Account,
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
     **kwargs,
 ) -> x402HTTPAdapter:
     """Create an HTTP adapter that handles 402 Payment Required responses.
@@ -98,6 +130,8 @@ def x402_http_adapter(
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        requirements_cache: Optional cache of payment requirements per URL. Repeated
+            calls to a URL are then paid for up front, in one round trip instead of two.
         **kwargs: Additional arguments to pass to HTTPAdapter
 
     Returns:
@@ -108,13 +142,14 @@ def x402_http_adapter(
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
     )
-    return x402HTTPAdapter(client, **kwargs)
+    return x402HTTPAdapter(client, requirements_cache=requirements_cache, **kwargs)
 
 
 def x402_requests(
     account: Account,
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
     **kwargs,
 ) -> requests.Session:
     """Create a requests session with x402 payment handling.
@@ -125,6 +160,8 @@ def x402_requests(
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        requirements_cache: Optional cache of payment requirements per URL. Repeated
+            calls to a URL are then paid for up front, in one round trip instead of two.
         **kwargs: Additional arguments to pass to HTTPAdapter
 
     Returns:
@@ -135,6 +172,7 @@ def x402_requests(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
         **kwargs,
     )
 
@@ -143,3 +181,41 @@ def x402_requests(
     session.mount("https://", adapter)
 
     return session
+
+
+def x402_fetch_all(
+    session: requests.Session,
+    urls: Iterable[str],
+    method: str = "GET",
+    max_workers: int = DEFAULT_POOLSIZE,
+    **kwargs,
+) -> List[Union[requests.Response, Exception]]:
+    """Request many URLs concurrently on one session, paying for each as needed.
+
+    Requests run on a bounded thread pool and share the session's urllib3
+    connection pools. Keep `max_workers` at or below the adapter's
+    `pool_maxsize` (10 by default), or connections beyond the pool size are
+    opened and discarded for every request.
+
+    A failed request does not abort the others, since they may already have
+    been paid for: its exception is returned in place of the response.
+
+    Args:
+        session: Session with an x402 adapter mounted, e.g. from `x402_requests`
+        urls: URLs to request
+        method: HTTP method for every request
+        max_workers: Maximum number of requests in flight
+        **kwargs: Additional arguments to pass to `session.request`
+
+    Returns:
+        A response or exception for each URL, in the order of `urls`
+    """
+
+    def fetch(url: str) -> Union[requests.Response, Exception]:
+        try:
+            return session.request(method, url, **kwargs)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch, urls))
@@ -1,14 +1,18 @@
 from decimal import Decimal
-from typing import List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 from x402.chains import (
     get_chain_id,
     get_token_decimals,
-    get_token_name,
-    get_token_version,
     get_default_token_address,
+    TokenInfo,
+    registry,
 )
-from x402.types import Price, TokenAmount, PaymentRequirements, PaymentPayload
+from x402.types import Money, Price, TokenAmount, PaymentRequirements, PaymentPayload
+
+if TYPE_CHECKING:
+    from x402.decode import DecodedPayment
 
 
 def parse_money(amount: str | int, address: str, network: str) -> int:
@@ -29,6 +33,23 @@ def parse_money(amount: str | int, address: str, network: str) -> int:
     return amount
 
 
+DEFAULT_PRICE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DEFAULT_PRICE_CACHE_SIZE)
+def money_to_atomic_amount(price: Money, token: TokenInfo) -> str:
+    """Convert a USD amount such as "$0.01" into atomic units of a token.
+
+    Memoized by (price, token), and so by network and asset, since the token
+    carries its chain ID and address: with per-request pricing, the Decimal
+    arithmetic only runs once per distinct price point.
+    """
+    if isinstance(price, str) and price.startswith("$"):
+        price = price[1:]
+    amount = Decimal(str(price))
+    return str(int(amount * Decimal(10**token.decimals)))
+
+
 def process_price_to_atomic_amount(
     price: Price, network: str
 ) -> tuple[str, str, dict[str, str]]:
@@ -47,25 +68,16 @@ def process_price_to_atomic_amount(
     if isinstance(price, (str, int)):
         # Money type - convert USD to USDC atomic units
         try:
-            if isinstance(price, str) and price.startswith("$"):
-                price = price[1:]
-            amount = Decimal(str(price))
-
-            # Get USDC address for the network
-            chain_id = get_chain_id(network)
-            asset_address = get_usdc_address(chain_id)
-            decimals = get_token_decimals(chain_id, asset_address)
+            # Get USDC for the network
+            token = registry.default_token(get_chain_id(network), "usdc")
 
             # Convert to atomic units
-            atomic_amount = int(amount * Decimal(10**decimals))
+            atomic_amount = money_to_atomic_amount(price, token)
 
             # Get EIP-712 domain info
-            eip712_domain = {
-                "name": get_token_name(chain_id, asset_address),
-                "version": get_token_version(chain_id, asset_address),
-            }
+            eip712_domain = {"name": token.name, "version": token.version}
 
-            return str(atomic_amount), asset_address, eip712_domain
+            return atomic_amount, token.address, eip712_domain
 
         except (ValueError, KeyError) as e:
             raise ValueError(f"Invalid price format: {price}. Error: {e}")
@@ -91,24 +103,108 @@ def get_usdc_address(chain_id: int | str) -> str:
     return get_default_token_address(chain_id_str, "usdc")
 
 
+def _payment_terms(
+    payment: Union[PaymentPayload, "DecodedPayment"],
+) -> Optional[Tuple[str, int]]:
+    """The lowercased recipient and the value of a payment, if well formed."""
+    if isinstance(payment, PaymentPayload):
+        authorization = payment.payload.authorization
+        pay_to, value = authorization.to, authorization.value
+    else:
+        authorization = payment.authorization
+        pay_to, value = authorization.get("to"), authorization.get("value")
+    if not isinstance(pay_to, str) or not isinstance(value, str):
+        return None
+    try:
+        return pay_to.lower(), int(value)
+    except ValueError:
+        return None
+
+
+class PaymentRequirementsIndex:
+    """Payment requirements indexed for matching incoming payments.
+
+    Requirements are grouped by (scheme, network, payTo), each group ordered
+    from the highest `max_amount_required` down, so matching a payment is one
+    dict lookup plus a walk over the options for that recipient. The best
+    match is the most expensive option the payment's value covers.
+
+    An exact EVM payment does not name its asset; the asset only enters the
+    signature, through the EIP-712 domain. Options that differ only by asset
+    are therefore told apart by amount, and among equal amounts the first
+    one listed wins. Callers that know the asset can pass it to `match`.
+    """
+
+    __slots__ = ("accepts", "_index")
+
+    def __init__(self, accepts: List[PaymentRequirements]):
+        self.accepts = accepts
+        index: Dict[
+            Tuple[str, str, str], List[Tuple[int, str, PaymentRequirements]]
+        ] = {}
+        for requirements in accepts:
+            try:
+                amount = int(requirements.max_amount_required)
+            except ValueError:
+                continue
+            key = (
+                requirements.scheme,
+                requirements.network,
+                requirements.pay_to.lower(),
+            )
+            index.setdefault(key, []).append(
+                (amount, requirements.asset.lower(), requirements)
+            )
+        for options in index.values():
+            # Stable, so equal amounts keep their listed order
+            options.sort(key=lambda option: option[0], reverse=True)
+        self._index = index
+
+    def match(
+        self,
+        payment: Union[PaymentPayload, "DecodedPayment"],
+        asset: Optional[str] = None,
+    ) -> Optional[PaymentRequirements]:
+        """Return the best requirements the payment satisfies, or None.
+
+        Args:
+            payment: The payment, as a model or a decoded header
+            asset: Only consider requirements for this asset
+        """
+        terms = _payment_terms(payment)
+        if terms is None:
+            return None
+        pay_to, value = terms
+        options = self._index.get((payment.scheme, payment.network, pay_to))
+        if options is None:
+            return None
+        asset = asset.lower() if asset is not None else None
+        for amount, option_asset, requirements in options:
+            if amount <= value and (asset is None or asset == option_asset):
+                return requirements
+        return None
+
+
 def find_matching_payment_requirements(
     payment_requirements: List[PaymentRequirements],
-    payment: PaymentPayload,
+    payment: Union[PaymentPayload, "DecodedPayment"],
 ) -> Optional[PaymentRequirements]:
     """
     Finds the matching payment requirements for the given payment.
 
+    The requirements must have the payment's scheme, network and recipient,
+    and ask for no more than the payment's value. When several do, the most
+    expensive one is returned. To match many payments against the same
+    requirements, build a `PaymentRequirementsIndex` once instead.
+
     Args:
         payment_requirements: The payment requirements to search through
-        payment: The payment to match against
+        payment: The payment to match against, as a model or a decoded header
 
     Returns:
         The matching payment requirements or None if no match is found
     """
-    for req in payment_requirements:
-        if req.scheme == payment.scheme and req.network == payment.network:
-            return req
-    return None
+    return PaymentRequirementsIndex(payment_requirements).match(payment)
 
 
 x402_VERSION = 1
@@ -0,0 +1,99 @@
+import base64
+import binascii
+from typing import Any, Optional
+
+from pydantic import ValidationError
+from pydantic_core import from_json
+
+from x402.types import PaymentPayload
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class PaymentDecodeError(ValueError):
+    """Raised when an X-PAYMENT header is not a valid payment payload."""
+
+
+class DecodedPayment:
+    """Lightweight view of a decoded X-PAYMENT header.
+
+    Decoding only parses the JSON and reads the scheme and network, which,
+    with the raw authorization's recipient and value, is all that is needed
+    to pick the matching payment requirements. The
+    validated `PaymentPayload` is built on first access to `payment`, so
+    headers for a scheme or network the route does not accept never pay for
+    model validation.
+    """
+
+    __slots__ = ("header", "scheme", "network", "_data", "_payment")
+
+    def __init__(self, header: str, scheme: str, network: str, data: dict[str, Any]):
+        self.header = header
+        self.scheme = scheme
+        self.network = network
+        self._data = data
+        self._payment: Optional[PaymentPayload] = None
+
+    @property
+    def payment(self) -> PaymentPayload:
+        """The validated payload.
+
+        Raises:
+            PaymentDecodeError: If the header is not a valid payment payload
+        """
+        if self._payment is None:
+            try:
+                self._payment = PaymentPayload.model_validate(self._data)
+            except ValidationError as e:
+                raise PaymentDecodeError(str(e)) from e
+        return self._payment
+
+    @property
+    def payer(self) -> str:
+        return self.payment.payload.authorization.from_
+
+    @property
+    def authorization(self) -> dict[str, Any]:
+        """The raw, unvalidated authorization object, or {} if there is none."""
+        payload = self._data.get("payload")
+        authorization = (
+            payload.get("authorization") if isinstance(payload, dict) else None
+        )
+        return authorization if isinstance(authorization, dict) else {}
+
+    def __repr__(self) -> str:
+        return f"DecodedPayment(scheme={self.scheme!r}, network={self.network!r})"
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return from_json(data)
+
+
+def decode_payment_header(header: str) -> DecodedPayment:
+    """Decode a base64 X-PAYMENT header.
+
+    The JSON is parsed with `orjson` when it is installed, and otherwise with
+    pydantic's own parser, either of which is several times faster than the
+    standard library's `json`.
+
+    Raises:
+        PaymentDecodeError: If the header is not base64 encoded JSON with a
+            string scheme and network
+    """
+    try:
+        data = _loads(base64.b64decode(header))
+    except (binascii.Error, ValueError) as e:
+        raise PaymentDecodeError(f"Invalid payment header encoding: {e}") from e
+
+    if not isinstance(data, dict):
+        raise PaymentDecodeError("Payment header must be a JSON object")
+    scheme = data.get("scheme")
+    network = data.get("network")
+    if not isinstance(scheme, str) or not isinstance(network, str):
+        raise PaymentDecodeError("Payment header must have a scheme and network")
+    return DecodedPayment(header, scheme, network, data)
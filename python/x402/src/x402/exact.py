@@ -1,17 +1,40 @@
 import time
 import secrets
-from typing import Dict, Any
+from functools import lru_cache
+from concurrent.futures import Executor
+from typing import Callable, Dict, Any, List, Optional, Sequence
 from typing_extensions import (
     TypedDict,
 )  # use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12
 from eth_account import Account
+from eth_account.messages import encode_typed_data
+from eth_keys import keys
+from eth_keys.exceptions import BadSignature, ValidationError
+from eth_utils import keccak
 from x402.encoding import safe_base64_encode, safe_base64_decode
 from x402.types import (
+    PaymentPayload,
     PaymentRequirements,
+    VerifyResponse,
 )
-from x402.chains import get_chain_id
+from x402.chains import get_chain_id, get_token_name, get_token_version
+from x402.common import x402_VERSION
 import json
 
+TRANSFER_WITH_AUTHORIZATION_TYPES = {
+    "TransferWithAuthorization": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "value", "type": "uint256"},
+        {"name": "validAfter", "type": "uint256"},
+        {"name": "validBefore", "type": "uint256"},
+        {"name": "nonce", "type": "bytes32"},
+    ]
+}
+
+# Seconds an authorization must still be valid for, covering block inclusion time
+VALID_BEFORE_BUFFER_SECONDS = 6
+
 
 def create_nonce() -> bytes:
     """Create a random 32-byte nonce for authorization signatures."""
@@ -51,6 +74,50 @@ class PaymentHeader(TypedDict):
     payload: dict[str, Any]
 
 
+def transfer_with_authorization_typed_data(
+    payment_requirements: PaymentRequirements, authorization: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build the EIP-712 TransferWithAuthorization typed data for an authorization.
+
+    Args:
+        payment_requirements: Requirements providing the token domain
+        authorization: Authorization with `from`, `to`, `value`, `validAfter`,
+            `validBefore` and a hex `nonce` (with or without a 0x prefix)
+    """
+    nonce = authorization["nonce"]
+    if isinstance(nonce, str):
+        nonce = bytes.fromhex(nonce[2:] if nonce.startswith("0x") else nonce)
+
+    return {
+        "types": TRANSFER_WITH_AUTHORIZATION_TYPES,
+        "primaryType": "TransferWithAuthorization",
+        "domain": _eip712_domain(payment_requirements),
+        "message": {
+            "from": authorization["from"],
+            "to": authorization["to"],
+            "value": int(authorization["value"]),
+            "validAfter": int(authorization["validAfter"]),
+            "validBefore": int(authorization["validBefore"]),
+            "nonce": nonce,
+        },
+    }
+
+
+def _eip712_domain(payment_requirements: PaymentRequirements) -> Dict[str, Any]:
+    chain_id = get_chain_id(payment_requirements.network)
+    extra = payment_requirements.extra or {}
+    name = extra.get("name") or get_token_name(chain_id, payment_requirements.asset)
+    version = extra.get("version") or get_token_version(
+        chain_id, payment_requirements.asset
+    )
+    return {
+        "name": name,
+        "version": version,
+        "chainId": int(chain_id),
+        "verifyingContract": payment_requirements.asset,
+    }
+
+
 def sign_payment_header(
     account: Account, payment_requirements: PaymentRequirements, header: PaymentHeader
 ) -> str:
@@ -58,42 +125,9 @@ def sign_payment_header(
     try:
         auth = header["payload"]["authorization"]
 
-        nonce_bytes = bytes.fromhex(auth["nonce"])
-
-        typed_data = {
-            "types": {
-                "TransferWithAuthorization": [
-                    {"name": "from", "type": "address"},
-                    {"name": "to", "type": "address"},
-                    {"name": "value", "type": "uint256"},
-                    {"name": "validAfter", "type": "uint256"},
-                    {"name": "validBefore", "type": "uint256"},
-                    {"name": "nonce", "type": "bytes32"},
-                ]
-            },
-            "primaryType": "TransferWithAuthorization",
-            "domain": {
-                "name": payment_requirements.extra["name"],
-                "version": payment_requirements.extra["version"],
-                "chainId": int(get_chain_id(payment_requirements.network)),
-                "verifyingContract": payment_requirements.asset,
-            },
-            "message": {
-                "from": auth["from"],
-                "to": auth["to"],
-                "value": int(auth["value"]),
-                "validAfter": int(auth["validAfter"]),
-                "validBefore": int(auth["validBefore"]),
-                "nonce": nonce_bytes,
-            },
-        }
-
-        signed_message = account.sign_typed_data(
-            domain_data=typed_data["domain"],
-            message_types=typed_data["types"],
-            message_data=typed_data["message"],
-        )
-        signature = signed_message.signature.hex()
+        # Same digest as signing the typed data, with a cached domain separator
+        digest = transfer_with_authorization_hash(payment_requirements, auth)
+        signature = account.unsafe_sign_hash(digest).signature.hex()
         if not signature.startswith("0x"):
             signature = f"0x{signature}"
 
@@ -107,6 +141,302 @@ def sign_payment_header(
         raise
 
 
+DEFAULT_SIGNING_CHUNK_SIZE = 64
+
+
+def _digest_signer(account: Account) -> Callable[[bytes], bytes]:
+    """Return a function signing digests with the account's key.
+
+    `unsafe_sign_hash` rebuilds the key object, including its public key, for
+    every signature; holding one for a whole batch halves the cost.
+    """
+    key = getattr(account, "key", None)
+    if key is None:
+        return lambda digest: bytes(account.unsafe_sign_hash(digest).signature)
+
+    private_key = keys.PrivateKey(bytes(key))
+
+    def sign(digest: bytes) -> bytes:
+        signature = private_key.sign_msg_hash(digest)
+        r, s = signature.r, signature.s
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big") + bytes([signature.v + 27])
+
+    return sign
+
+
+def sign_payment_headers_batch(
+    account: Account,
+    payment_requirements: PaymentRequirements,
+    n: int,
+    x402_version: int = x402_VERSION,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_SIGNING_CHUNK_SIZE,
+    nonces: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Sign `n` payment headers for the same requirements.
+
+    Every header has its own nonce, random unless given, and the same validity
+    window, starting now. The domain separator and type hash are computed once for
+    the whole batch, and the account's key is loaded once.
+
+    Args:
+        account: Account that signs the payments
+        payment_requirements: Requirements every header pays
+        n: Number of headers to sign
+        x402_version: x402 protocol version
+        executor: Optional executor to spread the batch over, in chunks of
+            `chunk_size`. Use a ProcessPoolExecutor to sign on several cores.
+        chunk_size: Headers per executor task
+        nonces: Optional 32-byte hex nonces, one per header, e.g. from
+            `x402Client.generate_nonce`
+
+    Returns:
+        Encoded X-PAYMENT headers
+    """
+    if nonces is not None and len(nonces) != n:
+        raise ValueError(f"Expected {n} nonces, got {len(nonces)}")
+    if executor is not None and n > chunk_size:
+        starts = range(0, n, chunk_size)
+        futures = [
+            executor.submit(
+                sign_payment_headers_batch,
+                account,
+                payment_requirements,
+                min(chunk_size, n - start),
+                x402_version,
+                nonces=(
+                    nonces[start : start + chunk_size] if nonces is not None else None
+                ),
+            )
+            for start in starts
+        ]
+        return [header for future in futures for header in future.result()]
+
+    sign = _digest_signer(account)
+    separator = _requirements_domain_separator(payment_requirements)
+    now = int(time.time())
+    valid_after = str(now - 60)  # 60 seconds before
+    valid_before = str(now + payment_requirements.max_timeout_seconds)
+
+    headers = []
+    for i in range(n):
+        if nonces is None:
+            nonce = "0x" + create_nonce().hex()
+        else:
+            nonce = nonces[i] if nonces[i].startswith("0x") else "0x" + nonces[i]
+        authorization = {
+            "from": account.address,
+            "to": payment_requirements.pay_to,
+            "value": payment_requirements.max_amount_required,
+            "validAfter": valid_after,
+            "validBefore": valid_before,
+            "nonce": nonce,
+        }
+        digest = keccak(
+            b"\x19\x01" + separator + _authorization_struct_hash(authorization)
+        )
+        headers.append(
+            encode_payment(
+                {
+                    "x402Version": x402_version,
+                    "scheme": payment_requirements.scheme,
+                    "network": payment_requirements.network,
+                    "payload": {
+                        "signature": "0x" + sign(digest).hex(),
+                        "authorization": authorization,
+                    },
+                }
+            )
+        )
+    return headers
+
+
+_TRANSFER_WITH_AUTHORIZATION_TYPEHASH = keccak(
+    text="TransferWithAuthorization(address from,address to,uint256 value,"
+    "uint256 validAfter,uint256 validBefore,bytes32 nonce)"
+)
+
+
+@lru_cache(maxsize=256)
+def _domain_separator(name: str, version: str, chain_id: int, contract: str) -> bytes:
+    signable = encode_typed_data(
+        domain_data={
+            "name": name,
+            "version": version,
+            "chainId": chain_id,
+            "verifyingContract": contract,
+        },
+        message_types=TRANSFER_WITH_AUTHORIZATION_TYPES,
+        message_data={
+            "from": contract,
+            "to": contract,
+            "value": 0,
+            "validAfter": 0,
+            "validBefore": 0,
+            "nonce": b"\x00" * 32,
+        },
+    )
+    # SignableMessage.header holds the domain separator for EIP-712 messages
+    return bytes(signable.header)
+
+
+def _address_word(address: str) -> bytes:
+    raw = bytes.fromhex(address[2:] if address.startswith("0x") else address)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address {address}")
+    return raw.rjust(32, b"\x00")
+
+
+_UINT256_LIMIT = 1 << 256
+
+
+def _uint256(value: Any) -> bytes:
+    number = int(value)
+    if not 0 <= number < _UINT256_LIMIT:
+        raise ValueError(f"Invalid uint256 value {value}")
+    return number.to_bytes(32, "big")
+
+
+def _bytes32(value: str) -> bytes:
+    raw = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(raw) != 32:
+        raise ValueError(f"Invalid bytes32 value {value}")
+    return raw
+
+
+def transfer_with_authorization_hash(
+    payment_requirements: PaymentRequirements, authorization: Dict[str, Any]
+) -> bytes:
+    """Return the EIP-712 digest signed for a TransferWithAuthorization.
+
+    Produces the same digest as signing `transfer_with_authorization_typed_data`,
+    but hashes the fixed-layout struct directly and caches the domain separator
+    per token, which keeps verification cheap on the request path.
+    """
+    return keccak(
+        b"\x19\x01"
+        + _requirements_domain_separator(payment_requirements)
+        + _authorization_struct_hash(authorization)
+    )
+
+
+def _requirements_domain_separator(payment_requirements: PaymentRequirements) -> bytes:
+    domain = _eip712_domain(payment_requirements)
+    return _domain_separator(
+        domain["name"],
+        domain["version"],
+        domain["chainId"],
+        domain["verifyingContract"],
+    )
+
+
+def _authorization_struct_hash(authorization: Dict[str, Any]) -> bytes:
+    return keccak(
+        _TRANSFER_WITH_AUTHORIZATION_TYPEHASH
+        + _address_word(authorization["from"])
+        + _address_word(authorization["to"])
+        + _uint256(authorization["value"])
+        + _uint256(authorization["validAfter"])
+        + _uint256(authorization["validBefore"])
+        + _bytes32(authorization["nonce"])
+    )
+
+
+def recover_authorization_signer(
+    payment_requirements: PaymentRequirements,
+    authorization: Dict[str, Any],
+    signature: str,
+) -> str:
+    """Recover the checksummed address that signed a TransferWithAuthorization.
+
+    Raises:
+        ValueError: If the signature or authorization fields are malformed
+    """
+    raw = bytes.fromhex(signature[2:] if signature.startswith("0x") else signature)
+    if len(raw) != 65:
+        raise ValueError("Signature must be 65 bytes")
+    v = raw[64]
+    if v >= 27:
+        v -= 27
+    try:
+        sig = keys.Signature(
+            vrs=(v, int.from_bytes(raw[:32], "big"), int.from_bytes(raw[32:64], "big"))
+        )
+        public_key = sig.recover_public_key_from_msg_hash(
+            transfer_with_authorization_hash(payment_requirements, authorization)
+        )
+    except (BadSignature, ValidationError) as e:
+        raise ValueError(f"Invalid signature: {e}") from e
+    return public_key.to_checksum_address()
+
+
+def verify_payment_payload(
+    payment: PaymentPayload,
+    payment_requirements: PaymentRequirements,
+    now: Optional[int] = None,
+) -> VerifyResponse:
+    """Check an exact-scheme payment locally, without calling a facilitator.
+
+    Recovers the signer of the EIP-3009 authorization and checks the scheme,
+    network, recipient, amount and validity window against the requirements.
+    A valid result only means the payment is well formed and signed by the
+    payer; balance and nonce usage can only be checked on chain, so the
+    facilitator must still verify and settle it.
+
+    Args:
+        payment: Decoded payment payload from the X-PAYMENT header
+        payment_requirements: Requirements the payment was made against
+        now: Current unix time, defaults to time.time()
+
+    Returns:
+        VerifyResponse with an x402 invalid reason on failure
+    """
+    authorization = payment.payload.authorization
+    payer = authorization.from_
+
+    def invalid(reason: str) -> VerifyResponse:
+        return VerifyResponse(is_valid=False, invalid_reason=reason, payer=payer)
+
+    if payment.scheme != "exact" or payment_requirements.scheme != "exact":
+        return invalid("invalid_scheme")
+    if payment.network != payment_requirements.network:
+        return invalid("invalid_network")
+
+    if now is None:
+        now = int(time.time())
+    try:
+        value = int(authorization.value)
+        valid_after = int(authorization.valid_after)
+        valid_before = int(authorization.valid_before)
+    except ValueError:
+        return invalid("invalid_exact_evm_payload_authorization_value")
+    if not all(0 <= n < _UINT256_LIMIT for n in (value, valid_after, valid_before)):
+        # Not encodable as uint256, so it cannot have been signed
+        return invalid("invalid_payload")
+
+    try:
+        signer = recover_authorization_signer(
+            payment_requirements,
+            authorization.model_dump(by_alias=True),
+            payment.payload.signature,
+        )
+    except ValueError:
+        return invalid("invalid_exact_evm_payload_signature")
+    if signer.lower() != payer.lower():
+        return invalid("invalid_exact_evm_payload_signature")
+
+    if authorization.to.lower() != payment_requirements.pay_to.lower():
+        return invalid("invalid_exact_evm_payload_recipient_mismatch")
+    if valid_before < now + VALID_BEFORE_BUFFER_SECONDS:
+        return invalid("invalid_exact_evm_payload_authorization_valid_before")
+    if valid_after > now:
+        return invalid("invalid_exact_evm_payload_authorization_valid_after")
+    if value < int(payment_requirements.max_amount_required):
+        return invalid("invalid_exact_evm_payload_authorization_value")
+
+    return VerifyResponse(is_valid=True, payer=payer)
+
+
 def encode_payment(payment_payload: Dict[str, Any]) -> str:
     """Encode a payment payload into a base64 string, handling HexBytes and other non-serializable types."""
     from hexbytes import HexBytes
@@ -1,8 +1,26 @@
-from typing import Callable, Optional
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 from typing_extensions import (
     TypedDict,
 )  # use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12
 import httpx
+from x402.bridge import AsyncBridge, get_default_bridge
 from x402.types import (
     PaymentPayload,
     PaymentRequirements,
@@ -11,80 +29,655 @@ from x402.types import (
 )
 
 
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_RESET_TIMEOUT_SECONDS = 30.0
+# Assumed latency of endpoints that have not answered yet, so they get traffic
+_INITIAL_LATENCY_SECONDS = 0.1
+_LATENCY_SMOOTHING = 0.2
+
+
+class FacilitatorUnavailableError(Exception):
+    """Raised when no facilitator endpoint can take a request."""
+
+
 class FacilitatorConfig(TypedDict, total=False):
     """Configuration for the X402 facilitator service.
 
     Attributes:
         url: The base URL for the facilitator service
+        urls: Base URLs of several equivalent facilitators, used instead of `url`.
+            Requests go to a healthy endpoint, preferring faster ones, and fail
+            over to the others.
         create_headers: Optional function to create authentication headers
+        timeout: Request timeout in seconds for facilitator calls
+        http2: Enable HTTP/2 on the pooled connection (requires the `h2` package)
+        max_connections: Maximum number of concurrent connections to the facilitator
+        max_keepalive_connections: Maximum number of idle keep-alive connections
+        keepalive_expiry: Seconds an idle keep-alive connection is kept open
+        http_client: Optional externally managed httpx.AsyncClient to use instead
+            of the client's own pool. It is not closed by `aclose()`.
+        hedge_after: Seconds after which a `/verify` call that has not been
+            answered is also sent to the next endpoint; the first answer wins.
+            Disabled by default. `/settle` is never hedged.
+        verify_deadline: Overall seconds a `verify` call may take, across
+            failover and hedged requests
+        settle_deadline: Overall seconds a `settle` call may take
+        failure_threshold: Consecutive failures after which an endpoint's circuit
+            breaker opens and the endpoint is skipped
+        reset_timeout: Seconds an open circuit breaker waits before letting a
+            trial request through
+        batch_window: Seconds to collect concurrent `verify` (and, separately,
+            `settle`) calls into one batched request. Disabled by default.
+        max_batch_size: Maximum number of calls in one batched request
     """
 
     url: str
+    urls: List[str]
     create_headers: Callable[[], dict[str, dict[str, str]]]
+    timeout: float
+    http2: bool
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    http_client: httpx.AsyncClient
+    hedge_after: float
+    verify_deadline: float
+    settle_deadline: float
+    failure_threshold: int
+    reset_timeout: float
+    batch_window: float
+    max_batch_size: int
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one facilitator endpoint.
+
+    Closed, it lets every request through. After `failure_threshold`
+    consecutive failures it opens and rejects requests, until `reset_timeout`
+    seconds have passed; then it lets a single trial request through, which
+    closes it again on success and reopens it on failure.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        """ "closed", "open", or "half_open" once a trial request is due."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._trial or self._clock() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now.
+
+        A True result must be followed by `record_success`, `record_failure`
+        or `release`.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+    def release(self) -> None:
+        """Give back an allowed request that was abandoned without an outcome."""
+        with self._lock:
+            self._trial = False
+
+
+class _Endpoint:
+    __slots__ = ("url", "breaker", "latency")
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        # Smoothed latency of successful requests, in seconds
+        self.latency: Optional[float] = None
+
+    def weight(self) -> float:
+        latency = self.latency if self.latency is not None else _INITIAL_LATENCY_SECONDS
+        return 1.0 / max(latency, 1e-3)
+
+    def observe(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += _LATENCY_SMOOTHING * (latency - self.latency)
+
+
+def _normalize_url(url: str) -> str:
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"Invalid URL {url}, must start with http:// or https://")
+    return url[:-1] if url.endswith("/") else url
+
+
+def _undelivered(error: BaseException) -> bool:
+    """Whether a failed request certainly never reached the facilitator."""
+    return isinstance(
+        error, (FacilitatorUnavailableError, httpx.ConnectError, httpx.ConnectTimeout)
+    )
+
+
+# A call's response JSON, or the error that call failed with
+_BatchResult = Union[Any, BaseException]
+
+
+@runtime_checkable
+class Facilitator(Protocol):
+    """What the middlewares and settlement helpers need from a facilitator.
+
+    Implemented by `FacilitatorClient` for remote facilitators and by
+    `x402.local_facilitator.LocalFacilitator` for in-process ones.
+    """
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse: ...
+
+    async def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse: ...
+
+    async def aclose(self) -> None: ...
+
+
+class MicroBatcher:
+    """Coalesces calls made within a short window into batches.
+
+    Each caller awaits its own future; when the window closes or the batch is
+    full, the collected items are handed to `send` in one go and its results,
+    one per item in order, are passed back to the waiting callers. A result
+    that is an exception is raised to its caller. Futures are bound to a
+    loop, so calls from different event loops are batched separately.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Any]], Awaitable[List[_BatchResult]]],
+        window: float,
+        max_size: int,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            send: Coroutine function submitting a batch of items
+            window: Seconds to wait for more items after the first of a batch
+            max_size: Number of items that submits a batch right away
+        """
+        if max_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self._send = send
+        self._window = window
+        self._max_size = max_size
+        # Per event loop: the (item, future) pairs collected so far, and the
+        # timer that sends them
+        self._pending: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._flush_handles: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._batches: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Add an item to the current batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(loop, [])
+        pending.append((item, future))
+        if len(pending) >= self._max_size:
+            self._flush(loop)
+        elif loop not in self._flush_handles:
+            self._flush_handles[loop] = loop.call_later(self._window, self._flush, loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        handle = self._flush_handles.pop(loop, None)
+        if handle is not None:
+            handle.cancel()
+        batch = self._pending.pop(loop, [])
+        if batch:
+            task = loop.create_task(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._send([item for item, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller gave up waiting
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
 
 
 class FacilitatorClient:
+    """Client for a remote x402 facilitator.
+
+    The client owns a pooled, keep-alive `httpx.AsyncClient` that is shared by
+    every `verify` and `settle` call, so repeated calls reuse connections instead
+    of paying for a new TCP and TLS handshake each time. The pool is created
+    lazily on first use, one per event loop the client is used from; call
+    `aclose()` (or use the client as an async context manager) to release them.
+
+    With several `urls`, each endpoint has its own circuit breaker and a
+    smoothed latency. Every call tries the endpoints whose breaker is not open
+    in a random order weighted towards faster ones, failing over to the next on
+    a connection error, timeout or 5xx response. A `/settle` call only fails
+    over when the request never reached the previous endpoint, so a payment is
+    not submitted twice. `/verify` can additionally be hedged.
+
+    With a `batch_window`, concurrent calls are coalesced into one request to
+    the facilitator's batch endpoint, and each caller gets its own result
+    back. Facilitators without batch endpoints get parallel single calls.
+    """
+
     def __init__(self, config: Optional[FacilitatorConfig] = None):
         if config is None:
             config = {"url": "https://x402.org/facilitator"}
 
         # Validate URL format
-        url = config.get("url", "")
-        if not url.startswith(("http://", "https://")):
-            raise ValueError(f"Invalid URL {url}, must start with http:// or https://")
-        if url.endswith("/"):
-            url = url[:-1]
+        urls = [
+            _normalize_url(url) for url in config.get("urls") or [config.get("url", "")]
+        ]
 
-        self.config = {"url": url, "create_headers": config.get("create_headers")}
+        self.config = {"url": urls[0], "create_headers": config.get("create_headers")}
+        self._endpoints = [
+            _Endpoint(
+                url,
+                CircuitBreaker(
+                    config.get("failure_threshold", DEFAULT_FAILURE_THRESHOLD),
+                    config.get("reset_timeout", DEFAULT_RESET_TIMEOUT_SECONDS),
+                ),
+            )
+            for url in urls
+        ]
+        self._hedge_after = config.get("hedge_after")
+        self._verify_deadline = config.get("verify_deadline")
+        self._settle_deadline = config.get("settle_deadline")
 
-    async def verify(
-        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
-    ) -> VerifyResponse:
-        """Verify a payment header is valid and a request should be processed"""
+        self._batchers: Dict[str, MicroBatcher] = {}
+        batch_window = config.get("batch_window")
+        if batch_window is not None:
+            max_batch_size = config.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE)
+            for path in ("verify", "settle"):
+                self._batchers[path] = MicroBatcher(
+                    lambda bodies, path=path: self._post_batch(path, bodies),
+                    batch_window,
+                    max_batch_size,
+                )
+        # Paths whose batch endpoint the facilitator does not implement
+        self._batch_unsupported: Set[str] = set()
+
+        self._timeout = httpx.Timeout(config.get("timeout", DEFAULT_TIMEOUT_SECONDS))
+        self._limits = httpx.Limits(
+            max_connections=config.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=config.get(
+                "max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=config.get(
+                "keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+            ),
+        )
+        self._http2 = config.get("http2", False)
+        self._external_client = config.get("http_client")
+        # One pool per event loop, dropped along with its loop
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use.
+
+        httpx connections are bound to the event loop that opened them, so every
+        loop the client is used from gets its own pool.
+        """
+        if self._external_client is not None:
+            return self._external_client
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._clients[loop] = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                follow_redirects=True,
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients and their connections.
+
+        The pool of the running loop is closed before returning; pools of other
+        loops that are still running are closed on their own loop.
+        """
+        current = asyncio.get_running_loop()
+        clients = list(self._clients.items())
+        self._clients.clear()
+        for loop, client in clients:
+            if client.is_closed:
+                continue
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    async def __aenter__(self) -> "FacilitatorClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _headers(self, kind: str) -> dict[str, str]:
         headers = {"Content-Type": "application/json"}
 
         if self.config.get("create_headers"):
             custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("verify", {}))
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.config['url']}/verify",
-                json={
-                    "x402Version": payment.x402_version,
-                    "paymentPayload": payment.model_dump(by_alias=True),
-                    "paymentRequirements": payment_requirements.model_dump(
-                        by_alias=True, exclude_none=True
-                    ),
-                },
+            headers.update(custom_headers.get(kind, {}))
+
+        return headers
+
+    @staticmethod
+    def _request_body(
+        payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> dict[str, Any]:
+        return {
+            "x402Version": payment.x402_version,
+            "paymentPayload": payment.model_dump(by_alias=True),
+            "paymentRequirements": payment_requirements.model_dump(
+                by_alias=True, exclude_none=True
+            ),
+        }
+
+    @property
+    def endpoints(self) -> List[str]:
+        """The facilitator base URLs, in configuration order."""
+        return [endpoint.url for endpoint in self._endpoints]
+
+    def circuit_breaker(self, url: str) -> CircuitBreaker:
+        """The circuit breaker of one endpoint."""
+        url = _normalize_url(url)
+        for endpoint in self._endpoints:
+            if endpoint.url == url:
+                return endpoint.breaker
+        raise KeyError(url)
+
+    def _ranked_endpoints(self) -> List[_Endpoint]:
+        """Endpoints in the order to try them: healthy and fast ones first."""
+        if len(self._endpoints) == 1:
+            return self._endpoints
+        # Weighted random order (Efraimidis-Spirakis), so load spreads by speed
+        ranked = sorted(
+            self._endpoints,
+            key=lambda e: random.random() ** (1.0 / e.weight()),
+            reverse=True,
+        )
+        # Endpoints waiting on a trial request go last
+        return sorted(ranked, key=lambda e: e.breaker.state != "closed")
+
+    async def _send(
+        self,
+        endpoint: _Endpoint,
+        path: str,
+        body: dict[str, Any],
+        headers: dict[str, str],
+    ) -> httpx.Response:
+        """Post to one endpoint, recording the outcome on its circuit breaker."""
+        start = time.perf_counter()
+        try:
+            response = await self._get_client().post(
+                f"{endpoint.url}/{path}",
+                json=body,
                 headers=headers,
                 follow_redirects=True,
             )
+            if response.status_code >= 500:
+                response.raise_for_status()
+        except asyncio.CancelledError:
+            # Lost a hedge race or hit the deadline; not the endpoint's fault
+            endpoint.breaker.release()
+            raise
+        except Exception:
+            endpoint.breaker.record_failure()
+            raise
+        endpoint.breaker.record_success()
+        endpoint.observe(time.perf_counter() - start)
+        return response
+
+    async def _post(
+        self,
+        path: str,
+        body: dict[str, Any],
+        headers: dict[str, str],
+        hedge_after: Optional[float],
+        failover: Callable[[BaseException], bool],
+    ) -> httpx.Response:
+        """Post to the best endpoint, failing over and hedging as configured."""
+        candidates = iter(self._ranked_endpoints())
+        pending: Set["asyncio.Task[httpx.Response]"] = set()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            for endpoint in candidates:
+                if endpoint.breaker.allow():
+                    pending.add(
+                        asyncio.ensure_future(self._send(endpoint, path, body, headers))
+                    )
+                    return True
+            return False
+
+        exhausted = not launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if exhausted else hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Slow answer: race the next endpoint against it
+                    exhausted = not launch()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if not pending and failover(last_error):
+                    exhausted = not launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_error is not None:
+            raise last_error
+        raise FacilitatorUnavailableError(
+            "Every facilitator endpoint's circuit breaker is open"
+        )
+
+    async def _call(
+        self,
+        path: str,
+        body: dict[str, Any],
+        headers: dict[str, str],
+        deadline: Optional[float],
+        hedge_after: Optional[float],
+        failover: Callable[[BaseException], bool],
+    ) -> httpx.Response:
+        call = self._post(path, body, headers, hedge_after, failover)
+        if deadline is None:
+            return await call
+        return await asyncio.wait_for(call, deadline)
+
+    def _policy(
+        self, path: str
+    ) -> Tuple[Optional[float], Optional[float], Callable[[BaseException], bool]]:
+        """(deadline, hedge_after, failover) for a facilitator path."""
+        if path == "verify":
+            # Verifying has no side effects, so any failure can be retried elsewhere
+            return self._verify_deadline, self._hedge_after, lambda error: True
+        return self._settle_deadline, None, _undelivered
+
+    async def _post_one(self, path: str, body: dict[str, Any]) -> Any:
+        """Post a single call and return its response JSON."""
+        response = await self._call(
+            path, body, await self._headers(path), *self._policy(path)
+        )
+        return response.json()
+
+    async def _post_batch(
+        self, path: str, bodies: List[dict[str, Any]]
+    ) -> List[_BatchResult]:
+        """Post several calls as one `{path}/batch` request.
+
+        The batch endpoint takes `{"items": [<request body>, ...]}` and answers
+        `{"results": [<response body>, ...]}` in the same order. Facilitators
+        without it answer 404 or 405; the calls are then sent individually and
+        in parallel, now and from then on.
+        """
+
+        async def individually() -> List[_BatchResult]:
+            return await asyncio.gather(
+                *(self._post_one(path, body) for body in bodies),
+                return_exceptions=True,
+            )
 
-            data = response.json()
-            return VerifyResponse(**data)
+        if len(bodies) == 1 or path in self._batch_unsupported:
+            return await individually()
+
+        response = await self._call(
+            f"{path}/batch",
+            {"items": bodies},
+            await self._headers(path),
+            *self._policy(path),
+        )
+        if response.status_code in (404, 405):
+            self._batch_unsupported.add(path)
+            return await individually()
+        results = response.json()["results"]
+        if len(results) != len(bodies):
+            raise ValueError(
+                f"Facilitator answered {len(results)} results for {len(bodies)} calls"
+            )
+        return results
+
+    async def _request(self, path: str, body: dict[str, Any]) -> Any:
+        batcher = self._batchers.get(path)
+        if batcher is None or path in self._batch_unsupported:
+            return await self._post_one(path, body)
+        return await batcher.submit(body)
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment header is valid and a request should be processed
+
+        Raises:
+            asyncio.TimeoutError: If the `verify_deadline` passed
+            FacilitatorUnavailableError: If every endpoint's circuit breaker is open
+        """
+        data = await self._request(
+            "verify", self._request_body(payment, payment_requirements)
+        )
+        return VerifyResponse(**data)
 
     async def settle(
         self, payment: PaymentPayload, payment_requirements: PaymentRequirements
     ) -> SettleResponse:
-        headers = {"Content-Type": "application/json"}
+        """Settle a verified payment on chain through the facilitator
 
-        if self.config.get("create_headers"):
-            custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("settle", {}))
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.config['url']}/settle",
-                json={
-                    "x402Version": payment.x402_version,
-                    "paymentPayload": payment.model_dump(by_alias=True),
-                    "paymentRequirements": payment_requirements.model_dump(
-                        by_alias=True, exclude_none=True
-                    ),
-                },
-                headers=headers,
-                follow_redirects=True,
-            )
-            data = response.json()
-            return SettleResponse(**data)
+        Raises:
+            asyncio.TimeoutError: If the `settle_deadline` passed
+            FacilitatorUnavailableError: If every endpoint's circuit breaker is open
+        """
+        data = await self._request(
+            "settle", self._request_body(payment, payment_requirements)
+        )
+        return SettleResponse(**data)
+
+
+class SyncFacilitatorClient:
+    """Blocking facade over an async facilitator for WSGI and other sync code.
+
+    Calls are submitted to a persistent `AsyncBridge` event loop instead of a
+    per-call loop, so the wrapped client's connection pool stays warm and is
+    shared by every worker thread.
+    """
+
+    def __init__(
+        self,
+        facilitator: Optional[Facilitator] = None,
+        bridge: Optional[AsyncBridge] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Initialize the synchronous facilitator client.
+
+        Args:
+            facilitator: Async facilitator to wrap. Defaults to FacilitatorClient().
+            bridge: Event loop bridge to run calls on. Defaults to the shared bridge.
+            timeout: Optional overall timeout in seconds for each blocking call
+        """
+        self.facilitator = facilitator or FacilitatorClient()
+        self.bridge = bridge or get_default_bridge()
+        self.timeout = timeout
+
+    def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment header is valid and a request should be processed"""
+        return self.bridge.run(
+            self.facilitator.verify(payment, payment_requirements), self.timeout
+        )
+
+    def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        """Settle a verified payment on chain through the facilitator"""
+        return self.bridge.run(
+            self.facilitator.settle(payment, payment_requirements), self.timeout
+        )
+
+    def close(self) -> None:
+        """Close the wrapped facilitator's connection pool."""
+        self.bridge.run(self.facilitator.aclose(), self.timeout)
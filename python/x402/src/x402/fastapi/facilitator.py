@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+from x402.facilitator import Facilitator
+from x402.local_facilitator import LocalFacilitator
+from x402.types import PaymentPayload, PaymentRequirements
+
+logger = logging.getLogger(__name__)
+
+# (status code, response body) of one verify or settle call
+_Answer = Tuple[int, Dict[str, Any]]
+
+
+def _payer(body: Any) -> str:
+    try:
+        return str(body["paymentPayload"]["payload"]["authorization"]["from"])
+    except (KeyError, TypeError):
+        return ""
+
+
+def _network(body: Any) -> Optional[str]:
+    try:
+        return str(body["paymentPayload"]["network"])
+    except (KeyError, TypeError):
+        return None
+
+
+async def _verify(facilitator: Facilitator, body: Any) -> _Answer:
+    def invalid(status: int, reason: str) -> _Answer:
+        return status, {
+            "isValid": False,
+            "invalidReason": reason,
+            "payer": _payer(body),
+        }
+
+    try:
+        payment = PaymentPayload(**body["paymentPayload"])
+    except (KeyError, TypeError, ValidationError):
+        return invalid(400, "invalid_payload")
+    try:
+        requirements = PaymentRequirements(**body["paymentRequirements"])
+    except (KeyError, TypeError, ValidationError):
+        return invalid(400, "invalid_payment_requirements")
+    try:
+        response = await facilitator.verify(payment, requirements)
+    except Exception:
+        logger.exception("Error verifying payment")
+        return invalid(500, "unexpected_verify_error")
+    return 200, response.model_dump(by_alias=True)
+
+
+async def _settle(facilitator: Facilitator, body: Any) -> _Answer:
+    def failed(status: int, reason: str) -> _Answer:
+        return status, {
+            "success": False,
+            "errorReason": reason,
+            "network": _network(body),
+            "payer": _payer(body),
+        }
+
+    try:
+        payment = PaymentPayload(**body["paymentPayload"])
+    except (KeyError, TypeError, ValidationError):
+        return failed(400, "invalid_payload")
+    try:
+        requirements = PaymentRequirements(**body["paymentRequirements"])
+    except (KeyError, TypeError, ValidationError):
+        return failed(400, "invalid_payment_requirements")
+    try:
+        response = await facilitator.settle(payment, requirements)
+    except Exception:
+        logger.exception("Error settling payment")
+        return failed(500, "unexpected_settle_error")
+    return 200, response.model_dump(by_alias=True)
+
+
+def create_facilitator_app(facilitator: LocalFacilitator) -> FastAPI:
+    """Serve a facilitator over the x402 facilitator HTTP API.
+
+    Adds `POST /verify`, `POST /settle` and `GET /supported`, plus the
+    `POST /verify/batch` and `POST /settle/batch` endpoints used by
+    `FacilitatorClient` with a `batch_window`, which take
+    `{"items": [<request body>, ...]}` and answer `{"results": [...]}`.
+    Malformed requests get a 400 with an x402 error reason; inside a batch
+    every item gets its own result instead.
+    """
+    app = FastAPI()
+
+    async def one(
+        handler: Callable[[Facilitator, Any], Awaitable[_Answer]],
+        request: Request,
+    ) -> JSONResponse:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        status, content = await handler(facilitator, body)
+        return JSONResponse(content, status_code=status)
+
+    async def batch(
+        handler: Callable[[Facilitator, Any], Awaitable[_Answer]],
+        request: Request,
+    ) -> JSONResponse:
+        try:
+            items = (await request.json())["items"]
+            if not isinstance(items, list):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse(
+                {"error": 'Expected a body of the form {"items": [...]}'},
+                status_code=400,
+            )
+        answers = await asyncio.gather(*(handler(facilitator, item) for item in items))
+        return JSONResponse({"results": [content for _, content in answers]})
+
+    @app.post("/verify")
+    async def verify(request: Request) -> JSONResponse:
+        return await one(_verify, request)
+
+    @app.post("/settle")
+    async def settle(request: Request) -> JSONResponse:
+        return await one(_settle, request)
+
+    @app.post("/verify/batch")
+    async def verify_batch(request: Request) -> JSONResponse:
+        return await batch(_verify, request)
+
+    @app.post("/settle/batch")
+    async def settle_batch(request: Request) -> JSONResponse:
+        return await batch(_settle, request)
+
+    @app.get("/supported")
+    async def supported() -> Dict[str, Any]:
+        return {"kinds": facilitator.supported()}
+
+    return app
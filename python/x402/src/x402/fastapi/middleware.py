@@ -1,36 +1,417 @@
+import asyncio
 import base64
-import json
+import inspect
 import logging
-from typing import Any, Callable, Optional, get_args, cast
+import weakref
+from typing import Any, Awaitable, Callable, Mapping, NamedTuple, Optional, Union
 
 from fastapi import Request
-from fastapi.responses import JSONResponse, HTMLResponse
-from pydantic import validate_call
+from fastapi.responses import HTMLResponse, Response
+from pydantic import ConfigDict, validate_call
 
-from x402.common import (
-    process_price_to_atomic_amount,
-    x402_VERSION,
-    find_matching_payment_requirements,
-)
-from x402.encoding import safe_base64_decode
-from x402.facilitator import FacilitatorClient, FacilitatorConfig
-from x402.path import path_is_match
-from x402.paywall import is_browser_request, get_paywall_html
+from x402.chains import registry
+from x402.cache import CachedPaymentRequirements, LRUCache, VerifyCache
+from x402.common import process_price_to_atomic_amount
+from x402.decode import PaymentDecodeError, decode_payment_header
+from x402.exact import verify_payment_payload
+from x402.facilitator import Facilitator, FacilitatorClient, FacilitatorConfig
+from x402.path import RouteTable
+from x402.journal import SettlementJournal
+from x402.settlement import SettlementQueue, settle_recovered, settlement_id
+from x402.paywall import is_browser_request, create_paywall_response
 from x402.types import (
     PaymentPayload,
     PaymentRequirements,
     Price,
-    x402PaymentRequiredResponse,
     PaywallConfig,
-    SupportedNetworks,
+    VerifyResponse,
 )
 
 logger = logging.getLogger(__name__)
 
+# Journals already replayed, so routes sharing one resubmit its payments once
+_recovered_journals: "weakref.WeakSet[SettlementJournal]" = weakref.WeakSet()
+
+
+def _recover_settlements(journal: Optional[SettlementJournal]) -> list:
+    """Pending entries of a journal from a previous run, the first time it is seen."""
+    if journal is None or journal in _recovered_journals:
+        return []
+    _recovered_journals.add(journal)
+    return journal.recover()
+
+
+class ChunkedResponse(Response):
+    """Response that sends pre-built body chunks without joining them."""
+
+    def __init__(
+        self,
+        chunks: list[bytes],
+        status_code: int = 200,
+        headers: Optional[dict[str, str]] = None,
+    ):
+        self.chunks = chunks
+        headers = dict(headers or {})
+        if status_code != 304:
+            # A 304 has no body; a Content-Length would claim the page's is empty
+            headers.setdefault(
+                "Content-Length", str(sum(len(chunk) for chunk in chunks))
+            )
+        super().__init__(content=b"", status_code=status_code, headers=headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if not self.chunks:
+            await send({"type": "http.response.body", "body": b""})
+        for i, chunk in enumerate(self.chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": i < len(self.chunks) - 1,
+                }
+            )
+
+
+# Returns the price of a request; FastAPI callbacks may also be async
+PriceCallback = Callable[[Request], Union[Price, Awaitable[Price]]]
+
+# (max_amount_required, asset address, EIP-712 name, EIP-712 version)
+_Quote = tuple[str, str, str, str]
+
+
+def _quote(price: Price, network: str) -> _Quote:
+    max_amount_required, asset_address, eip712_domain = process_price_to_atomic_amount(
+        price, network
+    )
+    return (
+        max_amount_required,
+        asset_address,
+        eip712_domain["name"],
+        eip712_domain["version"],
+    )
+
+
+class _VerifiedPayment(NamedTuple):
+    payment: PaymentPayload
+    payment_requirements: PaymentRequirements
+    verify_response: VerifyResponse
+    cached_requirements: CachedPaymentRequirements
+
+
+class _Settlement(NamedTuple):
+    # X-PAYMENT-RESPONSE header value, if the payment was settled inline
+    header: Optional[str] = None
+    # 402 response to send instead of the handler's response
+    error_response: Optional[Response] = None
+
+
+SETTLEMENT_MODES = ("before_body", "trailer")
+
+
+class _MountedRoute(NamedTuple):
+    route: "_PaymentRoute"
+    settlement_mode: str
+
+
+class _PaymentRoute:
+    """Verification and settlement for one payment configuration.
+
+    Shared by the `require_payment` function middleware and the
+    `X402PaymentMiddleware` ASGI middleware, which only differ in how they
+    wrap the downstream application.
+    """
+
+    def __init__(
+        self,
+        price: Union[Price, PriceCallback],
+        pay_to_address: str,
+        description: str = "",
+        mime_type: str = "",
+        max_deadline_seconds: int = 60,
+        output_schema: Any = None,
+        facilitator_config: Optional[FacilitatorConfig] = None,
+        network: str = "base-sepolia",
+        resource: Optional[str] = None,
+        paywall_config: Optional[PaywallConfig] = None,
+        custom_paywall_html: Optional[str] = None,
+        facilitator: Optional[Facilitator] = None,
+        verify_cache: Optional[VerifyCache] = None,
+        local_verify: bool = False,
+        settlement_queue: Optional[SettlementQueue] = None,
+        settlement_journal: Optional[SettlementJournal] = None,
+    ):
+        # Validate network is supported
+        supported_networks = registry.networks
+        if network not in supported_networks:
+            raise ValueError(
+                f"Unsupported network: {network}. Must be one of: {supported_networks}"
+            )
+
+        self.network = network
+        self._price_callback: Optional[PriceCallback] = None
+        self._quote: Optional[_Quote] = None
+        if callable(price):
+            # Priced per request
+            self._price_callback = price
+        else:
+            try:
+                self._quote = _quote(price, network)
+            except Exception as e:
+                raise ValueError(f"Invalid price: {price}. Error: {e}")
+
+        self.facilitator = facilitator or FacilitatorClient(facilitator_config)
+        self.resource = resource
+        self.paywall_config = paywall_config
+        self.custom_paywall_html = custom_paywall_html
+        self.verify_cache = verify_cache
+        self.local_verify = local_verify
+        self.settlement_queue = settlement_queue
+        self.settlement_journal = settlement_journal
+
+        # Replayed at startup so only payments from previous runs are resubmitted
+        self._recovered = _recover_settlements(settlement_journal)
+        self._background_tasks: set = set()
+
+        # Ensure output_schema and extra are objects, not null
+        output_schema_obj = {} if output_schema is None else output_schema
+
+        def build_requirements(
+            resource_url: str, quote: _Quote
+        ) -> CachedPaymentRequirements:
+            max_amount_required, asset_address, name, version = quote
+            return CachedPaymentRequirements(
+                [
+                    PaymentRequirements(
+                        scheme="exact",
+                        network=network,
+                        asset=asset_address,
+                        max_amount_required=max_amount_required,
+                        resource=resource_url,
+                        description=description,
+                        mime_type=mime_type,
+                        pay_to=pay_to_address,
+                        max_timeout_seconds=max_deadline_seconds,
+                        output_schema=output_schema_obj,
+                        extra={"name": name, "version": version},
+                    )
+                ]
+            )
+
+        self._build_requirements = build_requirements
+        # Requirements only vary by resource URL and price, so build them once for each
+        self._requirements_cache: LRUCache[
+            tuple[str, _Quote], CachedPaymentRequirements
+        ] = LRUCache()
+
+    def resubmit_recovered(self) -> None:
+        """Settle journaled payments from a previous run in the background."""
+        if self._recovered:
+            entries = self._recovered[:]
+            self._recovered.clear()
+            self.spawn(
+                settle_recovered(self.settlement_journal, entries, self.facilitator)
+            )
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine as a task that is kept alive until it finishes."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def requirements(self, request: Request) -> CachedPaymentRequirements:
+        quote = self._quote
+        if quote is None:
+            price = self._price_callback(request)
+            if inspect.isawaitable(price):
+                price = await price
+            quote = _quote(price, self.network)
+        # Get resource URL if not explicitly provided
+        resource_url = self.resource or str(request.url)
+        return self._requirements_cache.get_or_create(
+            (resource_url, quote), lambda: self._build_requirements(resource_url, quote)
+        )
+
+    def payment_required(
+        self,
+        request_headers: Mapping[str, str],
+        cached_requirements: CachedPaymentRequirements,
+        error: str,
+    ) -> Response:
+        """Create a 402 response with payment requirements."""
+        status_code = 402
+
+        if is_browser_request(dict(request_headers)):
+            if self.custom_paywall_html:
+                return HTMLResponse(
+                    content=self.custom_paywall_html,
+                    status_code=status_code,
+                    headers={"Content-Type": "text/html; charset=utf-8"},
+                )
+
+            paywall = create_paywall_response(
+                dict(request_headers),
+                error,
+                cached_requirements.accepts,
+                self.paywall_config,
+            )
+            return ChunkedResponse(
+                paywall.body,
+                status_code=paywall.status_code,
+                headers=dict(paywall.headers),
+            )
+        else:
+            return Response(
+                content=cached_requirements.response_body(error),
+                status_code=status_code,
+                media_type="application/json",
+            )
+
+    async def verify(self, request: Request) -> Union[Response, _VerifiedPayment]:
+        """Verify the request's payment, returning a 402 response if it is not valid."""
+        cached_requirements = await self.requirements(request)
+
+        def x402_response(error: str) -> Response:
+            return self.payment_required(request.headers, cached_requirements, error)
+
+        # Check for payment header
+        payment_header = request.headers.get("X-PAYMENT", "")
+
+        if payment_header == "":
+            return x402_response("No X-PAYMENT header provided")
+
+        def invalid_header(e: PaymentDecodeError) -> Response:
+            logger.warning(
+                f"Invalid payment header format from {request.client.host if request.client else 'unknown'}: {str(e)}"
+            )
+            return x402_response("Invalid payment header format")
+
+        # Decode payment header, reusing a decode of the same header by an outer middleware
+        decoded = getattr(request.state, "payment", None)
+        if decoded is None or decoded.header != payment_header:
+            try:
+                decoded = decode_payment_header(payment_header)
+            except PaymentDecodeError as e:
+                return invalid_header(e)
+            request.state.payment = decoded
+
+        # Find matching payment requirements before validating the payload
+        selected_payment_requirements = cached_requirements.index.match(decoded)
+
+        if not selected_payment_requirements:
+            return x402_response("No matching payment requirements found")
+
+        try:
+            payment = decoded.payment
+        except PaymentDecodeError as e:
+            return invalid_header(e)
+
+        verify_cache = self.verify_cache
+        if verify_cache is not None and verify_cache.is_settled(payment):
+            return x402_response("Invalid payment: payment already settled")
+
+        # Verify payment, reusing a cached result for retried headers
+        verify_response = (
+            verify_cache.get(payment, selected_payment_requirements)
+            if verify_cache is not None
+            else None
+        )
+        if verify_response is None and self.local_verify:
+            local_response = verify_payment_payload(
+                payment, selected_payment_requirements
+            )
+            if not local_response.is_valid:
+                verify_response = local_response
+        if verify_response is None:
+            verify_response = await self.facilitator.verify(
+                payment, selected_payment_requirements
+            )
+            if verify_cache is not None:
+                verify_cache.set(
+                    payment, selected_payment_requirements, verify_response
+                )
+
+        if not verify_response.is_valid:
+            error_reason = verify_response.invalid_reason or "Unknown error"
+            return x402_response(f"Invalid payment: {error_reason}")
+
+        return _VerifiedPayment(
+            payment, selected_payment_requirements, verify_response, cached_requirements
+        )
+
+    async def settle(
+        self, verified: _VerifiedPayment, request_headers: Mapping[str, str]
+    ) -> _Settlement:
+        """Settle a payment after the handler returned a 2xx response."""
+        payment = verified.payment
+        selected_payment_requirements = verified.payment_requirements
+
+        def x402_response(error: str) -> _Settlement:
+            return _Settlement(
+                error_response=self.payment_required(
+                    request_headers, verified.cached_requirements, error
+                )
+            )
+
+        if self.settlement_queue is not None:
+            await self.settlement_queue.enqueue(payment, selected_payment_requirements)
+            # The nonce will be consumed on chain, so replays are rejected right away
+            if self.verify_cache is not None:
+                self.verify_cache.mark_settled(payment)
+            return _Settlement()
+
+        loop = asyncio.get_running_loop()
+        settlement_journal = self.settlement_journal
+        if settlement_journal is not None:
+            await loop.run_in_executor(
+                None,
+                settlement_journal.append_pending,
+                [(settlement_id(payment), payment, selected_payment_requirements)],
+            )
+
+        # Settle the payment
+        try:
+            settle_response = await self.facilitator.settle(
+                payment, selected_payment_requirements
+            )
+        except Exception:
+            if settlement_journal is None:
+                return x402_response("Settle failed")
+            # The handler already ran; keep the payment journaled for a later retry
+            logger.exception(
+                "Settle failed, payment %s stays journaled", settlement_id(payment)
+            )
+            return _Settlement()
+
+        if settlement_journal is not None:
+            await loop.run_in_executor(
+                None, settlement_journal.append_done, [settlement_id(payment)]
+            )
+
+        if settle_response.success:
+            if self.verify_cache is not None:
+                self.verify_cache.mark_settled(payment)
+            return _Settlement(
+                header=base64.b64encode(
+                    settle_response.model_dump_json(by_alias=True).encode("utf-8")
+                ).decode("utf-8")
+            )
+        else:
+            return x402_response(
+                "Settle failed: " + (settle_response.error_reason or "Unknown error")
+            )
+
 
-@validate_call
+@validate_call(config=ConfigDict(arbitrary_types_allowed=True))
 def require_payment(
-    price: Price,
+    price: Union[Price, PriceCallback],
     pay_to_address: str,
     path: str | list[str] = "*",
     description: str = "",
@@ -42,13 +423,21 @@ def require_payment(
     resource: Optional[str] = None,
     paywall_config: Optional[PaywallConfig] = None,
     custom_paywall_html: Optional[str] = None,
+    facilitator: Optional[Facilitator] = None,
+    verify_cache: Optional[VerifyCache] = None,
+    local_verify: bool = False,
+    settlement_queue: Optional[SettlementQueue] = None,
+    settlement_journal: Optional[SettlementJournal] = None,
 ):
     """Generate a FastAPI middleware that gates payments for an endpoint.
 
     Args:
-        price (Price): Payment price. Can be:
+        price (Price | Callable[[Request], Price]): Payment price. Can be:
             - Money: USD amount as string/int (e.g., "$3.10", 0.10, "0.001") - defaults to USDC
             - TokenAmount: Custom token amount with asset information
+            - A function of the request returning either of the above, or an awaitable of it,
+              to price each request. Conversions and payment requirements are cached per
+              price point, so repeated prices cost a cache lookup.
         pay_to_address (str): Ethereum address to receive the payment
         path (str | list[str], optional): Path to gate with payments. Defaults to "*" for all paths.
         description (str, optional): Description of what is being purchased. Defaults to "".
@@ -62,145 +451,300 @@ def require_payment(
         paywall_config (Optional[PaywallConfig], optional): Configuration for paywall UI customization.
             Includes options like cdp_client_key, app_name, app_logo, session_token_endpoint.
         custom_paywall_html (Optional[str], optional): Custom HTML to display for paywall instead of default.
+        facilitator (Optional[Facilitator], optional): Shared facilitator client to use instead of
+            creating one from facilitator_config. Lets several middlewares reuse one connection pool.
+        verify_cache (Optional[VerifyCache], optional): Cache of verify results keyed by the signed
+            authorization. Repeated X-PAYMENT headers skip the facilitator and already settled
+            payments are rejected locally.
+        local_verify (bool, optional): Check the payment signature, recipient, amount and validity
+            window in-process first, so invalid payments are rejected without calling the facilitator.
+        settlement_queue (Optional[SettlementQueue], optional): Settle payments in the background instead
+            of before the response is returned. The response is sent without an X-PAYMENT-RESPONSE
+            header; the settle result is available from the queue's callback and result store.
+        settlement_journal (Optional[SettlementJournal], optional): Journal payments before settling them
+            inline. If the settle call fails after the handler ran, the handler's response is returned
+            and the payment stays pending; pending payments are resubmitted on the first request after
+            a restart. Ignored with a settlement_queue, which uses its own journal.
 
     Returns:
         Callable: FastAPI middleware function that checks for valid payment before processing requests
     """
 
-    # Validate network is supported
-    supported_networks = get_args(SupportedNetworks)
-    if network not in supported_networks:
-        raise ValueError(
-            f"Unsupported network: {network}. Must be one of: {supported_networks}"
-        )
-
-    try:
-        max_amount_required, asset_address, eip712_domain = (
-            process_price_to_atomic_amount(price, network)
-        )
-    except Exception as e:
-        raise ValueError(f"Invalid price: {price}. Error: {e}")
+    route = _PaymentRoute(
+        price=price,
+        pay_to_address=pay_to_address,
+        description=description,
+        mime_type=mime_type,
+        max_deadline_seconds=max_deadline_seconds,
+        output_schema=output_schema,
+        facilitator_config=facilitator_config,
+        network=network,
+        resource=resource,
+        paywall_config=paywall_config,
+        custom_paywall_html=custom_paywall_html,
+        facilitator=facilitator,
+        verify_cache=verify_cache,
+        local_verify=local_verify,
+        settlement_queue=settlement_queue,
+        settlement_journal=settlement_journal,
+    )
 
-    facilitator = FacilitatorClient(facilitator_config)
+    routes: RouteTable[bool] = RouteTable()
+    routes.add(path, True)
 
     async def middleware(request: Request, call_next: Callable):
+        route.resubmit_recovered()
+
         # Skip if the path is not the same as the path in the middleware
-        if not path_is_match(path, request.url.path):
+        if routes.match(request.url.path) is None:
             return await call_next(request)
 
-        # Get resource URL if not explicitly provided
-        resource_url = resource or str(request.url)
+        verified = await route.verify(request)
+        if isinstance(verified, Response):
+            return verified
 
-        # Ensure output_schema and extra are objects, not null
-        output_schema_obj = {} if output_schema is None else output_schema
+        request.state.payment_details = verified.payment_requirements
+        request.state.verify_response = verified.verify_response
 
-        # Construct payment details
-        payment_requirements = [
-            PaymentRequirements(
-                scheme="exact",
-                network=cast(SupportedNetworks, network),
-                asset=asset_address,
-                max_amount_required=max_amount_required,
-                resource=resource_url,
-                description=description,
-                mime_type=mime_type,
-                pay_to=pay_to_address,
-                max_timeout_seconds=max_deadline_seconds,
-                output_schema=output_schema_obj,
-                extra=eip712_domain,
-            )
-        ]
-
-        def x402_response(error: str):
-            """Create a 402 response with payment requirements."""
-            request_headers = dict(request.headers)
-            status_code = 402
-
-            if is_browser_request(request_headers):
-                html_content = custom_paywall_html or get_paywall_html(
-                    error, payment_requirements, paywall_config
-                )
-                headers = {"Content-Type": "text/html; charset=utf-8"}
+        # Process the request
+        response = await call_next(request)
 
-                return HTMLResponse(
-                    content=html_content,
-                    status_code=status_code,
-                    headers=headers,
-                )
-            else:
-                response_data = x402PaymentRequiredResponse(
-                    x402_version=x402_VERSION,
-                    accepts=payment_requirements,
-                    error=error,
-                ).model_dump(by_alias=True)
-                headers = {"Content-Type": "application/json"}
-
-                return JSONResponse(
-                    content=response_data,
-                    status_code=status_code,
-                    headers=headers,
-                )
+        # Early return without settling if the response is not a 2xx
+        if response.status_code < 200 or response.status_code >= 300:
+            return response
 
-        # Check for payment header
-        payment_header = request.headers.get("X-PAYMENT", "")
+        settlement = await route.settle(verified, request.headers)
+        if settlement.error_response is not None:
+            return settlement.error_response
+        if settlement.header is not None:
+            response.headers["X-PAYMENT-RESPONSE"] = settlement.header
 
-        if payment_header == "":
-            return x402_response("No X-PAYMENT header provided")
+        return response
 
-        # Decode payment header
-        try:
-            payment_dict = json.loads(safe_base64_decode(payment_header))
-            payment = PaymentPayload(**payment_dict)
-        except Exception as e:
-            logger.warning(
-                f"Invalid payment header format from {request.client.host if request.client else 'unknown'}: {str(e)}"
-            )
-            return x402_response("Invalid payment header format")
+    return middleware
 
-        # Find matching payment requirements
-        selected_payment_requirements = find_matching_payment_requirements(
-            payment_requirements, payment
-        )
 
-        if not selected_payment_requirements:
-            return x402_response("No matching payment requirements found")
+class X402PaymentMiddleware:
+    """Pure ASGI middleware that gates routes behind x402 payments.
+
+    Unlike `require_payment`, which runs inside Starlette's
+    `BaseHTTPMiddleware`, this wraps the ASGI app directly: the response is
+    passed through message by message, so streaming and file responses are
+    never buffered. Payments are settled when the handler starts a 2xx
+    response, before its headers are sent, so `X-PAYMENT-RESPONSE` is added to
+    the response start and a failed settlement can still turn into a 402.
 
-        # Verify payment
-        verify_response = await facilitator.verify(
-            payment, selected_payment_requirements
+    With `settlement_mode="trailer"`, settlement instead runs while the body
+    streams and `X-PAYMENT-RESPONSE` is sent as an HTTP trailer, so large
+    downloads do not wait for the facilitator before their first byte. This
+    needs a server that implements the ASGI `http.response.trailers`
+    extension; otherwise the route falls back to settling before the body.
+
+    Several route configurations can share one instance, as with the Flask
+    `PaymentMiddleware`. Exact paths take precedence over patterns; among
+    patterns, the earliest registered configuration wins.
+
+    Usage:
+        app.add_middleware(
+            X402PaymentMiddleware,
+            routes=[{"path": "/weather", "price": "$0.001", "pay_to_address": "0x..."}],
         )
 
-        if not verify_response.is_valid:
-            error_reason = verify_response.invalid_reason or "Unknown error"
-            return x402_response(f"Invalid payment: {error_reason}")
+        # or wrap the app and register routes incrementally
+        payments = X402PaymentMiddleware(app)
+        payments.add(path="/premium/*", price="$0.01", pay_to_address="0x...")
+    """
 
-        request.state.payment_details = selected_payment_requirements
-        request.state.verify_response = verify_response
+    def __init__(self, app: Any, routes: Optional[list[dict[str, Any]]] = None):
+        """Initialize the middleware.
 
-        # Process the request
-        response = await call_next(request)
+        Args:
+            app: ASGI application to wrap
+            routes: Optional route configurations, each passed to `add` as keyword arguments
+        """
+        self.app = app
+        self.middleware_configs: list[dict[str, Any]] = []
+        self._routes: RouteTable[_MountedRoute] = RouteTable()
+        for config in routes or []:
+            self.add(**config)
 
-        # Early return without settling if the response is not a 2xx
-        if response.status_code < 200 or response.status_code >= 300:
-            return response
+    @validate_call(config=ConfigDict(arbitrary_types_allowed=True))
+    def add(
+        self,
+        price: Union[Price, PriceCallback],
+        pay_to_address: str,
+        path: str | list[str] = "*",
+        description: str = "",
+        mime_type: str = "",
+        max_deadline_seconds: int = 60,
+        output_schema: Any = None,
+        facilitator_config: Optional[FacilitatorConfig] = None,
+        network: str = "base-sepolia",
+        resource: Optional[str] = None,
+        paywall_config: Optional[PaywallConfig] = None,
+        custom_paywall_html: Optional[str] = None,
+        facilitator: Optional[Facilitator] = None,
+        verify_cache: Optional[VerifyCache] = None,
+        local_verify: bool = False,
+        settlement_queue: Optional[SettlementQueue] = None,
+        settlement_journal: Optional[SettlementJournal] = None,
+        settlement_mode: str = "before_body",
+    ) -> None:
+        """Add a payment configuration.
 
-        # Settle the payment
-        try:
-            settle_response = await facilitator.settle(
-                payment, selected_payment_requirements
+        Takes the same arguments as `require_payment`, plus:
+
+        Args:
+            settlement_mode (str, optional): "before_body" settles before the response
+                starts, so a failed settlement is returned as a 402. "trailer" starts the
+                response right away and sends X-PAYMENT-RESPONSE as a trailer once the
+                body has been sent; a failed settlement can then no longer withhold the
+                content and is only logged, so pair it with a settlement_journal.
+                Defaults to "before_body".
+        """
+        if settlement_mode not in SETTLEMENT_MODES:
+            raise ValueError(
+                f"Unsupported settlement_mode: {settlement_mode}. "
+                f"Must be one of: {SETTLEMENT_MODES}"
             )
-            if settle_response.success:
-                response.headers["X-PAYMENT-RESPONSE"] = base64.b64encode(
-                    settle_response.model_dump_json(by_alias=True).encode("utf-8")
-                ).decode("utf-8")
-            else:
-                return x402_response(
-                    "Settle failed: "
-                    + (settle_response.error_reason or "Unknown error")
-                )
-        except Exception:
-            return x402_response("Settle failed")
+        config = {
+            "price": price,
+            "pay_to_address": pay_to_address,
+            "path": path,
+            "description": description,
+            "mime_type": mime_type,
+            "max_deadline_seconds": max_deadline_seconds,
+            "output_schema": output_schema,
+            "facilitator_config": facilitator_config,
+            "network": network,
+            "resource": resource,
+            "paywall_config": paywall_config,
+            "custom_paywall_html": custom_paywall_html,
+            "facilitator": facilitator,
+            "verify_cache": verify_cache,
+            "local_verify": local_verify,
+            "settlement_queue": settlement_queue,
+            "settlement_journal": settlement_journal,
+        }
+        route = _PaymentRoute(**{k: v for k, v in config.items() if k != "path"})
+        config["settlement_mode"] = settlement_mode
+        self.middleware_configs.append(config)
+        self._routes.add(path, _MountedRoute(route, settlement_mode))
 
-        return response
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    return middleware
+        mounted = self._routes.match(scope["path"])
+        if mounted is None:
+            await self.app(scope, receive, send)
+            return
+
+        route = mounted.route
+        route.resubmit_recovered()
+        request = Request(scope, receive)
+        verified = await route.verify(request)
+        if isinstance(verified, Response):
+            await verified(scope, receive, send)
+            return
+
+        request.state.payment_details = verified.payment_requirements
+        request.state.verify_response = verified.verify_response
+
+        if (
+            mounted.settlement_mode == "trailer"
+            and "http.response.trailers" in scope.get("extensions", {})
+        ):
+            send = self._trailer_send(route, verified, request, send)
+            await self.app(scope, receive, send)
+            return
+
+        replaced = False
+
+        async def send_with_settlement(message) -> None:
+            nonlocal replaced
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if 200 <= status < 300:
+                    settlement = await route.settle(verified, request.headers)
+                    if settlement.error_response is not None:
+                        # Headers have not been sent yet, so the 402 can replace them
+                        replaced = True
+                        await settlement.error_response(scope, receive, send)
+                        return
+                    if settlement.header is not None:
+                        message = {
+                            **message,
+                            "headers": [
+                                *message.get("headers", []),
+                                (b"x-payment-response", settlement.header.encode()),
+                            ],
+                        }
+            elif replaced:
+                # Drop the handler's body once a 402 was sent in its place
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_with_settlement)
+
+    @staticmethod
+    def _trailer_send(
+        route: _PaymentRoute, verified: _VerifiedPayment, request: Request, send
+    ):
+        """Wrap send to settle while the body streams and report it in a trailer."""
+        settle_task: Optional[asyncio.Task] = None
+
+        async def send_with_trailer(message) -> None:
+            nonlocal settle_task
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                if 200 <= message["status"] < 300:
+                    # Kept alive if the client disconnects before the trailer
+                    settle_task = route.spawn(route.settle(verified, request.headers))
+                    message = {
+                        **message,
+                        "trailers": True,
+                        "headers": [
+                            *message.get("headers", []),
+                            (b"trailer", b"x-payment-response"),
+                        ],
+                    }
+                await send(message)
+                return
+
+            await send(message)
+            if settle_task is None:
+                return
+            if message_type == "http.response.pathsend" or (
+                message_type == "http.response.body"
+                and not message.get("more_body", False)
+            ):
+                task, settle_task = settle_task, None
+                trailers = []
+                try:
+                    settlement = await task
+                except Exception:
+                    logger.exception(
+                        "Settle failed for payment %s", settlement_id(verified.payment)
+                    )
+                else:
+                    if settlement.header is not None:
+                        trailers.append(
+                            (b"x-payment-response", settlement.header.encode())
+                        )
+                    elif settlement.error_response is not None:
+                        # The body is already out; the settlement can only be reported
+                        logger.warning(
+                            "Settle failed for payment %s after the body was sent",
+                            settlement_id(verified.payment),
+                        )
+                await send(
+                    {
+                        "type": "http.response.trailers",
+                        "headers": trailers,
+                        "more_trailers": False,
+                    }
+                )
+
+        return send_with_trailer
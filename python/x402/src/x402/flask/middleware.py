@@ -1,39 +1,65 @@
 import base64
-import json
-from typing import Any, Dict, Optional, Union, get_args, cast
-from flask import Flask, request, g
-from x402.path import path_is_match
+import logging
+from typing import Any, Callable, Dict, Optional, Union
+from flask import Flask, Request, request, g
+from werkzeug.wsgi import get_path_info
+from x402.path import RouteTable
 from x402.types import (
     Price,
-    PaymentPayload,
     PaymentRequirements,
-    x402PaymentRequiredResponse,
     PaywallConfig,
-    SupportedNetworks,
 )
-from x402.common import (
-    process_price_to_atomic_amount,
-    x402_VERSION,
-    find_matching_payment_requirements,
+from x402.chains import registry
+from x402.cache import CachedPaymentRequirements, LRUCache, VerifyCache
+from x402.common import process_price_to_atomic_amount
+from x402.decode import PaymentDecodeError, decode_payment_header
+from x402.exact import verify_payment_payload
+from x402.facilitator import (
+    Facilitator,
+    FacilitatorClient,
+    FacilitatorConfig,
+    SyncFacilitatorClient,
 )
-from x402.encoding import safe_base64_decode
-from x402.facilitator import FacilitatorClient, FacilitatorConfig
-from x402.paywall import is_browser_request, get_paywall_html
+from x402.journal import SettlementJournal
+from x402.paywall import is_browser_request, create_paywall_response
+from x402.settlement import settle_recovered, settlement_id
+
+logger = logging.getLogger(__name__)
 
 
 class ResponseWrapper:
-    """Wrapper to capture response status and headers for settlement logic."""
+    """Wrapper to capture response status and headers for settlement logic.
+
+    With a `settle` callback, the payment is settled when the application
+    starts a 2xx response, before its status and headers are passed on, so
+    headers added by the callback reach the client even for streamed bodies.
+    The callback receives the mutable header list and returns either None to
+    continue with the response, or a replacement body after it has started a
+    different response itself.
+    """
 
-    def __init__(self, start_response):
+    def __init__(self, start_response, settle=None):
         self.start_response = start_response
+        self.settle = settle
         self.status_code = None
         self.headers = []
         self.body = []
+        self.replacement = None
 
     def __call__(self, status, headers, exc_info=None):
         self.status_code = int(status.split()[0])
-        self.headers = headers
-        return self.start_response(status, headers, exc_info)
+        self.headers = list(headers)
+        if (
+            self.settle is not None
+            and exc_info is None
+            and 200 <= self.status_code < 300
+        ):
+            settle, self.settle = self.settle, None
+            self.replacement = settle(self.headers)
+            if self.replacement is not None:
+                # The replacement response has already been started
+                return lambda data: None
+        return self.start_response(status, self.headers, exc_info)
 
     def add_header(self, name, value):
         """Add a header to the response."""
@@ -49,15 +75,23 @@ class PaymentMiddleware:
         middleware = PaymentMiddleware(app)
         middleware.add(path="/weather", price="$0.001", pay_to_address="0x...")
         middleware.add(path="/premium/*", price=TokenAmount(...), pay_to_address="0x...")
+
+    All registrations share a single WSGI wrapper that resolves the request path
+    through a compiled RouteTable, so each request does one route lookup no matter
+    how many paths are priced. Exact paths take precedence over patterns; among
+    patterns, the earliest registered configuration wins.
     """
 
     def __init__(self, app: Flask):
         self.app = app
         self.middleware_configs = []
+        self._routes: RouteTable = RouteTable()
+        self._next_app = None
+        self._recovered_journals: list[SettlementJournal] = []
 
     def add(
         self,
-        price: Price,
+        price: Union[Price, Callable[[Request], Price]],
         pay_to_address: str,
         path: Union[str, list[str]] = "*",
         description: str = "",
@@ -69,12 +103,18 @@ class PaymentMiddleware:
         resource: Optional[str] = None,
         paywall_config: Optional[PaywallConfig] = None,
         custom_paywall_html: Optional[str] = None,
+        facilitator: Optional[Facilitator] = None,
+        verify_cache: Optional[VerifyCache] = None,
+        local_verify: bool = False,
+        settlement_journal: Optional[SettlementJournal] = None,
     ):
         """
         Add a payment middleware configuration.
 
         Args:
-            price (Price): Payment price (USD or TokenAmount)
+            price (Price | Callable[[Request], Price]): Payment price (USD or TokenAmount),
+                or a function of the Flask request returning one, to price each request.
+                Conversions and payment requirements are cached per price point.
             pay_to_address (str): Ethereum address to receive payment
             path (str | list[str], optional): Path(s) to protect. Defaults to "*".
             description (str, optional): Description of the resource
@@ -86,6 +126,15 @@ class PaymentMiddleware:
             resource (str, optional): Resource URL
             paywall_config (PaywallConfig, optional): Paywall UI customization config
             custom_paywall_html (str, optional): Custom HTML to display for paywall instead of default
+            facilitator (Facilitator, optional): Shared facilitator client to use instead of
+                creating one from facilitator_config
+            verify_cache (VerifyCache, optional): Cache of verify results that also rejects
+                replays of already settled payments
+            local_verify (bool, optional): Check the payment signature, recipient, amount and
+                validity window in-process before calling the facilitator
+            settlement_journal (SettlementJournal, optional): Journal payments before settling
+                them; payments whose settle call fails stay pending and are resubmitted in the
+                background when the journal is next registered, e.g. after a restart
         """
         config = {
             "price": price,
@@ -100,63 +149,103 @@ class PaymentMiddleware:
             "resource": resource,
             "paywall_config": paywall_config,
             "custom_paywall_html": custom_paywall_html,
+            "facilitator": facilitator,
+            "verify_cache": verify_cache,
+            "local_verify": local_verify,
+            "settlement_journal": settlement_journal,
         }
+        middleware = self._create_middleware(config, self._wsgi_app)
         self.middleware_configs.append(config)
-
-        # Apply the middleware to the app
-        self._apply_middleware()
-
-    def _apply_middleware(self):
-        """Apply all middleware configurations to the Flask app."""
-        # Create the middleware chain
-        current_wsgi_app = self.app.wsgi_app
-
-        for config in self.middleware_configs:
-            middleware = self._create_middleware(config, current_wsgi_app)
-            current_wsgi_app = middleware
-
-        self.app.wsgi_app = current_wsgi_app
+        self._routes.add(path, middleware)
+
+        # Install the dispatcher once; later registrations only extend the table
+        if self._next_app is None:
+            self._next_app = self.app.wsgi_app
+            self.app.wsgi_app = self._dispatch
+
+    def _wsgi_app(self, environ, start_response):
+        return self._next_app(environ, start_response)
+
+    def _dispatch(self, environ, start_response):
+        """Route the request to the matching payment middleware, if any."""
+        request_path = "/" + get_path_info(environ).lstrip("/")
+        middleware = self._routes.match(request_path)
+        if middleware is None:
+            return self._next_app(environ, start_response)
+        return middleware(environ, start_response)
+
+    def _recover_settlements(
+        self, journal: SettlementJournal, facilitator: SyncFacilitatorClient
+    ) -> None:
+        """Resubmit payments left pending in a journal by a previous run."""
+        if any(journal is recovered for recovered in self._recovered_journals):
+            return
+        self._recovered_journals.append(journal)
+
+        entries = journal.recover()
+        if not entries:
+            return
+        # Settles on the bridge loop so app startup is not held up
+        future = facilitator.bridge.submit(
+            settle_recovered(journal, entries, facilitator.facilitator)
+        )
+
+        def log_failure(f) -> None:
+            if not f.cancelled() and f.exception() is not None:
+                logger.error("Settlement recovery failed", exc_info=f.exception())
+
+        future.add_done_callback(log_failure)
 
     def _create_middleware(self, config: Dict[str, Any], next_app):
         """Create a WSGI middleware function for the given configuration."""
 
         # Validate network is supported
-        supported_networks = get_args(SupportedNetworks)
+        supported_networks = registry.networks
         if config["network"] not in supported_networks:
             raise ValueError(
                 f"Unsupported network: {config['network']}. Must be one of: {supported_networks}"
             )
 
         # Process price configuration (same as FastAPI)
-        try:
-            max_amount_required, asset_address, eip712_domain = (
-                process_price_to_atomic_amount(config["price"], config["network"])
-            )
-        except Exception as e:
-            raise ValueError(f"Invalid price: {config['price']}. Error: {e}")
-
-        facilitator = FacilitatorClient(config["facilitator_config"])
-
-        def middleware(environ, start_response):
-            # Create Flask request context
-            with self.app.request_context(environ):
-                # Skip if the path is not the same as the path in the middleware
-                if not path_is_match(config["path"], request.path):
-                    return next_app(environ, start_response)
-
-                # Get resource URL if not explicitly provided
-                resource_url = config["resource"] or request.url
-
-                # Ensure output_schema and extra are objects, not null
-                output_schema_obj = (
-                    {} if config["output_schema"] is None else config["output_schema"]
+        price_callback = config["price"] if callable(config["price"]) else None
+        static_quote = None
+        if price_callback is None:
+            try:
+                static_quote = process_price_to_atomic_amount(
+                    config["price"], config["network"]
                 )
-
-                # Construct payment details
-                payment_requirements = [
+            except Exception as e:
+                raise ValueError(f"Invalid price: {config['price']}. Error: {e}")
+
+        # Facilitator calls run on the shared background event loop, which keeps
+        # the connection pool warm across requests and worker threads
+        facilitator = SyncFacilitatorClient(
+            config["facilitator"] or FacilitatorClient(config["facilitator_config"])
+        )
+
+        settlement_journal = config["settlement_journal"]
+        if settlement_journal is not None:
+            self._recover_settlements(settlement_journal, facilitator)
+
+        # Ensure output_schema and extra are objects, not null
+        output_schema_obj = (
+            {} if config["output_schema"] is None else config["output_schema"]
+        )
+
+        # Requirements only vary by resource URL and price, so build them once for each
+        requirements_cache: LRUCache[tuple, CachedPaymentRequirements] = LRUCache()
+
+        def build_requirements(
+            resource_url: str,
+            max_amount_required: str,
+            asset_address: str,
+            eip712_domain: dict[str, str],
+        ) -> CachedPaymentRequirements:
+            return CachedPaymentRequirements(
+                [
                     PaymentRequirements(
                         scheme="exact",
-                        network=cast(SupportedNetworks, config["network"]),
+                        network=config["network"],
                         asset=asset_address,
                         max_amount_required=max_amount_required,
                         resource=resource_url,
@@ -168,36 +257,61 @@ class PaymentMiddleware:
                         extra=eip712_domain,
                     )
                 ]
+            )
+
+        def middleware(environ, start_response):
+            # Create Flask request context
+            with self.app.request_context(environ):
+                quote = static_quote or process_price_to_atomic_amount(
+                    price_callback(request), config["network"]
+                )
+                # Get resource URL if not explicitly provided
+                resource_url = config["resource"] or request.url
+                max_amount_required, asset_address, eip712_domain = quote
+                cached_requirements = requirements_cache.get_or_create(
+                    (
+                        resource_url,
+                        max_amount_required,
+                        asset_address,
+                        eip712_domain["name"],
+                        eip712_domain["version"],
+                    ),
+                    lambda: build_requirements(resource_url, *quote),
+                )
+                payment_requirements = cached_requirements.accepts
+
+                # Captured now, as settlement may run after this context has ended
+                request_headers = dict(request.headers)
 
                 def x402_response(error: str):
                     """Create a 402 response with payment requirements."""
-                    request_headers = dict(request.headers)
                     status = "402 Payment Required"
 
                     if is_browser_request(request_headers):
-                        html_content = config[
-                            "custom_paywall_html"
-                        ] or get_paywall_html(
-                            error, payment_requirements, config["paywall_config"]
+                        if config["custom_paywall_html"]:
+                            headers = [("Content-Type", "text/html; charset=utf-8")]
+                            start_response(status, headers)
+                            return [config["custom_paywall_html"].encode("utf-8")]
+
+                        paywall = create_paywall_response(
+                            request_headers,
+                            error,
+                            payment_requirements,
+                            config["paywall_config"],
                         )
-                        headers = [("Content-Type", "text/html; charset=utf-8")]
-
-                        start_response(status, headers)
-                        return [html_content.encode("utf-8")]
+                        if paywall.status_code == 304:
+                            status = "304 Not Modified"
+                        start_response(status, paywall.headers)
+                        return paywall.body
                     else:
-                        response_data = x402PaymentRequiredResponse(
-                            x402_version=x402_VERSION,
-                            accepts=payment_requirements,
-                            error=error,
-                        ).model_dump(by_alias=True)
-
+                        body = cached_requirements.response_body(error)
                         headers = [
                             ("Content-Type", "application/json"),
-                            ("Content-Length", str(len(json.dumps(response_data)))),
+                            ("Content-Length", str(len(body))),
                         ]
 
                         start_response(status, headers)
-                        return [json.dumps(response_data).encode("utf-8")]
+                        return [body]
 
                 # Check for payment header
                 payment_header = request.headers.get("X-PAYMENT", "")
@@ -207,30 +321,46 @@ class PaymentMiddleware:
 
                 # Decode payment header
                 try:
-                    payment_dict = json.loads(safe_base64_decode(payment_header))
-                    payment = PaymentPayload(**payment_dict)
-                except Exception as e:
+                    decoded = decode_payment_header(payment_header)
+                except PaymentDecodeError as e:
                     return x402_response(f"Invalid payment header format: {str(e)}")
+                g.payment = decoded
 
-                # Find matching payment requirements
-                selected_payment_requirements = find_matching_payment_requirements(
-                    payment_requirements, payment
-                )
+                # Find matching payment requirements before validating the payload
+                selected_payment_requirements = cached_requirements.index.match(decoded)
 
                 if not selected_payment_requirements:
                     return x402_response("No matching payment requirements found")
 
-                # Verify payment (async call in sync context)
-                import asyncio
-
                 try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    verify_response = loop.run_until_complete(
-                        facilitator.verify(payment, selected_payment_requirements)
+                    payment = decoded.payment
+                except PaymentDecodeError as e:
+                    return x402_response(f"Invalid payment header format: {str(e)}")
+
+                verify_cache = config["verify_cache"]
+                if verify_cache is not None and verify_cache.is_settled(payment):
+                    return x402_response("Invalid payment: payment already settled")
+
+                # Verify payment, reusing a cached result for retried headers
+                verify_response = (
+                    verify_cache.get(payment, selected_payment_requirements)
+                    if verify_cache is not None
+                    else None
+                )
+                if verify_response is None and config["local_verify"]:
+                    local_response = verify_payment_payload(
+                        payment, selected_payment_requirements
+                    )
+                    if not local_response.is_valid:
+                        verify_response = local_response
+                if verify_response is None:
+                    verify_response = facilitator.verify(
+                        payment, selected_payment_requirements
                     )
-                finally:
-                    loop.close()
+                    if verify_cache is not None:
+                        verify_cache.set(
+                            payment, selected_payment_requirements, verify_response
+                        )
 
                 if not verify_response.is_valid:
                     error_reason = verify_response.invalid_reason or "Unknown error"
@@ -240,45 +370,56 @@ class PaymentMiddleware:
                 g.payment_details = selected_payment_requirements
                 g.verify_response = verify_response
 
-                # Create response wrapper to capture status and headers
-                response_wrapper = ResponseWrapper(start_response)
+                def settle(response_headers):
+                    """Settle before the response starts, while headers can still change."""
+                    settlement = settlement_id(payment)
+                    if settlement_journal is not None:
+                        settlement_journal.append_pending(
+                            [(settlement, payment, selected_payment_requirements)]
+                        )
+                    try:
+                        settle_response = facilitator.settle(
+                            payment, selected_payment_requirements
+                        )
+                    except Exception:
+                        if settlement_journal is None:
+                            logger.exception("Settle failed for payment %s", settlement)
+                            return x402_response("Settle failed")
+                        # The handler already ran; keep the payment for a later retry
+                        logger.exception(
+                            "Settle failed, payment %s stays journaled", settlement
+                        )
+                        return None
 
-                # Process the request
-                response = next_app(environ, response_wrapper)
+                    if settlement_journal is not None:
+                        settlement_journal.append_done([settlement])
 
-                # Check if response is successful (2xx status code)
-                if (
-                    response_wrapper.status_code is not None
-                    and response_wrapper.status_code >= 200
-                    and response_wrapper.status_code < 300
-                ):
-                    # Settle the payment for successful responses
-                    try:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        settle_response = loop.run_until_complete(
-                            facilitator.settle(payment, selected_payment_requirements)
+                    if not settle_response.success:
+                        return x402_response(
+                            "Settle failed: "
+                            + (settle_response.error_reason or "Unknown error")
                         )
 
-                        if settle_response.success:
-                            # Add settlement response header
-                            settlement_header = base64.b64encode(
-                                settle_response.model_dump_json(by_alias=True).encode(
-                                    "utf-8"
-                                )
-                            ).decode("utf-8")
-                            response_wrapper.add_header(
-                                "X-PAYMENT-RESPONSE", settlement_header
-                            )
-                        else:
-                            # If settlement fails, we can't return a new response since headers are already sent
-                            # Just log the error and continue with the original response
-                            print(f"Settle failed: {settle_response.error_reason}")
-                    except Exception as e:
-                        # Log the error but don't try to return a new response
-                        print(f"Settle failed: {str(e)}")
-                    finally:
-                        loop.close()
+                    if verify_cache is not None:
+                        verify_cache.mark_settled(payment)
+                    # Add settlement response header
+                    settlement_header = base64.b64encode(
+                        settle_response.model_dump_json(by_alias=True).encode("utf-8")
+                    ).decode("utf-8")
+                    response_headers.append(("X-PAYMENT-RESPONSE", settlement_header))
+                    return None
+
+                # Settles when the application starts a successful response
+                response_wrapper = ResponseWrapper(start_response, settle)
+
+                # Process the request
+                response = next_app(environ, response_wrapper)
+
+                if response_wrapper.replacement is not None:
+                    # Settlement failed; discard the handler's body
+                    if hasattr(response, "close"):
+                        response.close()
+                    return response_wrapper.replacement
 
                 return response
 
@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from x402.types import PaymentPayload, PaymentRequirements
+
+DEFAULT_COMPACT_THRESHOLD = 10_000
+
+
+class JournalEntry(NamedTuple):
+    id: str
+    payment: PaymentPayload
+    payment_requirements: PaymentRequirements
+
+
+class SettlementJournal:
+    """Durable write-ahead journal of payments awaiting settlement.
+
+    The journal is an append-only JSON lines file. A `pending` record is
+    written before a verified payment is settled and a `done` record once the
+    facilitator has answered, so replaying the file yields every payment that
+    was accepted but never settled.
+
+    Writes are group committed: concurrent writers hand their records to
+    whichever thread is currently flushing, which writes and fsyncs them
+    together, so the cost of an fsync is shared by every record waiting on it
+    instead of paid per request. A write returns once its records are on disk.
+
+    The file is compacted in place once it holds `compact_threshold` records
+    more than the pending payments need, by atomically replacing it with one
+    that only contains the pending records.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync: bool = True,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+    ):
+        """Initialize the journal.
+
+        Args:
+            path: File to append to. It is created on the first write.
+            fsync: Sync every group commit to disk. Without it records survive
+                a process crash but not an operating system crash.
+            compact_threshold: Number of obsolete records that triggers compaction
+        """
+        self.path = path
+        self.fsync = fsync
+        self.compact_threshold = compact_threshold
+        self._cond = threading.Condition()
+        self._file = None
+        self._loaded = False
+        # Serialized pending record for every unsettled payment
+        self._live: Dict[str, bytes] = {}
+        self._records = 0
+
+        # Group commit state, guarded by _cond
+        self._buffer: List[bytes] = []
+        self._buffered_seq = 0
+        self._durable_seq = 0
+        self._flushing = False
+        self._failed: Optional[Tuple[int, int, BaseException]] = None
+
+    def _load(self) -> None:
+        """Replay the file into the live set. Called with _cond held."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final line from a crash mid-write
+                    break
+                valid_size += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._records += 1
+                if record.get("op") == "pending":
+                    self._live[record["id"]] = line
+                elif record.get("op") == "done":
+                    self._live.pop(record["id"], None)
+        if valid_size < os.path.getsize(self.path):
+            # Drop the torn line so new records start on a line of their own
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _commit(self, lines: List[bytes]) -> None:
+        """Append lines and block until they are durable. Called with _cond held."""
+        self._buffer.extend(lines)
+        self._buffered_seq += 1
+        seq = self._buffered_seq
+
+        while self._durable_seq < seq:
+            if self._flushing:
+                # Another thread is flushing; our records go in its next batch
+                self._cond.wait()
+                continue
+
+            self._flushing = True
+            batch, self._buffer = self._buffer, []
+            first, last = self._durable_seq + 1, self._buffered_seq
+            error: Optional[BaseException] = None
+            self._cond.release()
+            try:
+                f = self._open()
+                f.write(b"".join(batch))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            except BaseException as e:
+                error = e
+            finally:
+                self._cond.acquire()
+                self._flushing = False
+                self._durable_seq = last
+                if error is not None:
+                    self._failed = (first, last, error)
+                self._cond.notify_all()
+
+        if self._failed is not None and self._failed[0] <= seq <= self._failed[1]:
+            raise OSError("settlement journal write failed") from self._failed[2]
+
+    def _write(self, lines: List[bytes]) -> None:
+        if not lines:
+            return
+        with self._cond:
+            self._commit(lines)
+            if self._records - len(self._live) >= self.compact_threshold:
+                self._compact()
+
+    def append_pending(
+        self, entries: Iterable[Tuple[str, PaymentPayload, PaymentRequirements]]
+    ) -> None:
+        """Durably record payments that still have to be settled."""
+        lines = []
+        with self._cond:
+            self._load()
+            for settlement_id, payment, payment_requirements in entries:
+                line = _encode(
+                    {
+                        "op": "pending",
+                        "id": settlement_id,
+                        "payment": payment.model_dump(by_alias=True),
+                        "requirements": payment_requirements.model_dump(by_alias=True),
+                    }
+                )
+                self._live[settlement_id] = line
+                lines.append(line)
+            self._records += len(lines)
+        self._write(lines)
+
+    def append_done(self, settlement_ids: Iterable[str]) -> None:
+        """Durably record that settlements have completed."""
+        lines = []
+        with self._cond:
+            self._load()
+            for settlement_id in settlement_ids:
+                self._live.pop(settlement_id, None)
+                lines.append(_encode({"op": "done", "id": settlement_id}))
+            self._records += len(lines)
+        self._write(lines)
+
+    def pending(self) -> List[JournalEntry]:
+        """Return the payments that have no `done` record."""
+        with self._cond:
+            self._load()
+            lines = list(self._live.values())
+        entries = []
+        for line in lines:
+            record = json.loads(line)
+            entries.append(
+                JournalEntry(
+                    record["id"],
+                    PaymentPayload(**record["payment"]),
+                    PaymentRequirements(**record["requirements"]),
+                )
+            )
+        return entries
+
+    def recover(self) -> List[JournalEntry]:
+        """Replay and compact the journal, returning the unsettled payments.
+
+        Call once on startup, before new payments are written, and resubmit
+        the returned entries for settlement.
+        """
+        with self._cond:
+            self._load()
+            self._compact()
+        return self.pending()
+
+    def compact(self) -> None:
+        """Rewrite the journal so it only holds pending records."""
+        with self._cond:
+            self._load()
+            self._compact()
+
+    def _compact(self) -> None:
+        """Atomically replace the file with the live records. Called with _cond held."""
+        while self._flushing:
+            self._cond.wait()
+
+        tmp_path = f"{self.path}.compact"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(self._live.values()))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp_path, self.path)
+        if self.fsync:
+            _fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+        self._records = len(self._live)
+
+    def __len__(self) -> int:
+        """Number of pending payments."""
+        with self._cond:
+            self._load()
+            return len(self._live)
+
+    def close(self) -> None:
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            f, self._file = self._file, None
+        if f is not None:
+            f.close()
+
+
+def _encode(record: dict) -> bytes:
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _fsync_directory(path: str) -> None:
+    # Makes the rename itself durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
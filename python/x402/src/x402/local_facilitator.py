@@ -0,0 +1,462 @@
+import asyncio
+import logging
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from x402.chains import registry
+from x402.common import x402_VERSION
+from x402.exact import verify_payment_payload
+from x402.facilitator import DEFAULT_MAX_BATCH_SIZE, MicroBatcher
+from x402.nonces import NonceStore
+from x402.types import (
+    PaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_BATCH_WINDOW_SECONDS = 0.01
+DEFAULT_TRANSFER_GAS = 120_000
+DEFAULT_RECEIPT_TIMEOUT_SECONDS = 120.0
+
+
+class TransferAuthorization(NamedTuple):
+    """A signed EIP-3009 `transferWithAuthorization` call, ready to submit."""
+
+    asset: str
+    from_: str
+    to: str
+    value: int
+    valid_after: int
+    valid_before: int
+    nonce: str
+    signature: str
+
+    @classmethod
+    def from_payment(
+        cls, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> "TransferAuthorization":
+        authorization = payment.payload.authorization
+        return cls(
+            asset=payment_requirements.asset,
+            from_=authorization.from_,
+            to=authorization.to,
+            value=int(authorization.value),
+            valid_after=int(authorization.valid_after),
+            valid_before=int(authorization.valid_before),
+            nonce=authorization.nonce,
+            signature=payment.payload.signature,
+        )
+
+
+class TransferReceipt(NamedTuple):
+    """Outcome of one submitted transfer."""
+
+    transaction: Optional[str]
+    success: bool
+
+
+class TransferPendingError(Exception):
+    """A transfer was broadcast, but whether it was mined is not known."""
+
+    def __init__(self, transaction: str):
+        super().__init__(f"Transfer {transaction} was sent but has no receipt")
+        self.transaction = transaction
+
+
+class ChainBackend(Protocol):
+    """Chain access used by `LocalFacilitator`.
+
+    Networks are x402 network names, assets are token contract addresses.
+    """
+
+    async def balance_of(self, network: str, asset: str, owner: str) -> int:
+        """Token balance of an address, in atomic units."""
+        ...
+
+    async def authorization_used(
+        self, network: str, asset: str, authorizer: str, nonce: str
+    ) -> bool:
+        """Whether an EIP-3009 nonce was already used or canceled on chain."""
+        ...
+
+    async def submit_transfers(
+        self, network: str, transfers: Sequence[TransferAuthorization]
+    ) -> List[Union[TransferReceipt, BaseException]]:
+        """Submit transfers and wait for them to be mined.
+
+        Returns one receipt per transfer in order, or the error submitting
+        that transfer failed with. A transfer that was broadcast but has no
+        receipt, e.g. on a timeout, must be reported as `TransferPendingError`
+        and not as any other error, which means it never reached the chain.
+        """
+        ...
+
+
+class LocalFacilitator:
+    """In-process facilitator for the exact scheme.
+
+    Verifies payments next to the application instead of calling a remote
+    facilitator: the EIP-3009 signature, recipient, amount and validity window
+    are checked locally, and the payer's balance and the nonce's on-chain state
+    through a `ChainBackend`. Nonces being or already settled through this
+    facilitator are rejected without asking the chain.
+
+    `settle` re-verifies the payment and submits `transferWithAuthorization`.
+    Settle calls made within `batch_window` seconds of each other are handed
+    to the backend together, per network, so it can submit them back to back.
+    A transfer that was sent but has no receipt yet is answered with a failed
+    `SettleResponse` carrying its transaction hash, and its nonce stays
+    claimed so the payment is not submitted again.
+
+    It implements the `x402.facilitator.Facilitator` protocol, so it can be
+    passed to the middlewares, `SyncFacilitatorClient` and
+    `SettlementQueue` as is. `x402.fastapi.facilitator.create_facilitator_app`
+    serves it over HTTP to other applications.
+    """
+
+    def __init__(
+        self,
+        backend: ChainBackend,
+        networks: Optional[Iterable[str]] = None,
+        batch_window: Optional[float] = DEFAULT_SETTLE_BATCH_WINDOW_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        nonce_store: Optional[NonceStore] = None,
+    ):
+        """Initialize the local facilitator.
+
+        Args:
+            backend: Chain access for balances, nonce state and submission
+            networks: Networks to accept payments on. Defaults to every network
+                in the chain registry.
+            batch_window: Seconds to collect settle calls into one submission.
+                None submits each payment on its own.
+            max_batch_size: Maximum number of transfers per submission
+            nonce_store: Store of nonces being or already settled. Defaults to
+                an in-memory store; a file-backed one survives restarts.
+        """
+        self.backend = backend
+        self.networks = tuple(networks) if networks is not None else registry.networks
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._submitters: Dict[str, MicroBatcher] = {}
+        self.nonce_store = nonce_store if nonce_store is not None else NonceStore()
+
+    async def aclose(self) -> None:
+        """Nothing to release; the backend's connections are its own."""
+
+    async def __aenter__(self) -> "LocalFacilitator":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def supported(self) -> List[Dict[str, Any]]:
+        """The payment kinds this facilitator accepts, as served by `/supported`."""
+        return [
+            {"x402Version": x402_VERSION, "scheme": "exact", "network": network}
+            for network in self.networks
+        ]
+
+    async def verify(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment locally and against the chain"""
+        payer = payment.payload.authorization.from_
+
+        def invalid(reason: str) -> VerifyResponse:
+            return VerifyResponse(is_valid=False, invalid_reason=reason, payer=payer)
+
+        if payment.network not in self.networks:
+            return invalid("invalid_network")
+        result = verify_payment_payload(payment, payment_requirements)
+        if not result.is_valid:
+            return result
+        authorization = payment.payload.authorization
+        if (authorization.from_, authorization.nonce) in self.nonce_store:
+            return invalid("invalid_transaction_state")
+
+        used, balance = await asyncio.gather(
+            self.backend.authorization_used(
+                payment.network,
+                payment_requirements.asset,
+                authorization.from_,
+                authorization.nonce,
+            ),
+            self.backend.balance_of(
+                payment.network, payment_requirements.asset, authorization.from_
+            ),
+        )
+        if used:
+            return invalid("invalid_transaction_state")
+        if balance < int(authorization.value):
+            return invalid("insufficient_funds")
+        return result
+
+    async def settle(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        """Re-verify a payment and submit its transfer on chain"""
+        payer = payment.payload.authorization.from_
+
+        def failed(reason: str, transaction: Optional[str] = None) -> SettleResponse:
+            return SettleResponse(
+                success=False,
+                error_reason=reason,
+                transaction=transaction,
+                network=payment.network,
+                payer=payer,
+            )
+
+        verification = await self.verify(payment, payment_requirements)
+        if not verification.is_valid:
+            return failed(verification.invalid_reason or "invalid_payload")
+
+        # Claimed before submitting, so concurrent settles of one payment
+        # submit it once
+        authorization = payment.payload.authorization
+        if not self.nonce_store.add(
+            authorization.from_, authorization.nonce, int(authorization.valid_before)
+        ):
+            return failed("invalid_transaction_state")
+
+        transfer = TransferAuthorization.from_payment(payment, payment_requirements)
+        try:
+            receipt = await self._submit(payment.network, transfer)
+        except TransferPendingError as e:
+            # May still be mined, so the nonce stays claimed
+            logger.warning("%s; keeping its nonce claimed", e)
+            return failed("unexpected_settle_error", e.transaction)
+        except Exception:
+            logger.exception("Submitting transfer for %s failed", payer)
+            # Never broadcast, so the authorization can still be used
+            self.nonce_store.discard(authorization.from_, authorization.nonce)
+            return failed("unexpected_settle_error")
+        if not receipt.success:
+            # A reverted transfer does not consume the nonce
+            self.nonce_store.discard(authorization.from_, authorization.nonce)
+            return failed("invalid_transaction_state", receipt.transaction)
+
+        return SettleResponse(
+            success=True,
+            transaction=receipt.transaction,
+            network=payment.network,
+            payer=payer,
+        )
+
+    async def _submit(
+        self, network: str, transfer: TransferAuthorization
+    ) -> TransferReceipt:
+        if self._batch_window is None:
+            result = (await self.backend.submit_transfers(network, [transfer]))[0]
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        submitter = self._submitters.get(network)
+        if submitter is None:
+            submitter = self._submitters[network] = MicroBatcher(
+                lambda transfers: self.backend.submit_transfers(network, transfers),
+                self._batch_window,
+                self._max_batch_size,
+            )
+        return await submitter.submit(transfer)
+
+
+# transferWithAuthorization with a split signature is implemented by every
+# EIP-3009 token, including USDC before v2.2
+_EIP3009_ABI = [
+    {
+        "name": "balanceOf",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "account", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "name": "authorizationState",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [
+            {"name": "authorizer", "type": "address"},
+            {"name": "nonce", "type": "bytes32"},
+        ],
+        "outputs": [{"name": "", "type": "bool"}],
+    },
+    {
+        "name": "transferWithAuthorization",
+        "type": "function",
+        "stateMutability": "nonpayable",
+        "inputs": [
+            {"name": "from", "type": "address"},
+            {"name": "to", "type": "address"},
+            {"name": "value", "type": "uint256"},
+            {"name": "validAfter", "type": "uint256"},
+            {"name": "validBefore", "type": "uint256"},
+            {"name": "nonce", "type": "bytes32"},
+            {"name": "v", "type": "uint8"},
+            {"name": "r", "type": "bytes32"},
+            {"name": "s", "type": "bytes32"},
+        ],
+        "outputs": [],
+    },
+]
+
+
+def _hex_bytes(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+class Web3ChainBackend:
+    """`ChainBackend` over JSON-RPC with web3.py.
+
+    Transfers are sent from `account`, which pays the gas. A batch is signed
+    and sent with consecutive account nonces without waiting in between, and
+    the receipts are then awaited together, so a batch costs about one block
+    instead of one block per transfer. A transfer whose send fails is
+    reported as `TransferPendingError`, since the node may have broadcast it.
+    """
+
+    def __init__(
+        self,
+        rpc_urls: Dict[str, str],
+        account: Any,
+        gas: int = DEFAULT_TRANSFER_GAS,
+        receipt_timeout: float = DEFAULT_RECEIPT_TIMEOUT_SECONDS,
+    ):
+        """Initialize the backend.
+
+        Args:
+            rpc_urls: JSON-RPC URL per network name
+            account: eth_account LocalAccount that submits the transfers
+            gas: Gas limit of one transferWithAuthorization call
+            receipt_timeout: Seconds to wait for a transfer to be mined
+        """
+        # Imported here: web3 is slow to import and only needed to settle
+        from web3 import AsyncHTTPProvider, AsyncWeb3
+
+        self.account = account
+        self.gas = gas
+        self.receipt_timeout = receipt_timeout
+        self._web3 = {
+            network: AsyncWeb3(AsyncHTTPProvider(url))
+            for network, url in rpc_urls.items()
+        }
+        # Account nonces must be handed out in order per chain
+        self._send_locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def networks(self) -> Tuple[str, ...]:
+        return tuple(self._web3)
+
+    def _token(self, network: str, asset: str) -> Any:
+        web3 = self._web3.get(network)
+        if web3 is None:
+            raise ValueError(f"No RPC URL configured for network {network}")
+        return web3.eth.contract(
+            address=web3.to_checksum_address(asset), abi=_EIP3009_ABI
+        )
+
+    async def balance_of(self, network: str, asset: str, owner: str) -> int:
+        token = self._token(network, asset)
+        return await token.functions.balanceOf(
+            token.w3.to_checksum_address(owner)
+        ).call()
+
+    async def authorization_used(
+        self, network: str, asset: str, authorizer: str, nonce: str
+    ) -> bool:
+        token = self._token(network, asset)
+        return await token.functions.authorizationState(
+            token.w3.to_checksum_address(authorizer), _hex_bytes(nonce)
+        ).call()
+
+    async def submit_transfers(
+        self, network: str, transfers: Sequence[TransferAuthorization]
+    ) -> List[Union[TransferReceipt, BaseException]]:
+        web3 = self._web3[network]
+        chain_id = int(registry.chain_id(network))
+        results: List[Union[TransferReceipt, BaseException, bytes]] = []
+
+        lock = self._send_locks.setdefault(network, asyncio.Lock())
+        async with lock:
+            account_nonce = await web3.eth.get_transaction_count(
+                self.account.address, "pending"
+            )
+            for transfer in transfers:
+                try:
+                    signature = _hex_bytes(transfer.signature)
+                    v = signature[64] if signature[64] >= 27 else signature[64] + 27
+                    token = self._token(network, transfer.asset)
+                    transaction = await token.functions.transferWithAuthorization(
+                        web3.to_checksum_address(transfer.from_),
+                        web3.to_checksum_address(transfer.to),
+                        transfer.value,
+                        transfer.valid_after,
+                        transfer.valid_before,
+                        _hex_bytes(transfer.nonce),
+                        v,
+                        signature[:32],
+                        signature[32:64],
+                    ).build_transaction(
+                        {
+                            "from": self.account.address,
+                            "nonce": account_nonce,
+                            "gas": self.gas,
+                            "chainId": chain_id,
+                        }
+                    )
+                    signed = self.account.sign_transaction(transaction)
+                except Exception as e:
+                    # Nothing was sent, so the next transfer reuses the account nonce
+                    results.append(e)
+                    continue
+                account_nonce += 1
+                try:
+                    results.append(
+                        await web3.eth.send_raw_transaction(signed.raw_transaction)
+                    )
+                except Exception as e:
+                    # The node may have broadcast it before failing, e.g. on a
+                    # timeout, so treat the transaction as pending under its hash
+                    pending = TransferPendingError(web3.to_hex(signed.hash))
+                    pending.__cause__ = e
+                    results.append(pending)
+
+        async def mined(tx_hash: bytes) -> TransferReceipt:
+            try:
+                receipt = await web3.eth.wait_for_transaction_receipt(
+                    tx_hash, timeout=self.receipt_timeout
+                )
+            except Exception as e:
+                raise TransferPendingError(web3.to_hex(tx_hash)) from e
+            return TransferReceipt(
+                transaction=web3.to_hex(tx_hash), success=receipt["status"] == 1
+            )
+
+        receipts = iter(
+            await asyncio.gather(
+                *(
+                    mined(result)
+                    for result in results
+                    if not isinstance(result, BaseException)
+                ),
+                return_exceptions=True,
+            )
+        )
+        return [
+            result if isinstance(result, BaseException) else next(receipts)
+            for result in results
+        ]
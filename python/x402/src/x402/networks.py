@@ -1,11 +1,16 @@
-from typing import Literal
+from typing import Any, Literal
 
+from x402.chains import registry
 
+# The built-in networks. Others can be added at runtime with
+# `x402.chains.registry.register_network`.
 SupportedNetworks = Literal["base", "base-sepolia", "avalanche-fuji", "avalanche"]
 
-EVM_NETWORK_TO_CHAIN_ID = {
-    "base-sepolia": 84532,
-    "base": 8453,
-    "avalanche-fuji": 43113,
-    "avalanche": 43114,
-}
+
+def __getattr__(name: str) -> Any:
+    if name == "EVM_NETWORK_TO_CHAIN_ID":
+        # Built from the registry on access, so networks registered later appear
+        return {
+            network: int(registry.chain_id(network)) for network in registry.networks
+        }
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,299 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+DEFAULT_SHARDS = 16
+DEFAULT_SHARD_CAPACITY = 1024
+
+# Slot: validBefore (0 = empty, 1 = removed) and a 96-bit digest of (payer, nonce)
+_SLOT = struct.Struct("<I12s")
+_DIGEST_SIZE = 12
+# Shard file header: magic, slot count, slots in use
+_HEADER = struct.Struct("<8sQQ")
+_MAGIC = b"x402nonc"
+_EMPTY = 0
+_REMOVED = 1
+_MAX_EXPIRY = 0xFFFFFFFF
+# A shard is resized once this share of its slots is in use, to at most
+# _REBUILD_LOAD of it; with power-of-two sizes the load stays above a quarter
+_MAX_LOAD = 0.7
+_REBUILD_LOAD = 0.75 * _MAX_LOAD
+_MIN_SHARD_CAPACITY = 8
+_KEY_FILE = "key"
+_KEY_SIZE = 16
+
+
+def _next_power_of_two(n: int) -> int:
+    return 1 << max(n - 1, 1).bit_length()
+
+
+class _Shard:
+    """Open-addressing table with linear probing in a bytearray or an mmap.
+
+    Expired and removed slots are reused by inserts but skipped, not stopped
+    at, by lookups, so entries stored past them stay reachable.
+    """
+
+    __slots__ = ("lock", "table", "capacity", "used", "path", "file")
+
+    def __init__(self, capacity: int, path: Optional[Path] = None):
+        self.lock = threading.Lock()
+        self.path = path
+        self.file = None
+        if path is not None and path.exists():
+            self._open(path)
+        else:
+            self.capacity = capacity
+            self.used = 0
+            self.table = self._allocate(capacity, path)
+
+    def _open(self, path: Path) -> None:
+        self.file = path.open("r+b")
+        self.table = mmap.mmap(self.file.fileno(), 0)
+        if len(self.table) >= _HEADER.size:
+            magic, self.capacity, self.used = _HEADER.unpack_from(self.table, 0)
+            if (
+                magic == _MAGIC
+                and len(self.table) == _HEADER.size + self.capacity * _SLOT.size
+            ):
+                return
+        self.table.close()
+        self.file.close()
+        self.file = None
+        raise ValueError(f"{path} is not a nonce store shard")
+
+    def _allocate(self, capacity: int, path: Optional[Path]):
+        size = _HEADER.size + capacity * _SLOT.size
+        if path is None:
+            table = bytearray(size)
+        else:
+            with path.open("wb") as f:
+                f.truncate(size)
+            self.file = path.open("r+b")
+            table = mmap.mmap(self.file.fileno(), size)
+        _HEADER.pack_into(table, 0, _MAGIC, capacity, 0)
+        return table
+
+    def _find(self, digest: bytes, now: int) -> Tuple[int, int]:
+        """(offset of the live entry or -1, offset an insert would use)."""
+        mask = self.capacity - 1
+        i = int.from_bytes(digest[:8], "little") & mask
+        reusable = -1
+        table = self.table
+        while True:
+            offset = _HEADER.size + i * _SLOT.size
+            expiry, key = _SLOT.unpack_from(table, offset)
+            if expiry == _EMPTY:
+                return -1, offset if reusable < 0 else reusable
+            if expiry > now:
+                if key == digest:
+                    return offset, reusable
+            elif reusable < 0:
+                reusable = offset
+            i = (i + 1) & mask
+
+    def contains(self, digest: bytes, now: int) -> bool:
+        with self.lock:
+            return self._find(digest, now)[0] >= 0
+
+    def add(self, digest: bytes, expiry: int, now: int) -> bool:
+        with self.lock:
+            found, offset = self._find(digest, now)
+            if found >= 0:
+                return False
+            if _SLOT.unpack_from(self.table, offset)[0] == _EMPTY:
+                if self.used + 1 > self.capacity * _MAX_LOAD:
+                    self._rebuild(now)
+                    offset = self._find(digest, now)[1]
+                self.used += 1
+                _HEADER.pack_into(self.table, 0, _MAGIC, self.capacity, self.used)
+            _SLOT.pack_into(self.table, offset, expiry, digest)
+            return True
+
+    def discard(self, digest: bytes, now: int) -> None:
+        with self.lock:
+            found = self._find(digest, now)[0]
+            if found >= 0:
+                _SLOT.pack_into(self.table, found, _REMOVED, digest)
+
+    def _rebuild(self, now: int) -> None:
+        """Rehash the live entries into a table sized for them. Called with lock held."""
+        with memoryview(self.table) as view:
+            live: List[Tuple[int, bytes]] = [
+                (expiry, key)
+                for expiry, key in _SLOT.iter_unpack(view[_HEADER.size :])
+                if expiry > now
+            ]
+        capacity = max(
+            _next_power_of_two(int((len(live) + 1) / _REBUILD_LOAD) + 1),
+            _MIN_SHARD_CAPACITY,
+        )
+        if self.path is None:
+            self.table = self._allocate(capacity, None)
+            self.capacity = capacity
+        else:
+            # Written aside and swapped in, so a crash leaves the old shard intact
+            tmp = self.path.with_suffix(".tmp")
+            old_table, old_file = self.table, self.file
+            self.file = None
+            self.table = self._allocate(capacity, tmp)
+            self.capacity = capacity
+            old_table.close()
+            old_file.close()
+        self.used = 0
+        mask = capacity - 1
+        for expiry, key in live:
+            i = int.from_bytes(key[:8], "little") & mask
+            while _SLOT.unpack_from(self.table, _HEADER.size + i * _SLOT.size)[0]:
+                i = (i + 1) & mask
+            _SLOT.pack_into(self.table, _HEADER.size + i * _SLOT.size, expiry, key)
+        self.used = len(live)
+        _HEADER.pack_into(self.table, 0, _MAGIC, self.capacity, self.used)
+        if self.path is not None:
+            self.table.flush()
+            os.replace(tmp, self.path)
+
+    def flush(self) -> None:
+        with self.lock:
+            if isinstance(self.table, mmap.mmap):
+                self.table.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file is not None:
+                self.table.flush()
+                self.table.close()
+                self.file.close()
+                self.file = None
+
+
+class NonceStore:
+    """Set of used EIP-3009 (payer, nonce) pairs that expire at `validBefore`.
+
+    Built to hold millions of nonces in a replay guard. Each pair is stored as
+    a 96-bit keyed BLAKE2b digest next to its `validBefore` in a flat
+    open-addressing table, 16 bytes per slot and 23 to 61 bytes per nonce
+    depending on load, instead of a dict of hex strings. The hash key is
+    random per store, so digests cannot be made to collide on purpose; by
+    chance a false "already used" is about as likely as 1 in 10^15 with ten
+    million nonces stored.
+
+    Expired entries are reused in place and dropped when a shard is resized.
+    The table is split into shards, each with its own lock, so threads of a
+    WSGI server rarely contend.
+
+    With a `path`, every shard is a file mapped into memory, and the store
+    is reopened from it on the next start. Writes reach the file when the
+    operating system writes the pages back, at `flush()` or at `close()`.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, "os.PathLike[str]"]] = None,
+        shards: int = DEFAULT_SHARDS,
+        shard_capacity: int = DEFAULT_SHARD_CAPACITY,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the nonce store.
+
+        Args:
+            path: Optional directory to keep the store in. Created if missing;
+                an existing store there is reopened with its own shard count.
+            shards: Number of independently locked shards
+            shard_capacity: Initial number of slots per shard
+            clock: Function returning the current unix time, for testing
+        """
+        if shards <= 0 or shard_capacity <= 0:
+            raise ValueError("shards and shard_capacity must be positive")
+        self._clock = clock
+        self.path = Path(path) if path is not None else None
+        capacity = _next_power_of_two(shard_capacity)
+
+        if self.path is None:
+            self._key = os.urandom(_KEY_SIZE)
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            key_file = self.path / _KEY_FILE
+            if key_file.exists():
+                data = key_file.read_bytes()
+                self._key, shards = (
+                    data[:_KEY_SIZE],
+                    int.from_bytes(data[_KEY_SIZE:], "little"),
+                )
+            else:
+                self._key = os.urandom(_KEY_SIZE)
+                key_file.write_bytes(self._key + shards.to_bytes(4, "little"))
+
+        self._shards = [
+            _Shard(
+                capacity,
+                self.path / f"shard-{i:03d}" if self.path is not None else None,
+            )
+            for i in range(shards)
+        ]
+
+    def _digest(self, payer: str, nonce: str) -> bytes:
+        nonce = nonce.lower()
+        if nonce.startswith("0x"):
+            nonce = nonce[2:]
+        return hashlib.blake2b(
+            f"{payer.lower()}:{nonce}".encode(), digest_size=_DIGEST_SIZE, key=self._key
+        ).digest()
+
+    def _shard(self, digest: bytes) -> _Shard:
+        # The low bytes pick the slot within a shard, so shard on the others
+        return self._shards[int.from_bytes(digest[8:], "little") % len(self._shards)]
+
+    def add(self, payer: str, nonce: str, valid_before: int) -> bool:
+        """Record a nonce as used until `valid_before`.
+
+        Returns:
+            False if the nonce was already recorded and has not expired, in
+            which case nothing changes; True otherwise.
+        """
+        now = int(self._clock())
+        if valid_before <= now:
+            # Cannot be used on chain anymore, so there is nothing to guard
+            return True
+        digest = self._digest(payer, nonce)
+        return self._shard(digest).add(digest, min(valid_before, _MAX_EXPIRY), now)
+
+    def discard(self, payer: str, nonce: str) -> None:
+        """Forget a nonce, e.g. when the payment using it failed."""
+        digest = self._digest(payer, nonce)
+        self._shard(digest).discard(digest, int(self._clock()))
+
+    def __contains__(self, item: Tuple[str, str]) -> bool:
+        payer, nonce = item
+        digest = self._digest(payer, nonce)
+        return self._shard(digest).contains(digest, int(self._clock()))
+
+    def __len__(self) -> int:
+        """Number of slots in use, including expired ones not yet reclaimed."""
+        return sum(shard.used for shard in self._shards)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the tables in bytes."""
+        return sum(len(shard.table) for shard in self._shards)
+
+    def flush(self) -> None:
+        """Write a file-backed store's pages to disk."""
+        for shard in self._shards:
+            shard.flush()
+
+    def close(self) -> None:
+        """Flush and unmap a file-backed store. An in-memory store stays usable."""
+        for shard in self._shards:
+            shard.close()
+
+    def __enter__(self) -> "NonceStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,6 +1,189 @@
 import fnmatch
 import re
-from typing import Union
+from functools import lru_cache
+from typing import Generic, Iterable, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+_GLOB_CHARS = "*?["
+_REGEX_META = ".^$*+?{}[]\\|()"
+_REGEX_QUANTIFIERS = "*+?{"
+# Global inline flags such as "(?i)" cannot be embedded in an alternation
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+_MISSING = object()
+
+
+def _is_glob(pattern: str) -> bool:
+    return "*" in pattern or "?" in pattern
+
+
+def _literal_prefix(pattern: str) -> str:
+    for i, char in enumerate(pattern):
+        if char in _GLOB_CHARS:
+            return pattern[:i]
+    return pattern
+
+
+def _regex_literal_prefix(source: str) -> str:
+    """Return the literal text every match of a `re.match` pattern starts with."""
+    if "|" in source or _GLOBAL_FLAGS.search(source):
+        return ""
+    body = source[1:] if source.startswith("^") else source
+    for i, char in enumerate(body):
+        if char in _REGEX_META:
+            # A quantifier makes the preceding character optional or repeated
+            return body[: i - 1] if char in _REGEX_QUANTIFIERS else body[:i]
+    return body
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.entries: list[tuple[int, re.Pattern]] = []
+
+
+class RouteTable(Generic[T]):
+    """Compiled index of path patterns mapping to route values.
+
+    Patterns use the same syntax as `path_is_match`:
+    - Exact matching: "/api/users"
+    - Glob patterns: "/api/users/*", "/api/*/profile"
+    - Regex patterns (prefix with 'regex:'): "regex:^/api/users/\\d+$"
+
+    Exact paths are resolved with a hash lookup. Globs, and regexes that start
+    with literal text, are indexed in a trie on that literal prefix so only
+    candidates sharing the request's prefix are tested. The remaining regex
+    patterns are combined into a single alternation. A lookup therefore costs
+    roughly one pass over the request path no matter how many routes are
+    registered.
+
+    Exact paths take precedence over patterns; among patterns, the earliest
+    registered one wins.
+    """
+
+    def __init__(self):
+        self._exact: dict[str, T] = {}
+        self._values: list[T] = []
+        self._trie = _TrieNode()
+        self._regex_sources: list[tuple[int, str]] = []
+        self._combined: Optional[re.Pattern] = None
+        self._combined_index: dict[str, int] = {}
+        self._standalone: list[tuple[int, re.Pattern]] = []
+        self._compiled = True
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, path: Union[str, Iterable[str]], value: T) -> None:
+        """Register one or more path patterns for a value.
+
+        Args:
+            path: Path pattern(s) to register. Can be a string or list of strings.
+            value: Value returned by `match` for requests matching the pattern(s).
+        """
+        patterns = [path] if isinstance(path, str) else list(path)
+        index = len(self._values)
+        self._values.append(value)
+
+        for pattern in patterns:
+            if pattern.startswith("regex:"):
+                source = pattern[6:]
+                prefix = _regex_literal_prefix(source)
+                if len(prefix) > 1:
+                    self._index(prefix, index, re.compile(source))
+                else:
+                    self._regex_sources.append((index, source))
+                    self._compiled = False
+            elif _is_glob(pattern):
+                self._index(
+                    _literal_prefix(pattern),
+                    index,
+                    re.compile(fnmatch.translate(pattern)),
+                )
+            else:
+                self._exact.setdefault(pattern, value)
+
+    def _index(self, prefix: str, index: int, compiled: re.Pattern) -> None:
+        node = self._trie
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        node.entries.append((index, compiled))
+
+    def _compile(self) -> None:
+        combinable = []
+        standalone = []
+        for index, source in self._regex_sources:
+            compiled = re.compile(source)
+            # Patterns with their own groups or global flags would change
+            # meaning inside a combined alternation, so match them separately
+            if compiled.groups or _GLOBAL_FLAGS.search(source):
+                standalone.append((index, compiled))
+            else:
+                combinable.append((index, source))
+
+        self._combined_index = {f"r{index}": index for index, _ in combinable}
+        self._combined = (
+            re.compile(
+                "|".join(f"(?P<r{index}>{source})" for index, source in combinable)
+            )
+            if combinable
+            else None
+        )
+        self._standalone = standalone
+        self._compiled = True
+
+    def match(self, request_path: str) -> Optional[T]:
+        """Return the value registered for the best matching pattern, if any.
+
+        Args:
+            request_path: The actual request path to look up.
+
+        Returns:
+            The matching route value, or None if no pattern matches.
+        """
+        value = self._exact.get(request_path, _MISSING)
+        if value is not _MISSING:
+            return value  # type: ignore[return-value]
+
+        if not self._compiled:
+            self._compile()
+
+        best = len(self._values)
+
+        node: Optional[_TrieNode] = self._trie
+        for char in request_path:
+            for index, compiled in node.entries:
+                if index < best and compiled.match(request_path):
+                    best = index
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            for index, compiled in node.entries:
+                if index < best and compiled.match(request_path):
+                    best = index
+
+        if self._combined is not None:
+            found = self._combined.match(request_path)
+            if found:
+                best = min(best, self._combined_index[found.lastgroup])
+
+        for index, compiled in self._standalone:
+            if index >= best:
+                break
+            if compiled.match(request_path):
+                best = index
+
+        return self._values[best] if best < len(self._values) else None
+
+
+@lru_cache(maxsize=256)
+def _route_table_for(patterns: tuple[str, ...]) -> RouteTable[bool]:
+    table: RouteTable[bool] = RouteTable()
+    table.add(patterns, True)
+    return table
 
 
 def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
@@ -20,24 +203,11 @@ def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
     Returns:
         bool: True if the request path matches any of the patterns, False otherwise.
     """
-
-    def single_path_match(pattern: str) -> bool:
-        # Regex pattern
-        if pattern.startswith("regex:"):
-            regex_pattern = pattern[6:]  # Remove 'regex:' prefix
-            return bool(re.match(regex_pattern, request_path))
-
-        # Glob pattern (contains * or ?)
-        elif "*" in pattern or "?" in pattern:
-            return fnmatch.fnmatch(request_path, pattern)
-
-        # Exact match
-        else:
-            return pattern == request_path
-
     if isinstance(path, str):
-        return single_path_match(path)
+        patterns = (path,)
     elif isinstance(path, list):
-        return any(single_path_match(p) for p in path)
+        patterns = tuple(path)
+    else:
+        return False
 
-    return False
+    return _route_table_for(patterns).match(request_path) is not None
@@ -1,9 +1,26 @@
+import hashlib
 import json
-from typing import Dict, Any, List, Optional
+import threading
+import zlib
+from functools import cached_property, lru_cache
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 
+from x402.cache import LRUCache
 from x402.types import PaymentRequirements, PaywallConfig
 from x402.common import x402_VERSION
-from x402.template import PAYWALL_TEMPLATE
+from x402.template import read_paywall_template_bytes
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+PAYWALL_CACHE_SIZE = 64
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Fixed gzip member header: deflate, no flags, no mtime, unknown OS
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
 
 
 def is_browser_request(headers: Dict[str, Any]) -> bool:
@@ -70,13 +87,12 @@ def create_x402_config(
     }
 
 
-def inject_payment_data(
-    html_content: str,
+def create_config_script(
     error: str,
     payment_requirements: List[PaymentRequirements],
     paywall_config: Optional[PaywallConfig] = None,
 ) -> str:
-    """Inject payment requirements into HTML as JavaScript variables."""
+    """Create the <script> block that exposes the x402 config as window.x402."""
 
     # Create x402 configuration object
     x402_config = create_x402_config(error, payment_requirements, paywall_config)
@@ -88,16 +104,239 @@ def inject_payment_data(
         else ""
     )
 
-    config_script = f"""
+    return f"""
   <script>
     window.x402 = {json.dumps(x402_config)};
     {log_on_testnet}
   </script>"""
 
+
+def inject_payment_data(
+    html_content: str,
+    error: str,
+    payment_requirements: List[PaymentRequirements],
+    paywall_config: Optional[PaywallConfig] = None,
+) -> str:
+    """Inject payment requirements into HTML as JavaScript variables."""
+
+    config_script = create_config_script(error, payment_requirements, paywall_config)
+
     # Inject the configuration script into the head (same as TypeScript)
     return html_content.replace("</head>", f"{config_script}\n</head>")
 
 
+class _TemplateParts:
+    """The paywall template split around the config injection point.
+
+    Each half is kept once, together with its standalone raw-deflate stream
+    and CRC (built on the first gzip request), so a page only has to compress
+    and checksum its small config script to produce a complete gzip body.
+    """
+
+    def __init__(self, template: bytes):
+        head, marker, tail = template.partition(b"</head>")
+        self.head = head
+        self.tail = b"\n" + marker + tail
+        self.digest = hashlib.sha256(template).hexdigest()[:16]
+
+    @cached_property
+    def head_deflate(self) -> bytes:
+        return _deflate(self.head, zlib.Z_FULL_FLUSH)
+
+    @cached_property
+    def tail_deflate(self) -> bytes:
+        return _deflate(self.tail, zlib.Z_FINISH)
+
+    @cached_property
+    def head_crc(self) -> int:
+        return zlib.crc32(self.head)
+
+
+def _deflate(data: bytes, flush_mode: int) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(flush_mode)
+
+
+@lru_cache(maxsize=1)
+def _template_parts() -> _TemplateParts:
+    # Loaded on the first browser paywall render rather than at import time
+    return _TemplateParts(read_paywall_template_bytes())
+
+
+class PaywallPage:
+    """A rendered paywall page with lazily built compressed variants.
+
+    The page is kept as chunks that share the template halves, so rendering
+    and serving it never copies the multi-megabyte template.
+    """
+
+    __slots__ = (
+        "etag",
+        "_parts",
+        "_script",
+        "_gzip",
+        "_brotli",
+        "_lock",
+    )
+
+    def __init__(self, config_script: str):
+        self._parts = _template_parts()
+        self._script = config_script.encode("utf-8")
+        script_digest = hashlib.sha256(self._script).hexdigest()[:16]
+        # Weak, since the same page is served in several content codings
+        self.etag = f'W/"{self._parts.digest}-{script_digest}"'
+        self._gzip: Optional[List[bytes]] = None
+        self._brotli: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    @property
+    def chunks(self) -> List[bytes]:
+        """The uncompressed page body."""
+        return [self._parts.head, self._script, self._parts.tail]
+
+    def gzip_chunks(self) -> List[bytes]:
+        """The page body as a single gzip member."""
+        if self._gzip is None:
+            parts = self._parts
+            crc = zlib.crc32(parts.tail, zlib.crc32(self._script, parts.head_crc))
+            size = len(parts.head) + len(self._script) + len(parts.tail)
+            # Full flushes end each segment on a byte boundary with the
+            # compressor state reset, so the deflate streams concatenate.
+            self._gzip = [
+                _GZIP_HEADER,
+                parts.head_deflate,
+                _deflate(self._script, zlib.Z_FULL_FLUSH),
+                parts.tail_deflate,
+                (crc & 0xFFFFFFFF).to_bytes(4, "little")
+                + (size & 0xFFFFFFFF).to_bytes(4, "little"),
+            ]
+        return self._gzip
+
+    def brotli_chunks(self) -> List[bytes]:
+        """The page body compressed with brotli (requires the `brotli` package)."""
+        if brotli is None:
+            raise RuntimeError("brotli is not installed")
+        with self._lock:
+            if self._brotli is None:
+                self._brotli = brotli.compress(
+                    b"".join(self.chunks), quality=BROTLI_QUALITY
+                )
+        return [self._brotli]
+
+    def encode(self, accept_encoding: str = "") -> Tuple[List[bytes], Optional[str]]:
+        """Select the best body for an Accept-Encoding header.
+
+        Returns:
+            Tuple of (body chunks, content coding or None for identity)
+        """
+        accepted = _accepted_encodings(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return self.brotli_chunks(), "br"
+        if "gzip" in accepted:
+            return self.gzip_chunks(), "gzip"
+        return self.chunks, None
+
+    def html(self) -> str:
+        return b"".join(self.chunks).decode("utf-8")
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(("gzip", "br"))
+    return accepted
+
+
+_page_cache: LRUCache[Tuple[Any, ...], PaywallPage] = LRUCache(PAYWALL_CACHE_SIZE)
+
+
+def render_paywall(
+    error: str,
+    payment_requirements: List[PaymentRequirements],
+    paywall_config: Optional[PaywallConfig] = None,
+) -> PaywallPage:
+    """Render the paywall page, reusing a cached page for identical inputs.
+
+    Args:
+        error: Error message to display
+        payment_requirements: List of payment requirements
+        paywall_config: Optional paywall UI configuration
+
+    Returns:
+        PaywallPage with the injected payment data
+    """
+    key = (
+        error,
+        tuple(req.model_dump_json() for req in payment_requirements),
+        tuple(sorted((paywall_config or {}).items())),
+    )
+    return _page_cache.get_or_create(
+        key,
+        lambda: PaywallPage(
+            create_config_script(error, payment_requirements, paywall_config)
+        ),
+    )
+
+
+class PaywallResponse(NamedTuple):
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: List[bytes]
+
+
+def create_paywall_response(
+    request_headers: Dict[str, Any],
+    error: str,
+    payment_requirements: List[PaymentRequirements],
+    paywall_config: Optional[PaywallConfig] = None,
+) -> PaywallResponse:
+    """Build the browser 402 response, honoring Accept-Encoding and If-None-Match.
+
+    Args:
+        request_headers: Request headers (case-insensitive keys)
+        error: Error message to display
+        payment_requirements: List of payment requirements
+        paywall_config: Optional paywall UI configuration
+
+    Returns:
+        PaywallResponse with status 402, or 304 if the client's cached copy is current
+    """
+    headers_lower = {k.lower(): v for k, v in request_headers.items()}
+    page = render_paywall(error, payment_requirements, paywall_config)
+    headers = [
+        ("ETag", page.etag),
+        ("Vary", "Accept-Encoding"),
+        ("Cache-Control", "no-cache"),
+    ]
+
+    if_none_match = headers_lower.get("if-none-match", "")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or page.etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return PaywallResponse(304, headers, [])
+
+    body, coding = page.encode(headers_lower.get("accept-encoding", ""))
+    headers.append(("Content-Type", "text/html; charset=utf-8"))
+    headers.append(("Content-Length", str(sum(len(chunk) for chunk in body))))
+    if coding:
+        headers.append(("Content-Encoding", coding))
+    return PaywallResponse(402, headers, body)
+
+
 def get_paywall_html(
     error: str,
     payment_requirements: List[PaymentRequirements],
@@ -114,6 +353,4 @@ def get_paywall_html(
     Returns:
         Complete HTML with injected payment data
     """
-    return inject_payment_data(
-        PAYWALL_TEMPLATE, error, payment_requirements, paywall_config
-    )
+    return render_paywall(error, payment_requirements, paywall_config).html()
@@ -0,0 +1,418 @@
+import asyncio
+import inspect
+import logging
+import random
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from x402.cache import LRUCache
+from x402.encoding import safe_base64_encode
+from x402.facilitator import Facilitator
+from x402.journal import JournalEntry, SettlementJournal
+from x402.types import PaymentPayload, PaymentRequirements, SettleResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.01
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_BACKOFF_SECONDS = 0.5
+DEFAULT_MAX_BACKOFF_SECONDS = 30.0
+DEFAULT_RESULT_STORE_SIZE = 10_000
+
+RETRIES_EXHAUSTED = "settlement_retries_exhausted"
+
+
+def settlement_id(payment: PaymentPayload) -> str:
+    """Return the id a payment is settled under.
+
+    An EIP-3009 nonce can only be used once per payer, so the pair identifies
+    the settlement and lets clients look up the result of their own payment.
+    """
+    authorization = payment.payload.authorization
+    return f"{authorization.from_.lower()}:{authorization.nonce.lower()}"
+
+
+def settle_response_header(response: SettleResponse) -> str:
+    """Encode a settle response as an X-PAYMENT-RESPONSE header value."""
+    return safe_base64_encode(response.model_dump_json(by_alias=True))
+
+
+class SettlementResult(NamedTuple):
+    id: str
+    payment: PaymentPayload
+    payment_requirements: PaymentRequirements
+    response: SettleResponse
+
+
+class _Item:
+    __slots__ = ("id", "payment", "payment_requirements", "attempts")
+
+    def __init__(
+        self,
+        settlement_id: str,
+        payment: PaymentPayload,
+        payment_requirements: PaymentRequirements,
+    ):
+        self.id = settlement_id
+        self.payment = payment
+        self.payment_requirements = payment_requirements
+        self.attempts = 0
+
+
+class SettlementQueue:
+    """Settle verified payments in the background instead of inline.
+
+    Submitted payments are collected into batches, settled through the
+    facilitator with bounded concurrency and retried with exponential backoff
+    when the facilitator cannot be reached. With a journal, every payment is
+    recorded before it is queued and marked done once it has a final result,
+    so payments that were accepted but not settled before a crash are
+    resubmitted when the queue starts again.
+
+    Final results are kept in a bounded store for `get_result` and `wait`, and
+    passed to the optional `on_settled` callback, which may be a coroutine
+    function.
+    """
+
+    def __init__(
+        self,
+        facilitator: Facilitator,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+        max_backoff: float = DEFAULT_MAX_BACKOFF_SECONDS,
+        journal: Optional[SettlementJournal] = None,
+        on_settled: Optional[Callable[[SettlementResult], Any]] = None,
+        result_store_size: int = DEFAULT_RESULT_STORE_SIZE,
+    ):
+        """Initialize the settlement queue.
+
+        Args:
+            facilitator: Facilitator used to settle payments
+            batch_size: Maximum number of payments settled per batch
+            flush_interval: Seconds to wait for a batch to fill up
+            max_concurrency: Maximum number of settle calls in flight
+            max_retries: Retries after a failed settle call before giving up
+            retry_backoff: Initial retry delay in seconds, doubled on each retry
+            max_backoff: Upper bound for the retry delay in seconds
+            journal: Optional journal that records unsettled payments
+            on_settled: Optional callback called with each final SettlementResult
+            result_store_size: Number of final results kept for lookup
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+
+        self.facilitator = facilitator
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.journal = journal
+        self.on_settled = on_settled
+        self._max_concurrency = max_concurrency
+        self._results: LRUCache[str, SettleResponse] = LRUCache(result_store_size)
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._retry_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        if self._loop is not None and self._loop is not loop:
+            raise RuntimeError("SettlementQueue is bound to a different event loop")
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._worker = loop.create_task(self._run())
+
+        if self.journal is not None:
+            for entry in self.journal.recover():
+                if entry.id not in self._futures:
+                    self._enqueue(
+                        _Item(entry.id, entry.payment, entry.payment_requirements)
+                    )
+
+    async def start(self) -> None:
+        """Start the background worker and resubmit journaled payments."""
+        self._ensure_started()
+
+    def _enqueue(self, item: _Item) -> None:
+        self._futures[item.id] = self._loop.create_future()  # type: ignore[union-attr]
+        self._queue.put_nowait(item)  # type: ignore[union-attr]
+
+    def submit(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> str:
+        """Queue a verified payment for settlement.
+
+        Must be called from the event loop the queue runs on. Submitting a
+        payment that is already queued is a no-op. With a journal, the pending
+        record is written before this returns, blocking the event loop for the
+        commit; request handlers should await `enqueue` instead.
+
+        Returns:
+            The settlement id to look the result up with
+        """
+        self._ensure_started()
+        item_id = settlement_id(payment)
+        if item_id in self._futures or item_id in self._results:
+            return item_id
+
+        if self.journal is not None:
+            self.journal.append_pending([(item_id, payment, payment_requirements)])
+        self._enqueue(_Item(item_id, payment, payment_requirements))
+        return item_id
+
+    async def enqueue(
+        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
+    ) -> str:
+        """Queue a verified payment once its journal record is durable.
+
+        Like `submit`, but the journal commit runs in the default executor so
+        concurrent requests share group commits without blocking the loop.
+
+        Returns:
+            The settlement id to look the result up with
+        """
+        self._ensure_started()
+        item_id = settlement_id(payment)
+        if item_id in self._futures or item_id in self._results:
+            return item_id
+
+        if self.journal is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.journal.append_pending,
+                [(item_id, payment, payment_requirements)],
+            )
+            # Another request may have queued the same payment meanwhile
+            if item_id in self._futures or item_id in self._results:
+                return item_id
+        self._enqueue(_Item(item_id, payment, payment_requirements))
+        return item_id
+
+    def get_result(self, settlement_id: str) -> Optional[SettleResponse]:
+        """Return the final settle response, or None if it is not known yet."""
+        return self._results.get(settlement_id)
+
+    async def wait(
+        self, settlement_id: str, timeout: Optional[float] = None
+    ) -> SettleResponse:
+        """Wait for the final settle response of a submitted payment.
+
+        Raises:
+            KeyError: If the id was never submitted or its result was evicted
+            asyncio.TimeoutError: If no result arrives within timeout seconds
+        """
+        result = self._results.get(settlement_id)
+        if result is not None:
+            return result
+        future = self._futures.get(settlement_id)
+        if future is None:
+            raise KeyError(settlement_id)
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of payments without a final result yet."""
+        return len(self._futures)
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        while True:
+            batch = [await queue.get()]
+            self._drain_into(batch)
+            if len(batch) < self.batch_size and self.flush_interval > 0:
+                await asyncio.sleep(self.flush_interval)
+                self._drain_into(batch)
+            # Batches run concurrently; the semaphore bounds settle calls in flight
+            task = asyncio.get_running_loop().create_task(self._settle_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        self._batches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Settlement batch failed", exc_info=task.exception())
+
+    def _drain_into(self, batch: List[_Item]) -> None:
+        queue = self._queue
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())  # type: ignore[union-attr]
+            except asyncio.QueueEmpty:
+                return
+
+    async def _settle_batch(self, batch: List[_Item]) -> None:
+        responses = await asyncio.gather(*(self._settle_one(item) for item in batch))
+
+        finished = []
+        for item, response in zip(batch, responses):
+            if response is None:
+                self._schedule_retry(item)
+            else:
+                finished.append(
+                    SettlementResult(
+                        item.id, item.payment, item.payment_requirements, response
+                    )
+                )
+
+        if finished and self.journal is not None:
+            # Payments that exhausted their retries stay pending in the journal
+            # so they are resubmitted on the next start
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.journal.append_done,
+                [
+                    result.id
+                    for result in finished
+                    if result.response.error_reason != RETRIES_EXHAUSTED
+                ],
+            )
+        for result in finished:
+            await self._finish(result)
+
+    async def _settle_one(self, item: _Item) -> Optional[SettleResponse]:
+        """Settle one payment, returning None if the call should be retried."""
+        item.attempts += 1
+        async with self._semaphore:  # type: ignore[union-attr]
+            try:
+                return await self.facilitator.settle(
+                    item.payment, item.payment_requirements
+                )
+            except Exception as e:
+                if item.attempts > self.max_retries:
+                    logger.error(
+                        "Settlement %s failed after %d attempts: %s",
+                        item.id,
+                        item.attempts,
+                        e,
+                    )
+                    return SettleResponse(
+                        success=False,
+                        error_reason=RETRIES_EXHAUSTED,
+                        network=item.payment.network,
+                    )
+                logger.warning("Settlement %s failed, retrying: %s", item.id, e)
+                return None
+
+    def _schedule_retry(self, item: _Item) -> None:
+        delay = min(self.max_backoff, self.retry_backoff * 2 ** (item.attempts - 1))
+        # Jitter keeps a burst of failures from retrying in lockstep
+        delay *= random.uniform(0.5, 1.0)
+        self._retry_handles[item.id] = self._loop.call_later(  # type: ignore[union-attr]
+            delay, self._requeue, item
+        )
+
+    def _requeue(self, item: _Item) -> None:
+        self._retry_handles.pop(item.id, None)
+        self._queue.put_nowait(item)  # type: ignore[union-attr]
+
+    async def _finish(self, result: SettlementResult) -> None:
+        self._results.set(result.id, result.response)
+        future = self._futures.pop(result.id, None)
+        if future is not None and not future.done():
+            future.set_result(result.response)
+        if self.on_settled is not None:
+            try:
+                outcome = self.on_settled(result)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception:
+                logger.exception("on_settled callback failed for %s", result.id)
+
+    async def aclose(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued settlements to finish, then stop the worker.
+
+        Payments still unsettled after timeout seconds stay in the journal and
+        are resubmitted the next time a queue is started on it.
+        """
+        futures = list(self._futures.values())
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+
+        for handle in self._retry_handles.values():
+            handle.cancel()
+        self._retry_handles.clear()
+        worker, self._worker = self._worker, None
+        tasks = list(self._batches) + ([worker] if worker is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._queue = None
+        self._loop = None
+        if self.journal is not None:
+            self.journal.close()
+
+    async def __aenter__(self) -> "SettlementQueue":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+async def settle_recovered(
+    journal: SettlementJournal,
+    entries: List[JournalEntry],
+    facilitator: Facilitator,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> List[SettlementResult]:
+    """Settle payments returned by `SettlementJournal.recover` once each.
+
+    Payments the facilitator answered for are marked done in the journal,
+    whether or not settlement succeeded; payments whose settle call failed
+    stay pending for the next recovery pass.
+
+    Returns:
+        The results the facilitator answered with
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def settle(entry: JournalEntry) -> Optional[SettlementResult]:
+        async with semaphore:
+            try:
+                response = await facilitator.settle(
+                    entry.payment, entry.payment_requirements
+                )
+            except Exception as e:
+                logger.warning("Recovered settlement %s failed: %s", entry.id, e)
+                return None
+        if not response.success:
+            logger.warning(
+                "Recovered settlement %s was rejected: %s",
+                entry.id,
+                response.error_reason,
+            )
+        return SettlementResult(
+            entry.id, entry.payment, entry.payment_requirements, response
+        )
+
+    results = [
+        result
+        for result in await asyncio.gather(*(settle(entry) for entry in entries))
+        if result is not None
+    ]
+    if results:
+        await asyncio.get_running_loop().run_in_executor(
+            None, journal.append_done, [result.id for result in results]
+        )
+    logger.info("Recovered %d of %d journaled settlements", len(results), len(entries))
+    return results
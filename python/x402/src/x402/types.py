@@ -8,7 +8,8 @@ from typing_extensions import (
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from pydantic.alias_generators import to_camel
 
-from x402.networks import SupportedNetworks
+from x402.chains import registry
+from x402.networks import SupportedNetworks  # noqa: F401 - re-exported
 
 
 class TokenAmount(BaseModel):
@@ -54,7 +55,7 @@ Price = Union[Money, TokenAmount]
 
 class PaymentRequirements(BaseModel):
     scheme: str
-    network: SupportedNetworks
+    network: str
     max_amount_required: str
     resource: str
     description: str
@@ -71,6 +72,12 @@ class PaymentRequirements(BaseModel):
         from_attributes=True,
     )
 
+    @field_validator("network")
+    def validate_network(cls, v):
+        if not registry.has_network(v):
+            raise ValueError(f"Unsupported network: {v}")
+        return v
+
     @field_validator("max_amount_required")
     def validate_max_amount_required(cls, v):
         try:
@@ -4,11 +4,12 @@ import base64
 from eth_account import Account
 from x402.clients.base import (
     x402Client,
+    PaymentRequirementsCache,
     PaymentAmountExceededError,
     UnsupportedSchemeException,
     decode_x_payment_response,
 )
-from x402.types import PaymentRequirements
+from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 from x402.exact import decode_payment
 
 
@@ -192,3 +193,33 @@ def test_payment_requirements_sorting(client):
     # Test both networks are equal
     selected = client.select_payment_requirements([other_req, base_req])
     assert selected.network == "base-sepolia"
+
+
+def test_payment_requirements_cache(payment_requirements):
+    now = [0.0]
+    cache = PaymentRequirementsCache(ttl=60, clock=lambda: now[0])
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1, accepts=[payment_requirements], error=""
+    )
+
+    assert cache.get("https://example.com/a") is None
+    cache.set("https://example.com/a", payment_response)
+    assert cache.get("https://example.com/a") is payment_response
+    assert cache.get("https://example.com/b") is None
+
+    cache.invalidate("https://example.com/a")
+    assert cache.get("https://example.com/a") is None
+
+    cache.set("https://example.com/a", payment_response)
+    now[0] = 60
+    assert cache.get("https://example.com/a") is None
+
+
+def test_create_payment_header_for(client, payment_requirements):
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1, accepts=[payment_requirements], error=""
+    )
+    decoded = decode_payment(client.create_payment_header_for(payment_response))
+
+    assert decoded["x402Version"] == 1
+    assert decoded["payload"]["authorization"]["value"] == "10000"
@@ -1,13 +1,21 @@
+import asyncio
 import pytest
 import json
 import base64
 from unittest.mock import AsyncMock, MagicMock, patch
-from httpx import Request, Response
+from httpx import MockTransport, Request, Response
 from eth_account import Account
-from x402.clients.httpx import HttpxHooks, x402_payment_hooks, x402HttpxClient
+from x402.clients.httpx import (
+    HttpxHooks,
+    x402_payment_hooks,
+    x402HttpxClient,
+    x402Transport,
+)
 from x402.clients.base import (
     PaymentError,
+    PaymentRequirementsCache,
 )
+from x402.exact import decode_payment
 from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 
 
@@ -57,9 +65,11 @@ async def test_on_response_non_402(hooks):
 
 
 async def test_on_response_retry(hooks):
-    # Test retry response
+    # Test retry response: the request already carries a payment
     response = Response(402)
-    hooks._is_retry = True
+    response.request = Request(
+        "GET", "https://example.com", headers={"X-Payment": "paid"}
+    )
     result = await hooks.on_response(response)
     assert result == response
 
@@ -156,8 +166,8 @@ async def test_on_response_payment_error(hooks, payment_requirements):
     with pytest.raises(PaymentError):
         await hooks.on_response(response)
 
-    # Verify retry flag is reset
-    assert not hooks._is_retry
+    # The failed request is not marked as paid
+    assert "X-Payment" not in response.request.headers
 
 
 async def test_on_response_general_error(hooks):
@@ -170,8 +180,8 @@ async def test_on_response_general_error(hooks):
     with pytest.raises(PaymentError):
         await hooks.on_response(response)
 
-    # Verify retry flag is reset
-    assert not hooks._is_retry
+    # The failed request is not marked as paid
+    assert "X-Payment" not in response.request.headers
 
 
 def test_x402_payment_hooks(account):
@@ -210,20 +220,15 @@ def test_x402_payment_hooks(account):
 def test_x402_httpx_client(account):
     # Test client initialization
     client = x402HttpxClient(account=account)
-    assert "request" in client.event_hooks
-    assert "response" in client.event_hooks
-
-    # Get the hooks instance
-    hooks_instance = client.event_hooks["response"][0].__self__
+    assert isinstance(client._transport, x402Transport)
 
     # Test client configuration
-    assert hooks_instance.client.account == account
-    assert hooks_instance.client.max_value is None
+    assert client.x402_client.account == account
+    assert client.x402_client.max_value is None
 
     # Test with max_value
     client = x402HttpxClient(account=account, max_value=1000)
-    hooks_instance = client.event_hooks["response"][0].__self__
-    assert hooks_instance.client.max_value == 1000
+    assert client.x402_client.max_value == 1000
 
     # Test with custom selector
     def custom_selector(accepts, network_filter=None, scheme_filter=None):
@@ -232,8 +237,127 @@ def test_x402_httpx_client(account):
     client = x402HttpxClient(
         account=account, payment_requirements_selector=custom_selector
     )
-    hooks_instance = client.event_hooks["response"][0].__self__
     assert (
-        hooks_instance.client.select_payment_requirements
-        != hooks_instance.client.__class__.select_payment_requirements
+        client.x402_client.select_payment_requirements
+        != client.x402_client.__class__.select_payment_requirements
     )
+
+
+def payment_server(payment_requirements, paid_status=200):
+    """Mock transport that requires a payment and records every request.
+
+    Payments for an amount other than the current requirements are refused.
+    """
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        body = x402PaymentRequiredResponse(
+            x402_version=1, accepts=[payment_requirements], error="Payment Required"
+        ).model_dump(by_alias=True)
+        if "X-Payment" not in request.headers:
+            return Response(402, json=body)
+        payment = decode_payment(request.headers["X-Payment"])
+        amount = payment["payload"]["authorization"]["value"]
+        if amount != payment_requirements.max_amount_required:
+            return Response(402, json=body)
+        return Response(paid_status, json={"paid": True})
+
+    return MockTransport(handler), requests
+
+
+async def test_client_retries_on_its_own_transport(account, payment_requirements):
+    transport, requests = payment_server(payment_requirements)
+
+    async with x402HttpxClient(account=account, transport=transport) as client:
+        response = await client.post("https://example.com/paid", content=b"data")
+
+    assert response.status_code == 200
+    assert response.json() == {"paid": True}
+    assert len(requests) == 2
+    assert "X-Payment" not in requests[0].headers
+    assert requests[1].headers["X-Payment"]
+    assert requests[1].content == b"data"
+
+
+async def test_client_streams_uploads_without_buffering(account, payment_requirements):
+    transport, requests = payment_server(payment_requirements)
+    sent = []
+
+    async def upload():
+        for chunk in (b"a" * 1024, b"b" * 1024):
+            sent.append(chunk)
+            yield chunk
+
+    async with x402HttpxClient(account=account, transport=transport) as client:
+        response = await client.post("https://example.com/paid", content=upload())
+
+    # The body cannot be sent again, so the 402 is returned instead of paid
+    assert response.status_code == 402
+    assert len(requests) == 1
+    assert len(sent) == 2
+
+
+async def test_client_pays_through_proxies(monkeypatch, account):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+    monkeypatch.setenv("NO_PROXY", "localhost")
+
+    client = x402HttpxClient(account=account)
+
+    assert isinstance(client._transport, x402Transport)
+    mounts = {pattern.pattern: mount for pattern, mount in client._mounts.items()}
+    assert isinstance(mounts["https://"], x402Transport)
+    assert mounts["all://localhost"] is None
+    await client.aclose()
+
+
+async def test_client_does_not_pay_twice(account, payment_requirements):
+    transport, requests = payment_server(payment_requirements, paid_status=402)
+
+    async with x402HttpxClient(account=account, transport=transport) as client:
+        response = await client.get("https://example.com/paid")
+
+    assert response.status_code == 402
+    assert len(requests) == 2
+
+
+async def test_client_concurrent_payments(account, payment_requirements):
+    transport, requests = payment_server(payment_requirements)
+
+    async with x402HttpxClient(account=account, transport=transport) as client:
+        responses = await asyncio.gather(
+            *(client.get(f"https://example.com/paid/{i}") for i in range(50))
+        )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len(requests) == 100
+    # Every request was paid exactly once, with its own signed header
+    paid = [r.headers["X-Payment"] for r in requests if "X-Payment" in r.headers]
+    assert len(set(paid)) == 50
+
+
+async def test_client_pays_up_front_with_cached_requirements(
+    account, payment_requirements
+):
+    transport, requests = payment_server(payment_requirements)
+    cache = PaymentRequirementsCache()
+
+    async with x402HttpxClient(
+        account=account, transport=transport, requirements_cache=cache
+    ) as client:
+        first = await client.get("https://example.com/paid")
+        second = await client.get("https://example.com/paid")
+
+        assert first.status_code == second.status_code == 200
+        # The second call is a single, already paid request
+        assert len(requests) == 3
+        assert "X-Payment" in requests[2].headers
+
+        # A price change refuses the cached payment; the client pays again
+        payment_requirements.max_amount_required = "20000"
+        third = await client.get("https://example.com/paid")
+
+    assert third.status_code == 200
+    assert len(requests) == 5
+    cached = cache.get("https://example.com/paid")
+    assert cached.accepts[0].max_amount_required == "20000"
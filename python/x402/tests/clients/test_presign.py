@@ -0,0 +1,151 @@
+import time
+
+import pytest
+from eth_account import Account
+
+from x402.clients.base import x402Client
+from x402.clients.presign import PresignedPaymentPool
+from x402.exact import decode_payment
+from x402.types import PaymentRequirements
+
+
+@pytest.fixture
+def client():
+    return x402Client(Account.create())
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=300,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+def wait_until_ready(pool, requirements, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while pool.ready(requirements) < count:
+        assert time.monotonic() < deadline, "pool did not fill in time"
+        time.sleep(0.01)
+
+
+def test_pool_hands_out_presigned_headers(client, payment_requirements):
+    with PresignedPaymentPool(client, size=3) as pool:
+        pool.add(payment_requirements)
+        wait_until_ready(pool, payment_requirements, 3)
+
+        headers = [pool.take(payment_requirements) for _ in range(3)]
+        assert pool.ready(payment_requirements) < 3
+
+        # Refilled in the background
+        wait_until_ready(pool, payment_requirements, 3)
+
+    payloads = [decode_payment(header) for header in headers]
+    assert len({p["payload"]["authorization"]["nonce"] for p in payloads}) == 3
+    for payload in payloads:
+        authorization = payload["payload"]["authorization"]
+        assert authorization["from"] == client.account.address
+        assert authorization["value"] == "10000"
+
+
+def test_miss_registers_requirements(client, payment_requirements):
+    with PresignedPaymentPool(client, size=2) as pool:
+        assert pool.take(payment_requirements) is None
+        wait_until_ready(pool, payment_requirements, 2)
+
+        other = payment_requirements.model_copy(update={"max_amount_required": "1"})
+        assert pool.ready(other) == 0
+
+
+def test_expiring_headers_are_replaced(client, payment_requirements):
+    now = [time.time()]
+    with PresignedPaymentPool(
+        client, size=2, refresh_margin=30, clock=lambda: now[0]
+    ) as pool:
+        pool.add(payment_requirements)
+        wait_until_ready(pool, payment_requirements, 2)
+
+        # Within the refresh margin of validBefore
+        now[0] += payment_requirements.max_timeout_seconds - 20
+        assert pool.take(payment_requirements) is None
+        wait_until_ready(pool, payment_requirements, 2)
+
+
+def test_client_uses_attached_pool(client, payment_requirements):
+    pool = PresignedPaymentPool(client, size=1)
+    pool.add(payment_requirements)
+    wait_until_ready(pool, payment_requirements, 1)
+
+    sign_payment = client.sign_payment
+    client.sign_payment = None  # Signing on the spot would fail
+    header = client.create_payment_header(payment_requirements)
+    assert decode_payment(header)["payload"]["signature"]
+
+    pool.close()
+    assert client.presigned_pool is None
+    # Without a pool the client signs on the spot
+    client.sign_payment = sign_payment
+    assert client.create_payment_header(payment_requirements)
+
+
+def test_least_recently_used_requirements_are_evicted(client, payment_requirements):
+    first, second, third = (
+        payment_requirements.model_copy(update={"max_amount_required": amount})
+        for amount in ("1", "2", "3")
+    )
+    with PresignedPaymentPool(client, size=1, max_slots=2) as pool:
+        pool.add(first)
+        pool.add(second)
+        wait_until_ready(pool, first, 1)
+        assert pool.take(first)
+
+        pool.add(third)
+        wait_until_ready(pool, third, 1)
+        assert pool.ready(second) == 0
+        wait_until_ready(pool, first, 1)
+
+
+def test_idle_requirements_are_not_refilled(client, payment_requirements):
+    now = [time.time()]
+    with PresignedPaymentPool(
+        client, size=2, refresh_margin=0.2, idle_ttl=60, clock=lambda: now[0]
+    ) as pool:
+        pool.add(payment_requirements)
+        wait_until_ready(pool, payment_requirements, 2)
+
+        # Expired and idle, so the refresher lets them go
+        now[0] += payment_requirements.max_timeout_seconds
+        time.sleep(0.5)
+        assert pool.ready(payment_requirements) == 0
+
+        # Taking from them again makes them active
+        assert pool.take(payment_requirements) is None
+        wait_until_ready(pool, payment_requirements, 2)
+
+
+def test_pool_uses_the_clients_nonces(client, payment_requirements):
+    counter = iter(range(1, 100))
+    client.generate_nonce = lambda: f"{next(counter):064x}"
+
+    with PresignedPaymentPool(client, size=2) as pool:
+        pool.add(payment_requirements)
+        wait_until_ready(pool, payment_requirements, 2)
+        headers = [pool.take(payment_requirements) for _ in range(2)]
+
+    nonces = [
+        decode_payment(header)["payload"]["authorization"]["nonce"]
+        for header in headers
+    ]
+    assert nonces == ["0x" + f"{i:064x}" for i in (1, 2)]
@@ -1,3 +1,6 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import json
 import base64
@@ -6,11 +9,13 @@ from requests import Response, PreparedRequest, Session
 from eth_account import Account
 from x402.clients.requests import (
     x402HTTPAdapter,
+    x402_fetch_all,
     x402_http_adapter,
     x402_requests,
 )
 from x402.clients.base import (
     PaymentError,
+    PaymentRequirementsCache,
 )
 from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 
@@ -114,19 +119,18 @@ def test_adapter_retry(adapter):
     mock_response.status_code = 402
     mock_response._content = b"payment required"
 
-    # Create a prepared request
+    # Create a prepared request that already carries a payment
     request = PreparedRequest()
-    request.prepare("GET", "https://example.com")
+    request.prepare("GET", "https://example.com", headers={"X-Payment": "paid"})
 
-    # Set retry flag to true
-    adapter._is_retry = True
-
-    with patch("requests.adapters.HTTPAdapter.send", return_value=mock_response):
+    with patch(
+        "requests.adapters.HTTPAdapter.send", return_value=mock_response
+    ) as mock_send:
         response = adapter.send(request)
         assert response.status_code == 402
         assert response.content == b"payment required"
-        # Verify retry flag is reset after call
-        assert not adapter._is_retry
+        # The paid request is not paid for again
+        mock_send.assert_called_once()
 
 
 def test_adapter_payment_flow(adapter, payment_requirements):
@@ -174,7 +178,7 @@ def test_adapter_payment_flow(adapter, payment_requirements):
 
     # Mock the send method to return different responses
     def mock_send_impl(req, **kwargs):
-        if adapter._is_retry:
+        if "X-Payment" in req.headers:
             return retry_response
         return initial_response
 
@@ -230,8 +234,8 @@ def test_adapter_payment_error(adapter, payment_requirements):
         with pytest.raises(PaymentError):
             adapter.send(request)
 
-        # Verify retry flag is reset
-        assert not adapter._is_retry
+        # The failed request is not marked as paid
+        assert "X-Payment" not in request.headers
 
 
 def test_adapter_general_error(adapter):
@@ -248,8 +252,8 @@ def test_adapter_general_error(adapter):
         with pytest.raises(PaymentError):
             adapter.send(request)
 
-        # Verify retry flag is reset
-        assert not adapter._is_retry
+        # The failed request is not marked as paid
+        assert "X-Payment" not in request.headers
 
 
 def test_x402_http_adapter(account):
@@ -308,3 +312,101 @@ def test_x402_requests(account):
         adapter.client.select_payment_requirements
         != adapter.client.__class__.select_payment_requirements
     )
+
+
+def payment_server(payment_requirements):
+    """Stand-in for HTTPAdapter.send that requires a payment on every URL."""
+    body = json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1, accepts=[payment_requirements], error="Payment Required"
+        ).model_dump(by_alias=True)
+    ).encode()
+    lock = threading.Lock()
+    sent = []
+
+    def send(request, **kwargs):
+        with lock:
+            sent.append(request)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if "X-Payment" in request.headers:
+            response.status_code = 200
+            response._content = request.url.encode()
+        else:
+            response.status_code = 402
+            response._content = body
+        return response
+
+    return send, sent
+
+
+def test_adapter_shared_between_threads(adapter, payment_requirements):
+    send, sent = payment_server(payment_requirements)
+
+    def fetch(i):
+        request = PreparedRequest()
+        request.prepare("GET", f"https://example.com/{i}")
+        return adapter.send(request)
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=send):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(fetch, range(64)))
+
+    assert [r.status_code for r in responses] == [200] * 64
+    assert [r.content for r in responses] == [
+        f"https://example.com/{i}".encode() for i in range(64)
+    ]
+    assert len(sent) == 128
+
+
+def test_fetch_all(session, payment_requirements):
+    send, sent = payment_server(payment_requirements)
+    urls = [f"https://example.com/{i}" for i in range(20)] + ["ftp://example.com"]
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=send):
+        results = x402_fetch_all(session, urls, max_workers=4)
+
+    assert [r.content for r in results[:20]] == [url.encode() for url in urls[:20]]
+    # The unsupported URL fails on its own without aborting the others
+    assert isinstance(results[20], Exception)
+    assert len(sent) == 40
+
+
+def test_adapter_pays_up_front_with_cached_requirements(account, payment_requirements):
+    send, sent = payment_server(payment_requirements)
+    cache = PaymentRequirementsCache()
+    session = x402_requests(account, requirements_cache=cache)
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=send):
+        assert session.get("https://example.com/paid").status_code == 200
+        assert session.get("https://example.com/paid").status_code == 200
+
+    # The second call is a single, already paid request
+    assert len(sent) == 3
+    assert "X-Payment" in sent[2].headers
+    assert cache.get("https://example.com/paid") is not None
+
+
+def test_adapter_invalidates_refused_cached_payment(account, payment_requirements):
+    cache = PaymentRequirementsCache()
+    adapter = x402_http_adapter(account, requirements_cache=cache)
+    cache.set(
+        "https://example.com/paid",
+        x402PaymentRequiredResponse(
+            x402_version=1, accepts=[payment_requirements], error=""
+        ),
+    )
+
+    refused = Response()
+    refused.status_code = 402
+    refused._content = b"invalid json"
+
+    request = PreparedRequest()
+    request.prepare("GET", "https://example.com/paid")
+
+    with patch("requests.adapters.HTTPAdapter.send", return_value=refused):
+        with pytest.raises(PaymentError):
+            adapter.send(request)
+
+    assert cache.get("https://example.com/paid") is None
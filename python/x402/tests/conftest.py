@@ -0,0 +1,48 @@
+import pytest
+from eth_account import Account
+
+from x402.clients.base import x402Client
+from x402.types import (
+    EIP3009Authorization,
+    ExactPaymentPayload,
+    PaymentPayload,
+    PaymentRequirements,
+)
+
+
+@pytest.fixture
+def make_payment():
+    """Factory of unsigned payments that differ only in their nonce."""
+
+    def make(index=0):
+        return PaymentPayload(
+            x402_version=1,
+            scheme="exact",
+            network="base-sepolia",
+            payload=ExactPaymentPayload(
+                signature="0x" + "ab" * 65,
+                authorization=EIP3009Authorization(
+                    **{
+                        "from": "0xabcd1234567890123456789012345678901234ab",
+                        "to": "0x1234567890123456789012345678901234567890",
+                        "value": "1000000",
+                        "validAfter": "0",
+                        "validBefore": "9999999999",
+                        "nonce": "0x" + f"{index:064x}",
+                    }
+                ),
+            ),
+        )
+
+    return make
+
+
+@pytest.fixture
+def make_payment_header():
+    """Factory of X-PAYMENT headers for a 402 response body, each from a new account."""
+
+    def make(resp_json):
+        requirements = PaymentRequirements(**resp_json["accepts"][0])
+        return x402Client(Account.create()).create_payment_header(requirements)
+
+    return make
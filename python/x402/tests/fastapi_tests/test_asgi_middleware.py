@@ -0,0 +1,237 @@
+import asyncio
+import base64
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from x402.facilitator import FacilitatorClient
+from x402.fastapi.middleware import X402PaymentMiddleware
+from x402.types import SettleResponse, VerifyResponse
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+
+
+class StubFacilitator(FacilitatorClient):
+    def __init__(self, settle_success=True):
+        super().__init__()
+        self.settle_success = settle_success
+        self.calls = []
+
+    async def verify(self, payment, payment_requirements):
+        self.calls.append("verify")
+        return VerifyResponse(is_valid=True, payer=payment.payload.authorization.from_)
+
+    async def settle(self, payment, payment_requirements):
+        self.calls.append("settle")
+        if not self.settle_success:
+            return SettleResponse(success=False, error_reason="insufficient_funds")
+        return SettleResponse(success=True, transaction="0xabc", network="base-sepolia")
+
+
+def create_app():
+    app = FastAPI()
+
+    @app.get("/paid")
+    async def paid(request: Request):
+        return {"amount": request.state.payment_details.max_amount_required}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/free")
+    async def free():
+        return {"free": True}
+
+    return app
+
+
+def test_requires_payment_only_on_registered_routes():
+    payments = X402PaymentMiddleware(create_app())
+    payments.add(path="/paid", price="$0.01", pay_to_address=PAY_TO)
+    client = TestClient(payments)
+
+    unpaid = client.get("/paid")
+    assert unpaid.status_code == 402
+    assert unpaid.json()["error"] == "No X-PAYMENT header provided"
+    assert unpaid.json()["accepts"][0]["maxAmountRequired"] == "10000"
+    assert client.get("/free").json() == {"free": True}
+
+
+def test_paid_request_gets_settlement_header(make_payment_header):
+    facilitator = StubFacilitator()
+    payments = X402PaymentMiddleware(create_app())
+    payments.add(
+        path="/paid", price="$0.01", pay_to_address=PAY_TO, facilitator=facilitator
+    )
+    client = TestClient(payments)
+
+    header = make_payment_header(client.get("/paid").json())
+    response = client.get("/paid", headers={"X-PAYMENT": header})
+
+    assert response.status_code == 200
+    assert response.json() == {"amount": "10000"}
+    settlement = json.loads(base64.b64decode(response.headers["X-PAYMENT-RESPONSE"]))
+    assert settlement["transaction"] == "0xabc"
+    assert facilitator.calls == ["verify", "settle"]
+
+
+def test_streaming_response_passes_through(make_payment_header):
+    app = create_app()
+    app.add_middleware(
+        X402PaymentMiddleware,
+        routes=[
+            {
+                "path": "/stream",
+                "price": "$0.01",
+                "pay_to_address": PAY_TO,
+                "facilitator": StubFacilitator(),
+            }
+        ],
+    )
+    client = TestClient(app)
+
+    header = make_payment_header(client.get("/stream").json())
+    with client.stream("GET", "/stream", headers={"X-PAYMENT": header}) as response:
+        assert response.status_code == 200
+        assert "X-PAYMENT-RESPONSE" in response.headers
+        body = b"".join(response.iter_bytes())
+
+    assert body == b"chunk-0;chunk-1;chunk-2;"
+
+
+def test_failed_settlement_replaces_response(make_payment_header):
+    payments = X402PaymentMiddleware(create_app())
+    payments.add(
+        path="/paid",
+        price="$0.01",
+        pay_to_address=PAY_TO,
+        facilitator=StubFacilitator(settle_success=False),
+    )
+    client = TestClient(payments)
+
+    header = make_payment_header(client.get("/paid").json())
+    response = client.get("/paid", headers={"X-PAYMENT": header})
+
+    assert response.status_code == 402
+    assert response.json()["error"] == "Settle failed: insufficient_funds"
+
+
+def test_routes_share_one_instance():
+    payments = X402PaymentMiddleware(create_app())
+    payments.add(path="/paid", price="$0.01", pay_to_address=PAY_TO)
+    payments.add(path="/stream", price="$0.05", pay_to_address=PAY_TO)
+    client = TestClient(payments)
+
+    assert client.get("/paid").json()["accepts"][0]["maxAmountRequired"] == "10000"
+    assert client.get("/stream").json()["accepts"][0]["maxAmountRequired"] == "50000"
+    assert len(payments.middleware_configs) == 2
+
+
+async def call_asgi(app, path, headers, extensions):
+    """Call an ASGI app directly and collect the messages it sends."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "extensions": extensions,
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected for the whole response
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+async def test_trailer_mode_sends_settlement_after_body(make_payment_header):
+    facilitator = StubFacilitator()
+    payments = X402PaymentMiddleware(create_app())
+    payments.add(
+        path="/stream",
+        price="$0.01",
+        pay_to_address=PAY_TO,
+        facilitator=facilitator,
+        settlement_mode="trailer",
+    )
+    extensions = {"http.response.trailers": {}}
+
+    unpaid = await call_asgi(payments, "/stream", {}, extensions)
+    header = make_payment_header(json.loads(unpaid[1]["body"]))
+    messages = await call_asgi(payments, "/stream", {"X-PAYMENT": header}, extensions)
+
+    start, *body, trailers = messages
+    assert start["status"] == 200
+    assert start["trailers"] is True
+    assert (b"trailer", b"x-payment-response") in start["headers"]
+    assert b"".join(m["body"] for m in body) == b"chunk-0;chunk-1;chunk-2;"
+    assert trailers["type"] == "http.response.trailers"
+    name, value = trailers["headers"][0]
+    assert name == b"x-payment-response"
+    assert json.loads(base64.b64decode(value))["transaction"] == "0xabc"
+    assert facilitator.calls == ["verify", "settle"]
+
+
+async def test_trailer_mode_falls_back_without_server_support(make_payment_header):
+    payments = X402PaymentMiddleware(create_app())
+    payments.add(
+        path="/stream",
+        price="$0.01",
+        pay_to_address=PAY_TO,
+        facilitator=StubFacilitator(),
+        settlement_mode="trailer",
+    )
+
+    unpaid = await call_asgi(payments, "/stream", {}, {})
+    header = make_payment_header(json.loads(unpaid[1]["body"]))
+    messages = await call_asgi(payments, "/stream", {"X-PAYMENT": header}, {})
+
+    start = messages[0]
+    assert "trailers" not in start
+    assert any(name == b"x-payment-response" for name, _ in start["headers"])
+    assert all(m["type"] != "http.response.trailers" for m in messages)
+
+
+def test_decoded_payment_is_cached_on_request(make_payment_header):
+    app = FastAPI()
+
+    @app.get("/paid")
+    async def paid(request: Request):
+        return {"payer": request.state.payment.payer}
+
+    payments = X402PaymentMiddleware(app)
+    payments.add(
+        path="/paid",
+        price="$0.01",
+        pay_to_address=PAY_TO,
+        facilitator=StubFacilitator(),
+    )
+    client = TestClient(payments)
+
+    header = make_payment_header(client.get("/paid").json())
+    response = client.get("/paid", headers={"X-PAYMENT": header})
+
+    payload = json.loads(base64.b64decode(header))
+    assert response.json() == {"payer": payload["payload"]["authorization"]["from"]}
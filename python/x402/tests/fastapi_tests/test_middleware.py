@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
+from x402.facilitator import FacilitatorClient
 from x402.fastapi.middleware import require_payment
 from x402.types import PaywallConfig
 
@@ -529,3 +530,249 @@ def test_payment_amount_conversion():
     html_content = response.text
     # $0.001 should be converted to 0.001 in the display
     assert '"amount": 0.001' in html_content
+
+
+def test_payment_requirements_cached_per_resource():
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/test",
+            network="base-sepolia",
+            description="Test payment",
+        )
+    )
+
+    client = TestClient(app_with_middleware)
+    first = client.get("/test")
+    second = client.get("/test")
+    other_resource = client.get("/test?page=2")
+
+    assert first.status_code == second.status_code == 402
+    assert first.content == second.content
+    assert first.headers["content-type"] == "application/json"
+    assert first.json()["accepts"][0]["resource"] == "http://testserver/test"
+    assert (
+        other_resource.json()["accepts"][0]["resource"]
+        == "http://testserver/test?page=2"
+    )
+
+
+def test_browser_paywall_etag_and_compression():
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/test",
+            network="base-sepolia",
+        )
+    )
+    browser_headers = {
+        "Accept": "text/html",
+        "User-Agent": "Mozilla/5.0",
+        "Accept-Encoding": "gzip",
+    }
+
+    client = TestClient(app_with_middleware)
+    response = client.get("/test", headers=browser_headers)
+    assert response.status_code == 402
+    assert response.headers["content-encoding"] == "gzip"
+    assert "window.x402" in response.text
+
+    etag = response.headers["etag"]
+    cached = client.get("/test", headers={**browser_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert "content-length" not in cached.headers
+
+
+class StubFacilitator(FacilitatorClient):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    async def verify(self, payment, payment_requirements):
+        from x402.types import VerifyResponse
+
+        self.calls.append("verify")
+        return VerifyResponse(is_valid=True, payer=payment.payload.authorization.from_)
+
+    async def settle(self, payment, payment_requirements):
+        from x402.types import SettleResponse
+
+        self.calls.append("settle")
+        return SettleResponse(success=True, transaction="0xabc", network="base-sepolia")
+
+
+def test_settlement_queue_defers_settle(make_payment_header):
+    from x402.settlement import SettlementQueue
+
+    facilitator = StubFacilitator()
+    settled = []
+    queue = SettlementQueue(facilitator, on_settled=settled.append)
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/test",
+            network="base-sepolia",
+            facilitator=facilitator,
+            settlement_queue=queue,
+        )
+    )
+
+    with TestClient(app_with_middleware) as client:
+        header = make_payment_header(client.get("/test").json())
+        response = client.get("/test", headers={"X-PAYMENT": header})
+
+        assert response.status_code == 200
+        assert "X-PAYMENT-RESPONSE" not in response.headers
+        client.portal.call(queue.aclose, 5)
+
+    assert facilitator.calls == ["verify", "settle"]
+    assert len(settled) == 1 and settled[0].response.success
+
+
+def test_failed_settle_with_journal_returns_handler_response(
+    tmp_path, make_payment_header
+):
+    from x402.journal import SettlementJournal
+
+    class FailingSettleFacilitator(StubFacilitator):
+        async def settle(self, payment, payment_requirements):
+            self.calls.append("settle")
+            raise ConnectionError("facilitator unavailable")
+
+    journal = SettlementJournal(str(tmp_path / "settlements.jsonl"))
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/test",
+            network="base-sepolia",
+            facilitator=FailingSettleFacilitator(),
+            settlement_journal=journal,
+        )
+    )
+
+    client = TestClient(app_with_middleware)
+    header = make_payment_header(client.get("/test").json())
+    response = client.get("/test", headers={"X-PAYMENT": header})
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "success"}
+    assert len(journal.pending()) == 1
+
+
+def test_routes_sharing_a_journal_resubmit_once(tmp_path, make_payment_header):
+    import time
+    from x402.journal import SettlementJournal
+
+    class FailingSettleFacilitator(StubFacilitator):
+        async def settle(self, payment, payment_requirements):
+            raise ConnectionError("facilitator unavailable")
+
+    path = str(tmp_path / "settlements.jsonl")
+
+    def create_app(facilitator, journal):
+        app = FastAPI()
+        for route in ("/a", "/b"):
+            app.get(route)(test_endpoint)
+            app.middleware("http")(
+                require_payment(
+                    price="$1.00",
+                    pay_to_address="0x1111111111111111111111111111111111111111",
+                    path=route,
+                    network="base-sepolia",
+                    facilitator=facilitator,
+                    settlement_journal=journal,
+                )
+            )
+        return app
+
+    client = TestClient(create_app(FailingSettleFacilitator(), SettlementJournal(path)))
+    header = make_payment_header(client.get("/a").json())
+    assert client.get("/a", headers={"X-PAYMENT": header}).status_code == 200
+    assert len(SettlementJournal(path).pending()) == 1
+
+    # After a restart, the first request through each route triggers recovery
+    recovering = StubFacilitator()
+    journal = SettlementJournal(path)
+    with TestClient(create_app(recovering, journal)) as client:
+        client.get("/a")
+        client.get("/b")
+        deadline = time.monotonic() + 5
+        while journal.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert recovering.calls == ["settle"]
+    assert journal.pending() == []
+
+
+def test_price_callback():
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    quoted = []
+
+    def price(request: Request):
+        quoted.append(request.url.path)
+        return "$" + request.query_params.get("units", "1")
+
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price=price,
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/test",
+            network="base-sepolia",
+            resource="https://example.com/test",
+        )
+    )
+
+    client = TestClient(app_with_middleware)
+    one = client.get("/test")
+    three = client.get("/test", params={"units": "3"})
+
+    assert quoted == ["/test", "/test"]
+    assert one.json()["accepts"][0]["maxAmountRequired"] == "1000000"
+    assert three.json()["accepts"][0]["maxAmountRequired"] == "3000000"
+
+
+async def test_async_price_callback_reuses_requirements():
+    from x402.fastapi.middleware import _PaymentRoute
+
+    async def price(request: Request):
+        return request.query_params.get("price", "$0.01")
+
+    route = _PaymentRoute(
+        price=price,
+        pay_to_address="0x1111111111111111111111111111111111111111",
+        resource="https://example.com/test",
+    )
+
+    def request(query: bytes) -> Request:
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "scheme": "http",
+                "server": ("testserver", 80),
+                "path": "/test",
+                "query_string": query,
+                "headers": [],
+            }
+        )
+
+    first = await route.requirements(request(b""))
+    second = await route.requirements(request(b""))
+    other = await route.requirements(request(b"price=%240.02"))
+
+    assert first is second
+    assert other.accepts[0].max_amount_required == "20000"
@@ -358,3 +358,377 @@ def test_payment_amount_conversion():
         html_content = resp.get_data(as_text=True)
         # $0.001 should be converted to 0.001 in the display
         assert '"amount": 0.001' in html_content
+
+
+def test_single_dispatcher_for_multiple_configs():
+    app = Flask(__name__)
+
+    @app.route("/premium/special")
+    def special():
+        return {"special": True}
+
+    @app.route("/premium/other")
+    def other():
+        return {"other": True}
+
+    original_wsgi_app = app.wsgi_app
+    middleware = PaymentMiddleware(app)
+    middleware.add(
+        price="$1.00", pay_to_address="0x1", path="/premium/*", network="base-sepolia"
+    )
+    dispatcher = app.wsgi_app
+    middleware.add(
+        price="$5.00",
+        pay_to_address="0x1",
+        path="/premium/special",
+        network="base-sepolia",
+    )
+
+    # Later registrations extend the route table instead of re-wrapping the app
+    assert app.wsgi_app == dispatcher
+    assert middleware._next_app == original_wsgi_app
+
+    with app.test_client() as client:
+        special_resp = client.get("/premium/special")
+        other_resp = client.get("/premium/other")
+
+    # Exact paths take precedence over patterns
+    assert special_resp.json["accepts"][0]["maxAmountRequired"] == "5000000"
+    assert other_resp.json["accepts"][0]["maxAmountRequired"] == "1000000"
+
+
+def test_browser_paywall_etag_and_compression():
+    import gzip
+
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$1.00",
+                "pay_to_address": "0x1",
+                "path": "/protected",
+                "network": "base-sepolia",
+            }
+        ]
+    )
+    browser_headers = {
+        "Accept": "text/html",
+        "User-Agent": "Mozilla/5.0",
+        "Accept-Encoding": "gzip",
+    }
+
+    with app.test_client() as client:
+        resp = client.get("/protected", headers=browser_headers)
+        assert resp.status_code == 402
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert b"window.x402" in gzip.decompress(resp.get_data())
+
+        cached = client.get(
+            "/protected",
+            headers={**browser_headers, "If-None-Match": resp.headers["ETag"]},
+        )
+        assert cached.status_code == 304
+
+
+class RecordingFacilitator:
+    """Async facilitator stand-in that records which loop served each call."""
+
+    def __init__(self):
+        self.loops = []
+        self.calls = []
+
+    async def verify(self, payment, payment_requirements):
+        import asyncio
+        from x402.types import VerifyResponse
+
+        self.loops.append(asyncio.get_running_loop())
+        self.calls.append("verify")
+        return VerifyResponse(is_valid=True, payer=payment.payload.authorization.from_)
+
+    async def settle(self, payment, payment_requirements):
+        import asyncio
+        from x402.types import SettleResponse
+
+        self.loops.append(asyncio.get_running_loop())
+        self.calls.append("settle")
+        return SettleResponse(success=True, transaction="0xabc", network="base-sepolia")
+
+    async def aclose(self):
+        pass
+
+
+def test_paid_requests_share_background_loop(make_payment_header):
+    facilitator = RecordingFacilitator()
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+                "facilitator": facilitator,
+            }
+        ]
+    )
+
+    with app.test_client() as client:
+        unpaid = client.get("/protected")
+        for _ in range(2):
+            header = make_payment_header(unpaid.json)
+            resp = client.get("/protected", headers={"X-PAYMENT": header})
+            assert resp.status_code == 200
+
+    assert facilitator.calls == ["verify", "settle", "verify", "settle"]
+    # Every call ran on the same persistent loop
+    assert len(set(map(id, facilitator.loops))) == 1
+    assert not facilitator.loops[0].is_closed()
+
+
+def test_verify_cache_skips_verify_and_rejects_replays(make_payment_header):
+    from x402.cache import VerifyCache
+
+    facilitator = RecordingFacilitator()
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+                "facilitator": facilitator,
+                "verify_cache": VerifyCache(),
+            }
+        ]
+    )
+
+    with app.test_client() as client:
+        unpaid = client.get("/protected")
+        header = make_payment_header(unpaid.json)
+        assert (
+            client.get("/protected", headers={"X-PAYMENT": header}).status_code == 200
+        )
+
+        replay = client.get("/protected", headers={"X-PAYMENT": header})
+        assert replay.status_code == 402
+        assert "already settled" in replay.json["error"]
+
+    assert facilitator.calls == ["verify", "settle"]
+
+
+def test_local_verify_rejects_without_facilitator_call(make_payment_header):
+    import json
+    from x402.encoding import safe_base64_decode, safe_base64_encode
+
+    facilitator = RecordingFacilitator()
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+                "facilitator": facilitator,
+                "local_verify": True,
+            }
+        ]
+    )
+
+    with app.test_client() as client:
+        unpaid = client.get("/protected")
+        payment = json.loads(safe_base64_decode(make_payment_header(unpaid.json)))
+        payment["payload"]["authorization"]["value"] = "1000000"
+        tampered = safe_base64_encode(json.dumps(payment))
+
+        resp = client.get("/protected", headers={"X-PAYMENT": tampered})
+        assert resp.status_code == 402
+        assert resp.json["error"] == (
+            "Invalid payment: invalid_exact_evm_payload_signature"
+        )
+
+        # Underpayments do not match the requirements at all
+        payment["payload"]["authorization"]["value"] = "1"
+        underpaid = safe_base64_encode(json.dumps(payment))
+        resp = client.get("/protected", headers={"X-PAYMENT": underpaid})
+        assert resp.json["error"] == "No matching payment requirements found"
+
+        # Fields that do not fit a uint256 are rejected, not a server error
+        payment["payload"]["authorization"]["value"] = "10000"
+        payment["payload"]["authorization"]["validBefore"] = str(2**256)
+        oversized = safe_base64_encode(json.dumps(payment))
+        resp = client.get("/protected", headers={"X-PAYMENT": oversized})
+        assert resp.status_code == 402
+        assert resp.json["error"] == "Invalid payment: invalid_payload"
+        assert facilitator.calls == []
+
+        valid = client.get(
+            "/protected", headers={"X-PAYMENT": make_payment_header(unpaid.json)}
+        )
+        assert valid.status_code == 200
+
+    assert facilitator.calls == ["verify", "settle"]
+
+
+class FailingSettleFacilitator(RecordingFacilitator):
+    async def settle(self, payment, payment_requirements):
+        self.calls.append("settle")
+        raise ConnectionError("facilitator unavailable")
+
+
+def test_failed_settle_is_journaled_and_recovered(tmp_path, make_payment_header):
+    import time
+    from x402.journal import SettlementJournal
+
+    path = str(tmp_path / "settlements.jsonl")
+    route = {
+        "price": "$0.01",
+        "pay_to_address": "0x1111111111111111111111111111111111111111",
+        "path": "/protected",
+        "network": "base-sepolia",
+    }
+
+    failing = FailingSettleFacilitator()
+    app = create_app_with_middleware(
+        [
+            {
+                **route,
+                "facilitator": failing,
+                "settlement_journal": SettlementJournal(path),
+            }
+        ]
+    )
+    with app.test_client() as client:
+        header = make_payment_header(client.get("/protected").json)
+        resp = client.get("/protected", headers={"X-PAYMENT": header})
+        assert resp.status_code == 200
+        assert "X-PAYMENT-RESPONSE" not in resp.headers
+    assert len(SettlementJournal(path).pending()) == 1
+
+    # A restarted app resubmits the pending payment in the background
+    recovering = RecordingFacilitator()
+    create_app_with_middleware(
+        [
+            {
+                **route,
+                "facilitator": recovering,
+                "settlement_journal": SettlementJournal(path),
+            }
+        ]
+    )
+    deadline = time.monotonic() + 5
+    while SettlementJournal(path).pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert recovering.calls == ["settle"]
+    assert SettlementJournal(path).pending() == []
+
+
+class DeclinedSettleFacilitator(RecordingFacilitator):
+    async def settle(self, payment, payment_requirements):
+        from x402.types import SettleResponse
+
+        self.calls.append("settle")
+        return SettleResponse(success=False, error_reason="insufficient_funds")
+
+
+def test_settlement_header_reaches_streamed_response(make_payment_header):
+    import base64
+    import json
+    from flask import Response
+
+    facilitator = RecordingFacilitator()
+    app = Flask(__name__)
+
+    @app.route("/download")
+    def download():
+        def chunks():
+            yield b"a" * 1024
+            yield b"b" * 1024
+
+        return Response(chunks(), mimetype="application/octet-stream")
+
+    middleware = PaymentMiddleware(app)
+    middleware.add(
+        price="$0.01",
+        pay_to_address="0x1111111111111111111111111111111111111111",
+        path="/download",
+        network="base-sepolia",
+        facilitator=facilitator,
+    )
+
+    with app.test_client() as client:
+        header = make_payment_header(client.get("/download").json)
+        resp = client.get("/download", headers={"X-PAYMENT": header})
+
+        assert resp.status_code == 200
+        assert resp.data == b"a" * 1024 + b"b" * 1024
+        settlement = json.loads(base64.b64decode(resp.headers["X-PAYMENT-RESPONSE"]))
+        assert settlement["transaction"] == "0xabc"
+
+
+def test_declined_settle_returns_402(make_payment_header):
+    facilitator = DeclinedSettleFacilitator()
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$0.01",
+                "pay_to_address": "0x1111111111111111111111111111111111111111",
+                "path": "/protected",
+                "network": "base-sepolia",
+                "facilitator": facilitator,
+            }
+        ]
+    )
+
+    with app.test_client() as client:
+        header = make_payment_header(client.get("/protected").json)
+        resp = client.get("/protected", headers={"X-PAYMENT": header})
+
+        assert resp.status_code == 402
+        assert resp.json["error"] == "Settle failed: insufficient_funds"
+        assert "X-PAYMENT-RESPONSE" not in resp.headers
+    assert facilitator.calls == ["verify", "settle"]
+
+
+def test_decoded_payment_in_g(make_payment_header):
+    facilitator = RecordingFacilitator()
+    app = Flask(__name__)
+
+    @app.route("/protected")
+    def protected():
+        return {"payer": g.payment.payer, "network": g.payment.network}
+
+    middleware = PaymentMiddleware(app)
+    middleware.add(
+        price="$0.01",
+        pay_to_address="0x1111111111111111111111111111111111111111",
+        path="/protected",
+        network="base-sepolia",
+        facilitator=facilitator,
+    )
+
+    with app.test_client() as client:
+        header = make_payment_header(client.get("/protected").json)
+        resp = client.get("/protected", headers={"X-PAYMENT": header})
+
+        assert resp.status_code == 200
+        assert resp.json["network"] == "base-sepolia"
+        assert resp.json["payer"].startswith("0x")
+
+
+def test_price_callback():
+    app = create_app_with_middleware(
+        [
+            {
+                "price": lambda request: "$" + request.args.get("units", "1"),
+                "pay_to_address": "0x1",
+                "path": "/protected",
+                "network": "base-sepolia",
+            }
+        ]
+    )
+    with app.test_client() as client:
+        one = client.get("/protected")
+        three = client.get("/protected?units=3")
+
+    assert one.status_code == three.status_code == 402
+    assert one.json["accepts"][0]["maxAmountRequired"] == "1000000"
+    assert three.json["accepts"][0]["maxAmountRequired"] == "3000000"
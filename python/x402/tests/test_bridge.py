@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from x402.bridge import AsyncBridge, get_default_bridge
+
+
+@pytest.fixture
+def bridge():
+    bridge = AsyncBridge()
+    yield bridge
+    bridge.close()
+
+
+def test_run_returns_result_on_persistent_loop(bridge):
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = bridge.run(current_loop())
+    second = bridge.run(current_loop())
+
+    assert first is second
+    assert first is bridge.loop
+
+
+def test_run_propagates_exceptions(bridge):
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        bridge.run(fail())
+
+
+def test_run_from_many_threads(bridge):
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda v: bridge.run(double(v)), range(100)))
+
+    assert results == [v * 2 for v in range(100)]
+
+
+def test_run_timeout(bridge):
+    import concurrent.futures
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        bridge.run(asyncio.sleep(10), timeout=0.05)
+
+
+def test_run_from_loop_thread_is_rejected(bridge):
+    async def nested():
+        return bridge.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match="its own loop"):
+        bridge.run(nested())
+
+
+def test_close_and_restart(bridge):
+    async def thread_name():
+        return threading.current_thread().name
+
+    assert bridge.run(thread_name()) == "x402-async-bridge"
+    first_loop = bridge.loop
+    bridge.close()
+
+    assert first_loop.is_closed()
+    assert bridge.run(thread_name()) == "x402-async-bridge"
+    assert bridge.loop is not first_loop
+
+
+def test_default_bridge_is_shared():
+    assert get_default_bridge() is get_default_bridge()
@@ -0,0 +1,178 @@
+import json
+
+import pytest
+
+from x402.cache import CachedPaymentRequirements, LRUCache, VerifyCache
+from x402.nonces import NonceStore
+from x402.types import (
+    EIP3009Authorization,
+    ExactPaymentPayload,
+    PaymentPayload,
+    PaymentRequirements,
+    VerifyResponse,
+    x402PaymentRequiredResponse,
+)
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1234567890123456789012345678901234567890",
+        max_amount_required="1000000",
+        resource="https://example.com/api",
+        description="Café access",
+        max_timeout_seconds=60,
+        mime_type="application/json",
+        output_schema={},
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_get_or_create_builds_once():
+    cache = LRUCache(maxsize=4)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    first = cache.get_or_create("key", factory)
+    second = cache.get_or_create("key", factory)
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_lru_cache_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_cached_requirements_body_matches_model(payment_requirements):
+    cached = CachedPaymentRequirements([payment_requirements])
+
+    body = cached.response_body("No X-PAYMENT header provided")
+    expected = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="No X-PAYMENT header provided",
+    ).model_dump(by_alias=True)
+
+    assert json.loads(body) == expected
+    assert cached.response_body("No X-PAYMENT header provided") is body
+    assert cached.accepts == [payment_requirements]
+
+
+def test_cached_requirements_escapes_error(payment_requirements):
+    cached = CachedPaymentRequirements([payment_requirements])
+    error = 'Invalid payment: "quoted" \\ value'
+
+    assert json.loads(cached.response_body(error))["error"] == error
+
+
+def make_payment(nonce="0x" + "01" * 32, valid_before="2000"):
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload=ExactPaymentPayload(
+            signature="0x" + "ab" * 65,
+            authorization=EIP3009Authorization(
+                **{"from": "0x" + "22" * 20},
+                to="0x1234567890123456789012345678901234567890",
+                value="1000000",
+                valid_after="0",
+                valid_before=valid_before,
+                nonce=nonce,
+            ),
+        ),
+    )
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_verify_cache_hits_until_valid_before(payment_requirements):
+    clock = FakeClock()
+    cache = VerifyCache(clock=clock)
+    payment = make_payment()
+    response = VerifyResponse(is_valid=True, payer="0x" + "22" * 20)
+
+    assert cache.get(payment, payment_requirements) is None
+    cache.set(payment, payment_requirements, response)
+    assert cache.get(payment, payment_requirements) is response
+
+    clock.now = 2000
+    assert cache.get(payment, payment_requirements) is None
+
+
+def test_verify_cache_skips_invalid_results(payment_requirements):
+    cache = VerifyCache(clock=FakeClock())
+    payment = make_payment()
+    cache.set(
+        payment,
+        payment_requirements,
+        VerifyResponse(is_valid=False, invalid_reason="insufficient_funds", payer=None),
+    )
+    assert cache.get(payment, payment_requirements) is None
+
+
+def test_verify_cache_is_keyed_by_requirements(payment_requirements):
+    cache = VerifyCache(clock=FakeClock())
+    payment = make_payment()
+    cache.set(
+        payment,
+        payment_requirements,
+        VerifyResponse(is_valid=True, payer="0x" + "22" * 20),
+    )
+
+    pricier = payment_requirements.model_copy(update={"max_amount_required": "2000000"})
+    assert cache.get(payment, pricier) is None
+    assert cache.get(make_payment(nonce="0x" + "02" * 32), payment_requirements) is None
+
+
+def test_verify_cache_tracks_settled_nonces():
+    clock = FakeClock()
+    cache = VerifyCache(clock=clock)
+    payment = make_payment()
+
+    assert not cache.is_settled(payment)
+    cache.mark_settled(payment)
+    assert cache.is_settled(payment)
+    assert not cache.is_settled(make_payment(nonce="0x" + "02" * 32))
+
+    # Expired authorizations cannot be replayed on chain, so they are forgotten
+    clock.now = 2000
+    assert not cache.is_settled(payment)
+
+
+def test_verify_cache_shares_a_nonce_store():
+    clock = FakeClock()
+    nonces = NonceStore(clock=clock)
+    payment = make_payment()
+
+    VerifyCache(clock=clock, nonce_store=nonces).mark_settled(payment)
+
+    authorization = payment.payload.authorization
+    assert (authorization.from_, authorization.nonce) in nonces
+    assert VerifyCache(clock=clock, nonce_store=nonces).is_settled(payment)
@@ -0,0 +1,170 @@
+import json
+
+import pytest
+
+from x402 import chains, networks
+from x402.chains import (
+    TokenRegistry,
+    get_chain_id,
+    get_default_token_address,
+    get_token_decimals,
+    get_token_name,
+    registry,
+)
+from x402.common import process_price_to_atomic_amount
+from x402.types import PaymentRequirements
+
+SEI_USDC = "0x3894085Ef7Ff0f0aeDf52E2A2704928d1Ec074F1"
+
+REGISTRY_DATA = {
+    "networks": {"sei": "1329"},
+    "tokens": {
+        "1329": [
+            {
+                "human_name": "usdc",
+                "address": SEI_USDC,
+                "name": "USDC",
+                "decimals": 6,
+                "version": "2",
+            }
+        ]
+    },
+}
+
+
+@pytest.fixture
+def global_registry(monkeypatch):
+    """Undo registrations on the module registry after the test."""
+    for attr in ("_networks", "_by_address", "_by_name"):
+        monkeypatch.setattr(registry, attr, dict(getattr(registry, attr)))
+    return registry
+
+
+def test_builtin_tokens():
+    assert get_chain_id("base") == "8453"
+    assert get_chain_id("8453") == "8453"
+    address = get_default_token_address("8453")
+    assert address == "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    assert get_token_name("8453", address) == "USD Coin"
+    assert get_token_decimals("8453", address) == 6
+
+
+def test_address_lookup_ignores_case():
+    address = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    assert registry.token("8453", address.lower()) == registry.token("8453", address)
+    assert registry.token(8453, address.upper().replace("0X", "0x")).name == "USD Coin"
+
+
+def test_unknown_lookups_raise():
+    with pytest.raises(ValueError):
+        get_chain_id("not-a-network")
+    with pytest.raises(ValueError):
+        get_token_name("8453", "0x0000000000000000000000000000000000000000")
+    with pytest.raises(ValueError):
+        get_default_token_address("1", "usdc")
+
+
+def test_register_token_checksums_and_keeps_default():
+    tokens = TokenRegistry()
+    first = tokens.register_token(1329, SEI_USDC.lower(), "USDC", 6, "2", "usdc")
+    other = tokens.register_token(
+        "1329", "0x0000000000000000000000000000000000000001", "Other", 6, "1", "usdc"
+    )
+
+    assert first.address == SEI_USDC
+    assert tokens.default_token("1329", "usdc") == first
+    assert tokens.token("1329", other.address) == other
+
+    # Re-registering the default replaces it
+    updated = tokens.register_token("1329", SEI_USDC, "USDC", 6, "3", "usdc")
+    assert tokens.default_token("1329").version == "3"
+    assert tokens.token("1329", SEI_USDC) == updated
+
+
+def test_load_json(tmp_path):
+    path = tmp_path / "tokens.json"
+    path.write_text(json.dumps(REGISTRY_DATA))
+
+    tokens = TokenRegistry()
+    tokens.load(path)
+
+    assert tokens.networks == ("sei",)
+    assert tokens.chain_id("sei") == "1329"
+    assert tokens.default_token("1329").address == SEI_USDC
+
+
+def test_load_toml(tmp_path):
+    try:
+        import tomllib  # noqa: F401
+    except ImportError:
+        pytest.importorskip("tomli")
+    path = tmp_path / "tokens.toml"
+    path.write_text(
+        "[networks]\n"
+        'sei = "1329"\n'
+        "\n"
+        '[[tokens."1329"]]\n'
+        'human_name = "usdc"\n'
+        f'address = "{SEI_USDC}"\n'
+        'name = "USDC"\n'
+        "decimals = 6\n"
+        'version = "2"\n'
+    )
+
+    tokens = TokenRegistry()
+    tokens.load(path)
+
+    assert tokens.default_token("1329").name == "USDC"
+
+
+def test_registered_network_is_usable(global_registry):
+    with pytest.raises(ValueError):
+        process_price_to_atomic_amount("$0.01", "sei")
+
+    global_registry.update(REGISTRY_DATA)
+
+    assert process_price_to_atomic_amount("$0.01", "sei") == (
+        "10000",
+        SEI_USDC,
+        {"name": "USDC", "version": "2"},
+    )
+    requirements = PaymentRequirements(
+        scheme="exact",
+        network="sei",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        mime_type="text/plain",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_timeout_seconds=60,
+        asset=SEI_USDC,
+    )
+    assert requirements.network == "sei"
+    assert networks.EVM_NETWORK_TO_CHAIN_ID["sei"] == 1329
+    assert chains.NETWORK_TO_ID["sei"] == "1329"
+    assert chains.KNOWN_TOKENS["1329"] == REGISTRY_DATA["tokens"]["1329"]
+
+
+def test_to_dict_round_trips():
+    assert TokenRegistry().to_dict() == {"networks": {}, "tokens": {}}
+
+    tokens = TokenRegistry()
+    tokens.update(REGISTRY_DATA)
+    assert tokens.to_dict() == REGISTRY_DATA
+    assert registry.to_dict()["networks"]["base"] == "8453"
+
+
+def test_unregistered_network_is_rejected():
+    with pytest.raises(ValueError):
+        PaymentRequirements(
+            scheme="exact",
+            network="sei",
+            max_amount_required="10000",
+            resource="https://example.com",
+            description="test",
+            mime_type="text/plain",
+            pay_to="0x0000000000000000000000000000000000000000",
+            max_timeout_seconds=60,
+            asset=SEI_USDC,
+        )
+    assert "sei" not in chains.registry.networks
@@ -1,8 +1,13 @@
+import json
+
+from x402.chains import registry
 from x402.common import (
+    money_to_atomic_amount,
     parse_money,
     process_price_to_atomic_amount,
     get_usdc_address,
     find_matching_payment_requirements,
+    PaymentRequirementsIndex,
 )
 from x402.types import (
     TokenAmount,
@@ -66,6 +71,22 @@ def test_process_price_to_atomic_amount_money():
     assert amount == "2000000"  # 2 USDC = 2,000,000 atomic units
 
 
+def test_money_conversion_is_memoized():
+    token = registry.default_token("84532")
+    money_to_atomic_amount.cache_clear()
+
+    for _ in range(3):
+        assert process_price_to_atomic_amount("$0.37", "base-sepolia")[0] == "370000"
+
+    info = money_to_atomic_amount.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+    # Keyed by the token too, so the same price on another chain is converted anew
+    other = registry.default_token("8453")
+    assert money_to_atomic_amount("$0.37", other) == "370000"
+    assert money_to_atomic_amount("$0.37", token) == "370000"
+    assert money_to_atomic_amount.cache_info().misses == 2
+
+
 def test_process_price_to_atomic_amount_token():
     """Test processing TokenAmount to atomic amounts"""
     # Create a test TokenAmount
@@ -173,3 +194,87 @@ def test_find_matching_payment_requirements():
     payment.scheme = "different"  # No matching scheme
     match = find_matching_payment_requirements(requirements, payment)
     assert match is None
+
+
+def make_requirements(
+    amount, pay_to, asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+):
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        max_amount_required=amount,
+        resource="https://example.com/api/v1",
+        description="Test API",
+        mime_type="application/json",
+        pay_to=pay_to,
+        max_timeout_seconds=300,
+        asset=asset,
+    )
+
+
+def make_payment(pay_to, value):
+    authorization = EIP3009Authorization(
+        **{
+            "from": "0xabcd1234567890123456789012345678901234abcd",
+            "to": pay_to,
+            "value": value,
+            "validAfter": "1234567890",
+            "validBefore": "1234567999",
+            "nonce": "0xabc123",
+        }
+    )
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload=ExactPaymentPayload(signature="0x1234", authorization=authorization),
+    )
+
+
+def test_requirements_index_checks_recipient_and_amount():
+    alice = "0x1111111111111111111111111111111111111111"
+    bob = "0x2222222222222222222222222222222222222222"
+    cheap, dear = make_requirements("1000", alice), make_requirements("5000", alice)
+    index = PaymentRequirementsIndex([cheap, dear, make_requirements("1", bob)])
+
+    assert index.match(make_payment(alice, "1000")) is cheap
+    # The most expensive option the value covers
+    assert index.match(make_payment(alice.upper().replace("0X", "0x"), "7000")) is dear
+    assert index.match(make_payment(alice, "999")) is None
+    assert (
+        index.match(make_payment("0x3333333333333333333333333333333333333333", "1"))
+        is None
+    )
+
+
+def test_requirements_index_asset_filter_and_order():
+    pay_to = "0x1111111111111111111111111111111111111111"
+    other_asset = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+    first = make_requirements("1000", pay_to)
+    second = make_requirements("1000", pay_to, asset=other_asset)
+    index = PaymentRequirementsIndex([first, second])
+
+    assert index.match(make_payment(pay_to, "1000")) is first
+    assert (
+        index.match(make_payment(pay_to, "1000"), asset=other_asset.lower()) is second
+    )
+
+
+def test_requirements_index_matches_decoded_headers():
+    from x402.decode import decode_payment_header
+    from x402.encoding import safe_base64_encode
+
+    pay_to = "0x1111111111111111111111111111111111111111"
+    requirements = make_requirements("1000", pay_to)
+    index = PaymentRequirementsIndex([requirements])
+
+    def decoded(payment):
+        return decode_payment_header(safe_base64_encode(json.dumps(payment)))
+
+    payment = make_payment(pay_to, "1000").model_dump(by_alias=True)
+    assert index.match(decoded(payment)) is requirements
+
+    payment["payload"]["authorization"]["value"] = "lots"
+    assert index.match(decoded(payment)) is None
+    del payment["payload"]
+    assert index.match(decoded(payment)) is None
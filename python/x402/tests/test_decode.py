@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from x402.decode import DecodedPayment, PaymentDecodeError, decode_payment_header
+from x402.encoding import safe_base64_encode
+from x402.types import PaymentPayload
+
+
+@pytest.fixture
+def payment_dict():
+    return {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {
+            "signature": "0x" + "ab" * 65,
+            "authorization": {
+                "from": "0xabcd1234567890123456789012345678901234ab",
+                "to": "0x1234567890123456789012345678901234567890",
+                "value": "10000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "01" * 32,
+            },
+        },
+    }
+
+
+def encode(data):
+    return safe_base64_encode(json.dumps(data))
+
+
+def test_decodes_without_validating_payload(payment_dict):
+    header = encode(payment_dict)
+    decoded = decode_payment_header(header)
+
+    assert isinstance(decoded, DecodedPayment)
+    assert decoded.header == header
+    assert (decoded.scheme, decoded.network) == ("exact", "base-sepolia")
+    assert decoded._payment is None
+
+    payment = decoded.payment
+    assert payment == PaymentPayload(**payment_dict)
+    assert decoded.payment is payment
+    assert decoded.payer == payment_dict["payload"]["authorization"]["from"]
+
+
+def test_accepts_field_names(payment_dict):
+    payment_dict["x402_version"] = payment_dict.pop("x402Version")
+    decoded = decode_payment_header(encode(payment_dict))
+
+    assert decoded.payment.x402_version == 1
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "not base64!",
+        safe_base64_encode("not json"),
+        safe_base64_encode("[1, 2]"),
+        safe_base64_encode('{"scheme": "exact"}'),
+        safe_base64_encode('{"scheme": "exact", "network": 1}'),
+    ],
+)
+def test_rejects_malformed_headers(header):
+    with pytest.raises(PaymentDecodeError):
+        decode_payment_header(header)
+
+
+def test_invalid_payload_fails_on_access(payment_dict):
+    payment_dict["payload"]["authorization"]["value"] = "ten"
+    decoded = decode_payment_header(encode(payment_dict))
+
+    assert decoded.network == "base-sepolia"
+    with pytest.raises(PaymentDecodeError):
+        decoded.payment
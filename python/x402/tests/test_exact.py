@@ -1,16 +1,21 @@
 import pytest
 import time
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from eth_account import Account
 from hexbytes import HexBytes
 from x402.exact import (
     create_nonce,
     prepare_payment_header,
     sign_payment_header,
+    sign_payment_headers_batch,
     encode_payment,
     decode_payment,
+    transfer_with_authorization_hash,
+    transfer_with_authorization_typed_data,
+    verify_payment_payload,
 )
-from x402.types import PaymentRequirements
+from x402.types import PaymentPayload, PaymentRequirements
 
 
 @pytest.fixture
@@ -196,3 +201,207 @@ def test_decode_payment():
     assert decoded["array"] == complex_data["array"]
     assert decoded["object"] == complex_data["object"]
     assert decoded["hex"] == "1234"  # Implementation returns hex without 0x prefix
+
+
+def make_signed_payment(account, payment_requirements):
+    header = prepare_payment_header(account.address, 1, payment_requirements)
+    nonce = header["payload"]["authorization"]["nonce"]
+    header["payload"]["authorization"]["nonce"] = nonce.hex()
+    return PaymentPayload(
+        **decode_payment(sign_payment_header(account, payment_requirements, header))
+    )
+
+
+def with_authorization(payment, **changes):
+    authorization = payment.payload.authorization.model_copy(update=changes)
+    return payment.model_copy(
+        update={
+            "payload": payment.payload.model_copy(
+                update={"authorization": authorization}
+            )
+        }
+    )
+
+
+def test_authorization_hash_matches_eth_account(account, payment_requirements):
+    from eth_account.messages import encode_typed_data, _hash_eip191_message
+
+    payment = make_signed_payment(account, payment_requirements)
+    authorization = payment.payload.authorization.model_dump(by_alias=True)
+    typed_data = transfer_with_authorization_typed_data(
+        payment_requirements, authorization
+    )
+    signable = encode_typed_data(
+        domain_data=typed_data["domain"],
+        message_types=typed_data["types"],
+        message_data=typed_data["message"],
+    )
+
+    assert _hash_eip191_message(signable) == transfer_with_authorization_hash(
+        payment_requirements, authorization
+    )
+
+
+def test_verify_payment_payload_accepts_signed_payment(account, payment_requirements):
+    payment = make_signed_payment(account, payment_requirements)
+
+    result = verify_payment_payload(payment, payment_requirements)
+
+    assert result.is_valid
+    assert result.payer == account.address
+
+
+def test_verify_payment_payload_rejects_tampered_value(account, payment_requirements):
+    payment = with_authorization(
+        make_signed_payment(account, payment_requirements), value="20000"
+    )
+
+    result = verify_payment_payload(payment, payment_requirements)
+
+    assert not result.is_valid
+    assert result.invalid_reason == "invalid_exact_evm_payload_signature"
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"value": "-1"},
+        {"value": str(2**300)},
+        {"valid_after": "-1"},
+        {"valid_before": str(2**256)},
+    ],
+)
+def test_verify_payment_payload_rejects_out_of_range_uint256(
+    account, payment_requirements, changes
+):
+    payment = with_authorization(
+        make_signed_payment(account, payment_requirements), **changes
+    )
+
+    result = verify_payment_payload(payment, payment_requirements)
+
+    assert not result.is_valid
+    assert result.invalid_reason == "invalid_payload"
+
+
+def test_verify_payment_payload_rejects_foreign_signer(account, payment_requirements):
+    payment = with_authorization(
+        make_signed_payment(account, payment_requirements),
+        from_=Account.create().address,
+    )
+
+    result = verify_payment_payload(payment, payment_requirements)
+
+    assert result.invalid_reason == "invalid_exact_evm_payload_signature"
+
+
+def test_verify_payment_payload_rejects_malformed_signature(
+    account, payment_requirements
+):
+    payment = make_signed_payment(account, payment_requirements)
+    payment = payment.model_copy(
+        update={"payload": payment.payload.model_copy(update={"signature": "0x1234"})}
+    )
+
+    result = verify_payment_payload(payment, payment_requirements)
+
+    assert result.invalid_reason == "invalid_exact_evm_payload_signature"
+
+
+@pytest.mark.parametrize(
+    "changes, reason",
+    [
+        (
+            {"pay_to": "0x1111111111111111111111111111111111111111"},
+            "invalid_exact_evm_payload_recipient_mismatch",
+        ),
+        (
+            {"max_amount_required": "10001"},
+            "invalid_exact_evm_payload_authorization_value",
+        ),
+        ({"network": "base"}, "invalid_network"),
+    ],
+)
+def test_verify_payment_payload_checks_requirements(
+    account, payment_requirements, changes, reason
+):
+    payment = make_signed_payment(account, payment_requirements)
+
+    result = verify_payment_payload(
+        payment, payment_requirements.model_copy(update=changes)
+    )
+
+    assert not result.is_valid
+    assert result.invalid_reason == reason
+
+
+def test_verify_payment_payload_checks_time_window(account, payment_requirements):
+    payment = make_signed_payment(account, payment_requirements)
+    authorization = payment.payload.authorization
+
+    expired = verify_payment_payload(
+        payment, payment_requirements, now=int(authorization.valid_before)
+    )
+    early = verify_payment_payload(
+        payment, payment_requirements, now=int(authorization.valid_after) - 1
+    )
+
+    assert (
+        expired.invalid_reason == "invalid_exact_evm_payload_authorization_valid_before"
+    )
+    assert early.invalid_reason == "invalid_exact_evm_payload_authorization_valid_after"
+
+
+def test_sign_payment_header_matches_typed_data_signature(
+    account, payment_requirements
+):
+    payment = make_signed_payment(account, payment_requirements)
+    authorization = payment.payload.authorization.model_dump(by_alias=True)
+    typed_data = transfer_with_authorization_typed_data(
+        payment_requirements, authorization
+    )
+    signed = account.sign_typed_data(
+        domain_data=typed_data["domain"],
+        message_types=typed_data["types"],
+        message_data=typed_data["message"],
+    )
+
+    assert HexBytes(payment.payload.signature) == signed.signature
+
+
+def test_sign_payment_headers_batch(account, payment_requirements):
+    headers = sign_payment_headers_batch(account, payment_requirements, 5)
+
+    payments = [PaymentPayload(**decode_payment(header)) for header in headers]
+    assert len({p.payload.authorization.nonce for p in payments}) == 5
+    for payment in payments:
+        assert payment.x402_version == 1
+        result = verify_payment_payload(payment, payment_requirements)
+        assert result.is_valid
+        assert result.payer == account.address
+
+
+def test_sign_payment_headers_batch_on_executor(account, payment_requirements):
+    nonces = [f"{i:064x}" for i in range(7)]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        headers = sign_payment_headers_batch(
+            account,
+            payment_requirements,
+            7,
+            executor=executor,
+            chunk_size=3,
+            nonces=nonces,
+        )
+
+    assert [
+        decode_payment(header)["payload"]["authorization"]["nonce"]
+        for header in headers
+    ] == ["0x" + nonce for nonce in nonces]
+    for header in headers:
+        payment = PaymentPayload(**decode_payment(header))
+        assert verify_payment_payload(payment, payment_requirements).is_valid
+
+
+def test_sign_payment_headers_batch_checks_nonce_count(account, payment_requirements):
+    with pytest.raises(ValueError, match="Expected 2 nonces"):
+        sign_payment_headers_batch(account, payment_requirements, 2, nonces=["00" * 32])
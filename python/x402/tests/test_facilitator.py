@@ -0,0 +1,451 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from x402.facilitator import (
+    CircuitBreaker,
+    FacilitatorClient,
+    FacilitatorUnavailableError,
+    MicroBatcher,
+)
+from x402.types import (
+    EIP3009Authorization,
+    ExactPaymentPayload,
+    PaymentPayload,
+    PaymentRequirements,
+)
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1234567890123456789012345678901234567890",
+        max_amount_required="1000000",
+        resource="https://example.com/api",
+        description="test",
+        max_timeout_seconds=60,
+        mime_type="application/json",
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+@pytest.fixture
+def payment():
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload=ExactPaymentPayload(
+            signature="0x" + "ab" * 65,
+            authorization=EIP3009Authorization(
+                **{
+                    "from": "0xabcd1234567890123456789012345678901234ab",
+                    "to": "0x1234567890123456789012345678901234567890",
+                    "value": "1000000",
+                    "validAfter": "0",
+                    "validBefore": "9999999999",
+                    "nonce": "0x" + "00" * 32,
+                }
+            ),
+        ),
+    )
+
+
+def facilitator_handler(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    assert body["x402Version"] == 1
+    if request.url.path.endswith("/verify"):
+        return httpx.Response(200, json={"isValid": True, "payer": "0xabcd"})
+    return httpx.Response(
+        200,
+        json={"success": True, "transaction": "0x1", "network": "base-sepolia"},
+    )
+
+
+def test_invalid_url():
+    with pytest.raises(ValueError, match="Invalid URL"):
+        FacilitatorClient({"url": "ftp://example.com"})
+
+
+async def test_pool_reused_across_verify_and_settle(
+    monkeypatch, payment, payment_requirements
+):
+    created = []
+    original_init = httpx.AsyncClient.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(facilitator_handler)
+        original_init(self, *args, **kwargs)
+        created.append(self)
+
+    monkeypatch.setattr(httpx.AsyncClient, "__init__", tracking_init)
+
+    async with FacilitatorClient(
+        {"url": "https://facilitator.test/", "timeout": 2.5, "max_connections": 4}
+    ) as facilitator:
+        verify_response = await facilitator.verify(payment, payment_requirements)
+        settle_response = await facilitator.settle(payment, payment_requirements)
+        await facilitator.verify(payment, payment_requirements)
+
+        assert verify_response.is_valid
+        assert settle_response.success
+        assert len(created) == 1
+        assert created[0].timeout.read == 2.5
+
+    assert created[0].is_closed
+
+
+def test_each_event_loop_gets_its_own_pool(monkeypatch, payment, payment_requirements):
+    created = []
+    original_init = httpx.AsyncClient.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(facilitator_handler)
+        original_init(self, *args, **kwargs)
+        created.append(self)
+
+    monkeypatch.setattr(httpx.AsyncClient, "__init__", tracking_init)
+    facilitator = FacilitatorClient({"url": "https://facilitator.test"})
+    background = asyncio.new_event_loop()
+    thread = threading.Thread(target=background.run_forever)
+    thread.start()
+
+    async def use_and_close():
+        assert (await facilitator.verify(payment, payment_requirements)).is_valid
+        await facilitator.aclose()
+
+    try:
+        asyncio.run_coroutine_threadsafe(
+            facilitator.verify(payment, payment_requirements), background
+        ).result(5)
+        asyncio.run(use_and_close())
+
+        assert len(created) == 2
+        assert created[1].is_closed
+        # Closed on the loop it belongs to
+        deadline = time.monotonic() + 5
+        while not created[0].is_closed:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        background.call_soon_threadsafe(background.stop)
+        thread.join()
+        background.close()
+
+
+async def test_external_http_client_is_not_closed(payment, payment_requirements):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(facilitator_handler))
+    facilitator = FacilitatorClient(
+        {"url": "https://facilitator.test", "http_client": http_client}
+    )
+
+    verify_response = await facilitator.verify(payment, payment_requirements)
+    assert verify_response.is_valid
+
+    await facilitator.aclose()
+    assert not http_client.is_closed
+    await http_client.aclose()
+
+
+async def test_create_headers_applied_per_endpoint(payment, payment_requirements):
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen[request.url.path] = request.headers.get("Authorization")
+        return facilitator_handler(request)
+
+    async def create_headers():
+        return {
+            "verify": {"Authorization": "verify-token"},
+            "settle": {"Authorization": "settle-token"},
+        }
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    facilitator = FacilitatorClient(
+        {
+            "url": "https://facilitator.test",
+            "create_headers": create_headers,
+            "http_client": http_client,
+        }
+    )
+
+    await facilitator.verify(payment, payment_requirements)
+    await facilitator.settle(payment, payment_requirements)
+
+    assert seen == {"/verify": "verify-token", "/settle": "settle-token"}
+    await http_client.aclose()
+
+
+def answer(path, body):
+    if path == "verify":
+        payer = body["paymentPayload"]["payload"]["authorization"]["from"]
+        return {"isValid": True, "payer": payer}
+    return {"success": True, "transaction": "0x1", "network": "base-sepolia"}
+
+
+class StandInFacilitator:
+    """Local stand-in for a facilitator that injects latency and failures."""
+
+    def __init__(self, latency=0.0, status=200, error=None, batching=False):
+        self.latency = latency
+        self.status = status
+        self.error = error
+        self.batching = batching
+        self.calls = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.lstrip("/")
+        self.calls.append(path)
+        await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        if self.status != 200:
+            return httpx.Response(self.status)
+        body = json.loads(request.content)
+        if path.endswith("/batch"):
+            if not self.batching:
+                return httpx.Response(404)
+            kind = path[: -len("/batch")]
+            return httpx.Response(
+                200, json={"results": [answer(kind, item) for item in body["items"]]}
+            )
+        return httpx.Response(200, json=answer(path, body))
+
+
+@pytest.fixture
+async def stand_ins(monkeypatch):
+    """Build clients over stand-in facilitators, tried in configuration order."""
+    http_clients = []
+
+    def make(facilitators, **config):
+        http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: facilitators[request.url.host](request)
+            )
+        )
+        http_clients.append(http_client)
+        client = FacilitatorClient(
+            {
+                "urls": [f"https://{host}" for host in facilitators],
+                "http_client": http_client,
+                **config,
+            }
+        )
+        monkeypatch.setattr(client, "_ranked_endpoints", lambda: client._endpoints)
+        return client
+
+    yield make
+    for http_client in http_clients:
+        await http_client.aclose()
+
+
+async def test_verify_fails_over_and_breaker_opens(
+    stand_ins, payment, payment_requirements
+):
+    broken, healthy = StandInFacilitator(status=503), StandInFacilitator()
+    facilitator = stand_ins({"a.test": broken, "b.test": healthy}, failure_threshold=2)
+
+    for _ in range(4):
+        assert (await facilitator.verify(payment, payment_requirements)).is_valid
+
+    # Skipped once its breaker opened
+    assert broken.calls == ["verify", "verify"]
+    assert healthy.calls == ["verify"] * 4
+    assert facilitator.circuit_breaker("https://a.test").state == "open"
+    assert facilitator.circuit_breaker("https://b.test/").state == "closed"
+
+
+async def test_verify_is_hedged(stand_ins, payment, payment_requirements):
+    slow, fast = StandInFacilitator(latency=5), StandInFacilitator()
+    facilitator = stand_ins({"slow.test": slow, "fast.test": fast}, hedge_after=0.05)
+
+    start = time.monotonic()
+    assert (await facilitator.verify(payment, payment_requirements)).is_valid
+
+    assert time.monotonic() - start < 1
+    assert slow.calls == fast.calls == ["verify"]
+    # The abandoned request does not count against the slow endpoint
+    assert facilitator.circuit_breaker("https://slow.test").state == "closed"
+
+
+async def test_settle_only_fails_over_when_undelivered(
+    stand_ins, payment, payment_requirements
+):
+    backup = StandInFacilitator()
+    unreachable = StandInFacilitator(error=httpx.ConnectError("refused"))
+    facilitator = stand_ins({"a.test": unreachable, "b.test": backup})
+
+    assert (await facilitator.settle(payment, payment_requirements)).success
+    assert backup.calls == ["settle"]
+
+    # A 5xx may come after the payment was submitted, so it is not retried elsewhere
+    backup.calls.clear()
+    failing = StandInFacilitator(status=502)
+    facilitator = stand_ins({"c.test": failing, "b.test": backup})
+    with pytest.raises(httpx.HTTPStatusError):
+        await facilitator.settle(payment, payment_requirements)
+    assert backup.calls == []
+
+
+async def test_deadline(stand_ins, payment, payment_requirements):
+    facilitator = stand_ins(
+        {"slow.test": StandInFacilitator(latency=5)}, verify_deadline=0.05
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await facilitator.verify(payment, payment_requirements)
+    assert facilitator.circuit_breaker("https://slow.test").state == "closed"
+
+
+async def test_all_breakers_open(stand_ins, payment, payment_requirements):
+    broken = StandInFacilitator(status=500)
+    facilitator = stand_ins({"a.test": broken}, failure_threshold=1)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await facilitator.verify(payment, payment_requirements)
+    with pytest.raises(FacilitatorUnavailableError):
+        await facilitator.verify(payment, payment_requirements)
+    assert broken.calls == ["verify"]
+
+
+def test_circuit_breaker_trial_request():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=10, clock=lambda: now[0]
+    )
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_faster_endpoints_are_preferred():
+    facilitator = FacilitatorClient(
+        {"urls": ["https://fast.test", "https://slow.test"]}
+    )
+    fast, slow = facilitator._endpoints
+    fast.observe(0.01)
+    slow.observe(0.1)
+
+    first = [facilitator._ranked_endpoints()[0] for _ in range(1000)]
+    assert first.count(fast) > 800
+    assert first.count(slow) > 0
+
+    # Endpoints with an open breaker go last
+    for _ in range(fast.breaker.failure_threshold):
+        fast.breaker.record_failure()
+    assert facilitator._ranked_endpoints()[0] is slow
+
+
+def payment_from(payment, payer):
+    authorization = payment.payload.authorization.model_copy(update={"from_": payer})
+    return payment.model_copy(
+        update={
+            "payload": payment.payload.model_copy(
+                update={"authorization": authorization}
+            )
+        }
+    )
+
+
+async def test_concurrent_calls_are_batched(stand_ins, payment, payment_requirements):
+    facilitator_server = StandInFacilitator(batching=True)
+    facilitator = stand_ins({"a.test": facilitator_server}, batch_window=0.01)
+    payers = [f"0x{i:040x}" for i in range(10)]
+
+    responses = await asyncio.gather(
+        *(
+            facilitator.verify(payment_from(payment, payer), payment_requirements)
+            for payer in payers
+        )
+    )
+
+    # One request, with each result handed back to its own caller
+    assert facilitator_server.calls == ["verify/batch"]
+    assert [response.payer for response in responses] == payers
+
+    settled = await asyncio.gather(
+        facilitator.settle(payment, payment_requirements),
+        facilitator.settle(payment, payment_requirements),
+    )
+    assert all(response.success for response in settled)
+    assert facilitator_server.calls[1:] == ["settle/batch"]
+
+    # A lone call is sent on its own
+    await facilitator.verify(payment, payment_requirements)
+    assert facilitator_server.calls[-1] == "verify"
+
+
+async def test_batching_falls_back_to_parallel_calls(
+    stand_ins, payment, payment_requirements
+):
+    facilitator_server = StandInFacilitator(batching=False)
+    facilitator = stand_ins({"a.test": facilitator_server}, batch_window=0.01)
+
+    for _ in range(2):
+        responses = await asyncio.gather(
+            *(facilitator.verify(payment, payment_requirements) for _ in range(3))
+        )
+        assert all(response.is_valid for response in responses)
+
+    # The batch endpoint is only tried once
+    assert facilitator_server.calls == ["verify/batch"] + ["verify"] * 6
+
+
+async def test_failed_batch_fails_every_call(stand_ins, payment, payment_requirements):
+    facilitator = stand_ins(
+        {"a.test": StandInFacilitator(status=500, batching=True)}, batch_window=0.01
+    )
+
+    results = await asyncio.gather(
+        *(facilitator.verify(payment, payment_requirements) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+
+def test_batches_are_kept_per_event_loop():
+    batches = []
+
+    async def send(items):
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(send, window=0.2, max_size=10)
+    results = []
+
+    def call(item):
+        results.append(asyncio.run(asyncio.wait_for(batcher.submit(item), 5)))
+
+    # The second loop submits while the first one's batch is still open
+    threads = [threading.Thread(target=call, args=(item,)) for item in (1, 2)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [2, 4]
+    assert sorted(batches) == [[1], [2]]
@@ -0,0 +1,113 @@
+import os
+import threading
+
+import pytest
+
+from x402.journal import SettlementJournal
+from x402.types import (
+    PaymentRequirements,
+)
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1234567890123456789012345678901234567890",
+        max_amount_required="1000000",
+        resource="https://example.com/api",
+        description="test",
+        max_timeout_seconds=60,
+        mime_type="application/json",
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+def test_journal_replays_pending_payments(payment_requirements, tmp_path, make_payment):
+    path = str(tmp_path / "settlements.jsonl")
+    journal = SettlementJournal(path)
+    journal.append_pending(
+        [(str(i), make_payment(i), payment_requirements) for i in range(3)]
+    )
+    journal.append_done(["1"])
+    journal.close()
+
+    entries = SettlementJournal(path).pending()
+
+    assert [entry.id for entry in entries] == ["0", "2"]
+    assert entries[1].payment == make_payment(2)
+    assert entries[1].payment_requirements == payment_requirements
+
+
+def test_journal_group_commits_concurrent_writers(
+    payment_requirements, tmp_path, monkeypatch, make_payment
+):
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd))[1])
+    journal = SettlementJournal(str(tmp_path / "settlements.jsonl"))
+    payment = make_payment()
+
+    def write(worker):
+        for i in range(50):
+            journal.append_pending([(f"{worker}-{i}", payment, payment_requirements)])
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(journal) == 400
+    assert len(SettlementJournal(journal.path).pending()) == 400
+    # Every write was synced, but never more than once per write
+    assert 0 < len(fsyncs) <= 400
+
+
+def test_journal_write_failure_raises(
+    payment_requirements, tmp_path, monkeypatch, make_payment
+):
+    journal = SettlementJournal(str(tmp_path / "settlements.jsonl"))
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", fail)
+    with pytest.raises(OSError):
+        journal.append_pending([("0", make_payment(), payment_requirements)])
+
+
+def test_journal_compacts_completed_entries(
+    payment_requirements, tmp_path, make_payment
+):
+    path = tmp_path / "settlements.jsonl"
+    journal = SettlementJournal(str(path), compact_threshold=10)
+    journal.append_pending([("keep", make_payment(), payment_requirements)])
+    for i in range(10):
+        journal.append_pending([(str(i), make_payment(i), payment_requirements)])
+        journal.append_done([str(i)])
+
+    assert len(path.read_bytes().splitlines()) < 10
+    journal.append_pending([("new", make_payment(99), payment_requirements)])
+    assert [entry.id for entry in SettlementJournal(str(path)).pending()] == [
+        "keep",
+        "new",
+    ]
+
+
+def test_journal_recover_drops_torn_line(payment_requirements, tmp_path, make_payment):
+    path = tmp_path / "settlements.jsonl"
+    journal = SettlementJournal(str(path))
+    journal.append_pending([("0", make_payment(), payment_requirements)])
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b'{"op":"done","id":')
+
+    journal = SettlementJournal(str(path))
+    assert [entry.id for entry in journal.recover()] == ["0"]
+    journal.append_done(["0"])
+
+    assert SettlementJournal(str(path)).pending() == []
+    assert not path.with_name("settlements.jsonl.compact").exists()
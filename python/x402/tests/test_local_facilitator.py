@@ -0,0 +1,275 @@
+import asyncio
+
+import httpx
+import pytest
+from eth_account import Account
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from x402.exact import decode_payment, prepare_payment_header, sign_payment_header
+from x402.facilitator import Facilitator, FacilitatorClient
+from x402.fastapi.facilitator import create_facilitator_app
+from x402.fastapi.middleware import require_payment
+from x402.local_facilitator import (
+    LocalFacilitator,
+    TransferPendingError,
+    TransferReceipt,
+)
+from x402.nonces import NonceStore
+from x402.types import PaymentPayload, PaymentRequirements
+
+
+class InMemoryChain:
+    """ChainBackend keeping balances and used nonces in dictionaries."""
+
+    def __init__(self, balance=10**9):
+        self.balance = balance
+        self.balances = {}
+        self.used = set()
+        self.batches = []
+        self.revert = False
+        self.error = None
+
+    async def balance_of(self, network, asset, owner):
+        return self.balances.get(owner.lower(), self.balance)
+
+    async def authorization_used(self, network, asset, authorizer, nonce):
+        return (authorizer.lower(), nonce.lower()) in self.used
+
+    async def submit_transfers(self, network, transfers):
+        await asyncio.sleep(0.01)
+        self.batches.append(list(transfers))
+        receipts = []
+        for transfer in transfers:
+            if self.error is not None:
+                receipts.append(self.error)
+                continue
+            if self.revert:
+                receipts.append(TransferReceipt("0xreverted", False))
+                continue
+            self.used.add((transfer.from_.lower(), transfer.nonce.lower()))
+            receipts.append(TransferReceipt(f"0x{len(self.used):064x}", True))
+        return receipts
+
+
+@pytest.fixture
+def chain():
+    return InMemoryChain()
+
+
+@pytest.fixture
+def facilitator(chain):
+    return LocalFacilitator(chain, networks=["base-sepolia"])
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000001",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={"name": "USD Coin", "version": "2"},
+    )
+
+
+def make_payment(payment_requirements, account=None):
+    account = account or Account.create()
+    header = prepare_payment_header(account.address, 1, payment_requirements)
+    nonce = header["payload"]["authorization"]["nonce"]
+    header["payload"]["authorization"]["nonce"] = nonce.hex()
+    return PaymentPayload(
+        **decode_payment(sign_payment_header(account, payment_requirements, header))
+    )
+
+
+async def test_verify_checks_signature_and_chain(
+    facilitator, chain, payment_requirements
+):
+    payment = make_payment(payment_requirements)
+    response = await facilitator.verify(payment, payment_requirements)
+    assert response.is_valid
+    assert response.payer == payment.payload.authorization.from_
+
+    chain.balances[payment.payload.authorization.from_.lower()] = 9999
+    response = await facilitator.verify(payment, payment_requirements)
+    assert response.invalid_reason == "insufficient_funds"
+
+    underpaying = payment_requirements.model_copy(
+        update={"max_amount_required": "20000"}
+    )
+    response = await facilitator.verify(payment, underpaying)
+    assert response.invalid_reason == "invalid_exact_evm_payload_authorization_value"
+
+    other_network = payment.model_copy(update={"network": "base"})
+    response = await facilitator.verify(other_network, payment_requirements)
+    assert response.invalid_reason == "invalid_network"
+
+
+async def test_settle_submits_once(facilitator, chain, payment_requirements):
+    payment = make_payment(payment_requirements)
+
+    first, second = await asyncio.gather(
+        facilitator.settle(payment, payment_requirements),
+        facilitator.settle(payment, payment_requirements),
+    )
+
+    assert sorted([first.success, second.success]) == [False, True]
+    assert sum(len(batch) for batch in chain.batches) == 1
+    settled = first if first.success else second
+    assert settled.network == "base-sepolia"
+    assert settled.transaction.startswith("0x")
+
+    # Replays are rejected locally and, once mined, by the chain
+    response = await facilitator.verify(payment, payment_requirements)
+    assert response.invalid_reason == "invalid_transaction_state"
+    response = await LocalFacilitator(chain).verify(payment, payment_requirements)
+    assert response.invalid_reason == "invalid_transaction_state"
+
+
+async def test_concurrent_settles_share_a_submission(
+    facilitator, chain, payment_requirements
+):
+    payments = [make_payment(payment_requirements) for _ in range(5)]
+
+    responses = await asyncio.gather(
+        *(facilitator.settle(payment, payment_requirements) for payment in payments)
+    )
+
+    assert all(response.success for response in responses)
+    assert len({response.transaction for response in responses}) == 5
+    assert [len(batch) for batch in chain.batches] == [5]
+
+
+async def test_failed_transfer_frees_the_nonce(
+    facilitator, chain, payment_requirements
+):
+    payment = make_payment(payment_requirements)
+    chain.revert = True
+
+    response = await facilitator.settle(payment, payment_requirements)
+    assert not response.success
+    assert response.error_reason == "invalid_transaction_state"
+    assert response.transaction == "0xreverted"
+
+    chain.revert = False
+    response = await facilitator.settle(payment, payment_requirements)
+    assert response.success
+
+
+async def test_unsent_transfer_frees_the_nonce(
+    facilitator, chain, payment_requirements
+):
+    payment = make_payment(payment_requirements)
+    chain.error = ConnectionError("node unavailable")
+
+    response = await facilitator.settle(payment, payment_requirements)
+    assert response.error_reason == "unexpected_settle_error"
+    assert response.transaction is None
+
+    chain.error = None
+    response = await facilitator.settle(payment, payment_requirements)
+    assert response.success
+
+
+async def test_pending_transfer_keeps_the_nonce(
+    facilitator, chain, payment_requirements
+):
+    payment = make_payment(payment_requirements)
+    chain.error = TransferPendingError("0xpending")
+
+    response = await facilitator.settle(payment, payment_requirements)
+    assert not response.success
+    assert response.error_reason == "unexpected_settle_error"
+    assert response.transaction == "0xpending"
+
+    # It may still be mined, so it is not submitted again
+    chain.error = None
+    response = await facilitator.settle(payment, payment_requirements)
+    assert response.error_reason == "invalid_transaction_state"
+    assert sum(len(batch) for batch in chain.batches) == 1
+
+
+async def test_settled_nonces_survive_a_restart(tmp_path, payment_requirements):
+    payment = make_payment(payment_requirements)
+    chain = InMemoryChain()
+
+    with NonceStore(tmp_path) as nonces:
+        facilitator = LocalFacilitator(chain, nonce_store=nonces)
+        assert (await facilitator.settle(payment, payment_requirements)).success
+
+    # Rejected locally, even by a chain that has not seen the transfer yet
+    with NonceStore(tmp_path) as nonces:
+        facilitator = LocalFacilitator(InMemoryChain(), nonce_store=nonces)
+        response = await facilitator.verify(payment, payment_requirements)
+        assert response.invalid_reason == "invalid_transaction_state"
+
+
+async def test_facilitator_app_round_trip(facilitator, chain, payment_requirements):
+    app = create_facilitator_app(facilitator)
+    http_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://facilitator"
+    )
+    client = FacilitatorClient(
+        {"url": "http://facilitator", "http_client": http_client, "batch_window": 0.01}
+    )
+    payments = [make_payment(payment_requirements) for _ in range(3)]
+
+    async with http_client:
+        supported = (await http_client.get("/supported")).json()
+        assert supported == {
+            "kinds": [{"x402Version": 1, "scheme": "exact", "network": "base-sepolia"}]
+        }
+
+        verified = await asyncio.gather(
+            *(client.verify(payment, payment_requirements) for payment in payments)
+        )
+        assert all(response.is_valid for response in verified)
+
+        settled = await asyncio.gather(
+            *(client.settle(payment, payment_requirements) for payment in payments)
+        )
+        assert all(response.success for response in settled)
+        assert [len(batch) for batch in chain.batches] == [3]
+
+        response = await client.settle(payments[0], payment_requirements)
+        assert response.error_reason == "invalid_transaction_state"
+
+        response = await http_client.post(
+            "/verify", json={"paymentPayload": {"network": "base-sepolia"}}
+        )
+        assert response.status_code == 400
+        assert response.json()["invalidReason"] == "invalid_payload"
+
+        response = await http_client.post("/settle/batch", json={"items": [{}]})
+        assert response.status_code == 200
+        assert response.json()["results"][0]["errorReason"] == "invalid_payload"
+
+
+def test_protects_a_fastapi_route(facilitator, chain, make_payment_header):
+    assert isinstance(facilitator, Facilitator)
+    app = FastAPI()
+    app.get("/paid")(lambda: {"message": "paid"})
+    app.middleware("http")(
+        require_payment(
+            price="$0.01",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            path="/paid",
+            network="base-sepolia",
+            facilitator=facilitator,
+        )
+    )
+
+    with TestClient(app) as client:
+        header = make_payment_header(client.get("/paid").json())
+        response = client.get("/paid", headers={"X-PAYMENT": header})
+
+    assert response.status_code == 200
+    assert "X-PAYMENT-RESPONSE" in response.headers
+    assert [len(batch) for batch in chain.batches] == [1]
@@ -0,0 +1,111 @@
+import random
+import threading
+
+import pytest
+
+from x402.nonces import NonceStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def random_pairs(count):
+    rng = random.Random(402)
+    return [
+        (f"0x{rng.getrandbits(160):040x}", f"0x{rng.getrandbits(256):064x}")
+        for _ in range(count)
+    ]
+
+
+def test_add_rejects_live_duplicates():
+    clock = FakeClock()
+    store = NonceStore(clock=clock)
+    payer, nonce = random_pairs(1)[0]
+
+    assert store.add(payer, nonce, 2000)
+    assert (payer, nonce) in store
+    # Case and the 0x prefix do not matter
+    assert (payer.upper(), nonce[2:].upper()) in store
+    assert not store.add(payer, nonce, 3000)
+    assert (payer, "0x" + "00" * 32) not in store
+
+    clock.now = 2000
+    assert (payer, nonce) not in store
+    assert store.add(payer, nonce, 3000)
+
+
+def test_discard_and_expired_additions():
+    store = NonceStore(clock=FakeClock())
+    payer, nonce = random_pairs(1)[0]
+
+    store.add(payer, nonce, 2000)
+    store.discard(payer, nonce)
+    assert (payer, nonce) not in store
+    assert store.add(payer, nonce, 2000)
+
+    # Already expired, so nothing to guard against
+    other_payer, other_nonce = random_pairs(2)[1]
+    assert store.add(other_payer, other_nonce, 900)
+    assert (other_payer, other_nonce) not in store
+
+
+def test_grows_and_reclaims_expired_slots():
+    clock = FakeClock()
+    store = NonceStore(shards=2, shard_capacity=8, clock=clock)
+    pairs = random_pairs(5000)
+
+    for payer, nonce in pairs:
+        assert store.add(payer, nonce, 2000)
+    assert all(pair in store for pair in pairs)
+    assert store.nbytes / len(pairs) < 64
+
+    clock.now = 2000
+    for payer, nonce in pairs:
+        assert store.add(payer, nonce + "ff", 3000)
+    # The expired entries' slots were reused or dropped, not added to
+    assert len(store) <= 2 * len(pairs)
+    assert not any(pair in store for pair in pairs)
+
+
+def test_concurrent_adds_claim_each_nonce_once():
+    store = NonceStore(shards=4, shard_capacity=8, clock=FakeClock())
+    pairs = random_pairs(2000)
+    claimed = []
+
+    def claim():
+        claimed.extend(pair for pair in pairs if store.add(*pair, 2000))
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(pairs)
+
+
+def test_file_backed_store_is_reopened(tmp_path):
+    clock = FakeClock()
+    pairs = random_pairs(3000)
+    with NonceStore(tmp_path, shards=2, shard_capacity=8, clock=clock) as store:
+        for payer, nonce in pairs:
+            store.add(payer, nonce, 2000)
+        store.discard(*pairs[0])
+
+    with NonceStore(tmp_path, clock=clock) as store:
+        assert pairs[0] not in store
+        assert all(pair in store for pair in pairs[1:])
+        assert not store.add(*pairs[1], 2000)
+
+
+def test_rejects_foreign_files(tmp_path):
+    NonceStore(tmp_path, shards=1).close()
+    (tmp_path / "shard-000").write_bytes(b"not a nonce store")
+
+    with pytest.raises(ValueError):
+        NonceStore(tmp_path)
@@ -0,0 +1,70 @@
+from x402.path import RouteTable, path_is_match
+
+
+def test_path_is_match_regex_and_lists():
+    assert path_is_match("regex:^/api/users/\\d+$", "/api/users/42")
+    assert not path_is_match("regex:^/api/users/\\d+$", "/api/users/abc")
+    assert path_is_match(["/a", "/b/*"], "/b/c")
+    assert not path_is_match(["/a", "/b/*"], "/c")
+    assert path_is_match("*", "/anything/at/all")
+    assert path_is_match("/files/?.txt", "/files/a.txt")
+    assert not path_is_match("/files/?.txt", "/files/ab.txt")
+
+
+def test_route_table_exact_glob_and_regex():
+    table = RouteTable()
+    table.add("/weather", "weather")
+    table.add(["/premium/*", "/vip/*/content"], "premium")
+    table.add("regex:^/items/\\d+$", "items")
+
+    assert table.match("/weather") == "weather"
+    assert table.match("/premium/report") == "premium"
+    assert table.match("/premium/a/b") == "premium"
+    assert table.match("/vip/gold/content") == "premium"
+    assert table.match("/items/123") == "items"
+    assert table.match("/items/abc") is None
+    assert table.match("/unknown") is None
+    assert len(table) == 3
+
+
+def test_route_table_precedence():
+    table = RouteTable()
+    table.add("/api/*", "glob")
+    table.add("regex:^/api/", "regex")
+    table.add("/api/special", "exact")
+
+    # Exact paths win over patterns
+    assert table.match("/api/special") == "exact"
+    # Among patterns the earliest registration wins
+    assert table.match("/api/other") == "glob"
+
+    table = RouteTable()
+    table.add("regex:^/api/", "regex")
+    table.add("/api/*", "glob")
+    assert table.match("/api/other") == "regex"
+
+
+def test_route_table_regex_with_groups_and_flags():
+    table = RouteTable()
+    table.add("regex:^/(a|b)/\\1$", "backref")
+    table.add("regex:(?i)^/upper$", "flags")
+    table.add("regex:^/plain$", "plain")
+
+    assert table.match("/a/a") == "backref"
+    assert table.match("/a/b") is None
+    assert table.match("/UPPER") == "flags"
+    assert table.match("/plain") == "plain"
+
+
+def test_route_table_many_routes():
+    table = RouteTable()
+    for i in range(1000):
+        table.add(f"/exact/{i}", ("exact", i))
+        table.add(f"/glob/{i}/*", ("glob", i))
+        table.add(f"regex:^/regex/{i}/\\d+$", ("regex", i))
+
+    assert table.match("/exact/999") == ("exact", 999)
+    assert table.match("/glob/500/x/y") == ("glob", 500)
+    assert table.match("/regex/7/12") == ("regex", 7)
+    assert table.match("/regex/7/x") is None
+    assert table.match("/glob/1000/x") is None
@@ -1,8 +1,14 @@
+import gzip
+
+import pytest
+
 from x402.paywall import (
     is_browser_request,
     create_x402_config,
+    create_paywall_response,
     inject_payment_data,
     get_paywall_html,
+    render_paywall,
 )
 from x402.types import PaymentRequirements, PaywallConfig
 
@@ -260,3 +266,114 @@ class TestGetPaywallHtml:
         assert '"amount": 2.0' in result
         assert '"appName": "My App"' in result
         assert '"appLogo": "https://example.com/logo.png"' in result
+
+
+@pytest.fixture
+def paywall_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        max_amount_required="1000000",
+        resource="https://example.com/api/cached",
+        description="Cached paywall",
+        mime_type="application/json",
+        pay_to="0x789",
+        max_timeout_seconds=60,
+        asset="0xUSDC",
+    )
+
+
+class TestPaywallCaching:
+    """Test pre-rendered paywall pages and their encodings."""
+
+    def test_render_paywall_is_cached(self, paywall_requirements):
+        first = render_paywall("Payment required", [paywall_requirements])
+        second = render_paywall("Payment required", [paywall_requirements])
+        other = render_paywall("Other error", [paywall_requirements])
+
+        assert first is second
+        assert other is not first
+        assert other.etag != first.etag
+
+    def test_render_matches_inject_payment_data(self, paywall_requirements):
+        from x402.template import PAYWALL_TEMPLATE
+
+        page = render_paywall("Payment required", [paywall_requirements])
+        expected = inject_payment_data(
+            PAYWALL_TEMPLATE, "Payment required", [paywall_requirements]
+        )
+        assert page.html() == expected
+
+    def test_gzip_variant_decompresses_to_page(self, paywall_requirements):
+        page = render_paywall("Payment required", [paywall_requirements])
+        body, coding = page.encode("gzip, deflate")
+
+        assert coding == "gzip"
+        assert gzip.decompress(b"".join(body)) == b"".join(page.chunks)
+
+    def test_brotli_variant(self, paywall_requirements):
+        brotli = pytest.importorskip("brotli")
+        page = render_paywall("Payment required", [paywall_requirements])
+        body, coding = page.encode("gzip, br")
+
+        assert coding == "br"
+        assert brotli.decompress(b"".join(body)) == b"".join(page.chunks)
+
+    def test_encoding_negotiation(self, paywall_requirements):
+        page = render_paywall("Payment required", [paywall_requirements])
+
+        assert page.encode("")[1] is None
+        assert page.encode("identity")[1] is None
+        assert page.encode("gzip;q=0, br;q=0")[1] is None
+        assert page.encode("br;q=0, gzip;q=0.5")[1] == "gzip"
+
+    def test_paywall_response_headers(self, paywall_requirements):
+        response = create_paywall_response(
+            {"Accept-Encoding": "gzip"}, "Payment required", [paywall_requirements]
+        )
+        headers = dict(response.headers)
+
+        assert response.status_code == 402
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Vary"] == "Accept-Encoding"
+        assert int(headers["Content-Length"]) == sum(len(c) for c in response.body)
+
+    def test_paywall_response_not_modified(self, paywall_requirements):
+        first = create_paywall_response({}, "Payment required", [paywall_requirements])
+        etag = dict(first.headers)["ETag"]
+
+        repeat = create_paywall_response(
+            {"If-None-Match": etag}, "Payment required", [paywall_requirements]
+        )
+        assert repeat.status_code == 304
+        assert repeat.body == []
+
+        stale = create_paywall_response(
+            {"If-None-Match": 'W/"stale"'}, "Payment required", [paywall_requirements]
+        )
+        assert stale.status_code == 402
+
+
+class TestTemplateLoading:
+    """Test that the paywall template is loaded lazily."""
+
+    def test_import_does_not_load_template(self):
+        import subprocess
+        import sys
+
+        code = (
+            "import x402.fastapi.middleware, x402.flask.middleware\n"
+            "from x402.template import get_paywall_template\n"
+            "from x402.paywall import _template_parts\n"
+            "assert get_paywall_template.cache_info().currsize == 0\n"
+            "assert _template_parts.cache_info().currsize == 0\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_template_attribute_still_available(self):
+        from x402 import template
+
+        assert "</head>" in template.PAYWALL_TEMPLATE
+        assert template.PAYWALL_TEMPLATE is template.get_paywall_template()
+        with pytest.raises(AttributeError):
+            template.MISSING
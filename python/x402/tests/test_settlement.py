@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from x402.journal import SettlementJournal
+from x402.settlement import RETRIES_EXHAUSTED, SettlementQueue, settlement_id
+from x402.types import (
+    PaymentRequirements,
+    SettleResponse,
+)
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x1234567890123456789012345678901234567890",
+        max_amount_required="1000000",
+        resource="https://example.com/api",
+        description="test",
+        max_timeout_seconds=60,
+        mime_type="application/json",
+        extra={"name": "USDC", "version": "2"},
+    )
+
+
+class StubFacilitator:
+    """Facilitator stand-in that fails the first `failures` settle calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.settled = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def settle(self, payment, payment_requirements):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError("facilitator unavailable")
+            self.settled.append(settlement_id(payment))
+            return SettleResponse(
+                success=True, transaction="0x1", network=payment.network
+            )
+        finally:
+            self.in_flight -= 1
+
+
+async def test_queue_settles_in_background(payment_requirements, make_payment):
+    facilitator = StubFacilitator()
+    results = []
+    queue = SettlementQueue(facilitator, max_concurrency=4, on_settled=results.append)
+
+    ids = [queue.submit(make_payment(i), payment_requirements) for i in range(20)]
+    responses = await asyncio.gather(*(queue.wait(i, timeout=5) for i in ids))
+    await queue.aclose()
+
+    assert all(response.success for response in responses)
+    assert sorted(facilitator.settled) == sorted(ids)
+    assert facilitator.max_in_flight <= 4
+    assert {result.id for result in results} == set(ids)
+    assert queue.get_result(ids[0]).transaction == "0x1"
+
+
+async def test_queue_ignores_duplicate_submissions(payment_requirements, make_payment):
+    facilitator = StubFacilitator()
+    queue = SettlementQueue(facilitator)
+
+    first = queue.submit(make_payment(), payment_requirements)
+    second = queue.submit(make_payment(), payment_requirements)
+    await queue.wait(first, timeout=5)
+    queue.submit(make_payment(), payment_requirements)
+    await queue.aclose()
+
+    assert first == second
+    assert facilitator.settled == [first]
+
+
+async def test_queue_retries_with_backoff(payment_requirements, make_payment):
+    facilitator = StubFacilitator(failures=2)
+    queue = SettlementQueue(facilitator, retry_backoff=0.001)
+
+    settlement = queue.submit(make_payment(), payment_requirements)
+    response = await queue.wait(settlement, timeout=5)
+    await queue.aclose()
+
+    assert response.success
+    assert facilitator.settled == [settlement]
+
+
+async def test_queue_gives_up_after_max_retries(
+    payment_requirements, tmp_path, make_payment
+):
+    journal = SettlementJournal(str(tmp_path / "settlements.jsonl"))
+    facilitator = StubFacilitator(failures=10)
+    queue = SettlementQueue(
+        facilitator, max_retries=1, retry_backoff=0.001, journal=journal
+    )
+
+    settlement = queue.submit(make_payment(), payment_requirements)
+    response = await queue.wait(settlement, timeout=5)
+    await queue.aclose()
+
+    assert not response.success
+    assert response.error_reason == RETRIES_EXHAUSTED
+    # Still unsettled, so it is resubmitted on the next start
+    assert [entry.id for entry in journal.pending()] == [settlement]
+
+
+async def test_queue_resubmits_journaled_payments(
+    payment_requirements, tmp_path, make_payment
+):
+    path = str(tmp_path / "settlements.jsonl")
+    journal = SettlementJournal(path)
+    journal.append_pending(
+        [
+            (settlement_id(make_payment(i)), make_payment(i), payment_requirements)
+            for i in range(3)
+        ]
+    )
+    journal.append_done([settlement_id(make_payment(0))])
+    journal.close()
+
+    facilitator = StubFacilitator()
+    queue = SettlementQueue(facilitator, journal=SettlementJournal(path))
+    await queue.start()
+    await queue.aclose(timeout=5)
+
+    assert sorted(facilitator.settled) == sorted(
+        settlement_id(make_payment(i)) for i in (1, 2)
+    )
+    assert SettlementJournal(path).pending() == []